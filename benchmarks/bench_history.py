@@ -0,0 +1,83 @@
+# benchmarks/bench_history.py
+#
+# Fills a history store with synthetic seat changes spread over several months,
+# then times the caller-side cost of HistoryWriter.record, the writer thread's
+# throughput, and per-event / per-show queries over all and over one week.
+# Run from the project root:
+#   python -m benchmarks.bench_history --rows 5000000 --events 400 --days 120
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from history import HistoryReader, HistoryWriter
+
+SEATS = 800
+SHOWS = 20
+COLORS = ["rgb(66, 135, 245)", "rgb(245, 66, 66)", "rgb(66, 245, 126)"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the seat history store.")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Seat changes to write")
+    parser.add_argument("--events", type=int, default=400, help="Distinct events")
+    parser.add_argument("--days", type=int, default=120, help="Time span of the data")
+    parser.add_argument("--batch", type=int, default=20, help="Changes per recorded check")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    logger = logging.getLogger("bench_history")
+    end = time.time()
+    start = end - args.days * 86400
+    checks = args.rows // args.batch
+    step = (end - start) / checks
+    urls = [f"https://example.com/events/{i}" for i in range(args.events)]
+    show_of = {url: f"https://example.com/performances/{i % SHOWS}" for i, url in enumerate(urls)}
+    free = {url: set() for url in urls}
+
+    with tempfile.TemporaryDirectory() as directory:
+        writer = HistoryWriter(directory, logger)
+        record_seconds = 0.0
+        started = time.perf_counter()
+        for i in range(checks):
+            url = urls[rng.randrange(args.events)]
+            changes = []
+            for seat in rng.sample(range(SEATS), args.batch):
+                key = f"rs:{seat // 30 + 1}:{seat % 30 + 1}"
+                if key in free[url]:
+                    free[url].discard(key)
+                    changes.append((key, None))
+                else:
+                    free[url].add(key)
+                    changes.append((key, rng.choice(COLORS)))
+            t = time.perf_counter()
+            writer.record(url, show_of[url], "Show", None, changes, timestamp=start + i * step)
+            record_seconds += time.perf_counter() - t
+        queued = time.perf_counter() - started
+        writer.close()
+        written = time.perf_counter() - started
+        print(f"record(): {record_seconds / checks * 1e6:.2f} us per check ({args.batch} changes), "
+              f"{queued:.1f}s to generate and queue")
+        print(f"writer:   {args.rows / written:,.0f} rows/s ({written:.1f}s until everything was on disk)")
+
+        reader = HistoryReader(directory)
+        week = datetime.fromtimestamp(end) - timedelta(days=7)
+        for label, query in [
+            ("event, all time", lambda: reader.event_stats(urls[0])),
+            ("event, last week", lambda: reader.event_stats(urls[0], since=week)),
+            ("show, all time", lambda: reader.show_stats(show_of[urls[0]])),
+        ]:
+            t = time.perf_counter()
+            stats = query()
+            print(f"{label:<17} {time.perf_counter() - t:7.3f}s  ({stats.releases} releases, "
+                  f"{len(stats.free_seconds)} free intervals)")
+        print(f"{len(reader.segments)} segments, {sum(s.count for s in reader.segments):,} rows")
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
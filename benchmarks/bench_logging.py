@@ -0,0 +1,72 @@
+# benchmarks/bench_logging.py
+#
+# Measures how long the event loop is blocked by logging, per LoggerManager mode:
+# the caller-side time of each logger.info call and the loop lag seen by a
+# periodic probe while a task logs like check_event does.
+# "no caller" disables caller lookup process-wide, so it runs last.
+# Run from the project root:  python -m benchmarks.bench_logging
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from logger_manager import LoggerManager
+from metrics import MetricsRegistry, probe_loop_lag
+
+MESSAGES = 20_000
+BURST = 50  # Log calls between two yields to the loop, roughly one cycle of event checks
+
+MODES = {
+    "direct": dict(use_queue=False),
+    "queue": dict(use_queue=True),
+    "queue+json": dict(use_queue=True, json_format=True),
+    "queue+json, no caller": dict(use_queue=True, json_format=True, caller_info=False),
+}
+
+
+async def measure(index: int, name: str, options: dict, directory: str) -> None:
+    manager = LoggerManager(
+        logger_name=f"bench_logging_{index}",
+        log_file=os.path.join(directory, f"bench_logging_{index}.log"),
+        max_bytes=1_000_000,
+        backup_count=2,
+        use_stderr=False,
+        **options
+    )
+    logger = manager.get_logger()
+    # Only the file handler matters here; drop console output so the terminal is not the bottleneck.
+    for handler in list(logger.handlers) + list(getattr(LoggerManager._listeners.get(manager.logger_name),
+                                                        "handlers", [])):
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setLevel(logging.CRITICAL + 1)
+
+    registry = MetricsRegistry()
+    probe = asyncio.ensure_future(probe_loop_lag(registry, interval=0.005))
+    blocked = 0.0
+    for i in range(MESSAGES):
+        started = time.perf_counter()
+        logger.info(f"Event: https://sales.ft.org.ua/events/{i} — found 1500 rect elements.")
+        blocked += time.perf_counter() - started
+        if i % BURST == 0:
+            await asyncio.sleep(0)
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+    manager.close()
+
+    lag = registry.histogram("loop_lag_seconds")
+    print(f"{name:<24} {blocked / MESSAGES * 1e6:>7.1f} us/call on loop   "
+          f"loop lag p50 {lag.quantile(0.5) * 1000:>5.1f} ms  p99 {lag.quantile(0.99) * 1000:>5.1f} ms")
+
+
+async def main() -> None:
+    print(f"{MESSAGES} log calls per mode (Python {sys.version.split()[0]})")
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (name, options) in enumerate(MODES.items()):
+            await measure(index, name, options, directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,235 @@
+# benchmarks/bench_monitor.py
+#
+# Runs PerformanceMonitor against the local synthetic site and reports
+# cycles/s, pages/s, processed and fingerprint-skipped checks, p50/p99 seat detection latency, time to the first
+# event check and peak RSS.
+# Results are appended to benchmarks/results/bench_monitor.jsonl and the
+# previous run with the same parameters is shown for comparison.
+# Run from the project root:
+#   python -m benchmarks.bench_monitor --performances 5 --events 20 --seats 800 --duration 60
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from benchmarks.synthetic_site import SyntheticSite
+from browser_recycler import process_rss_bytes
+from config import Config
+from monitor import PerformanceMonitor
+from notifier import Notifier
+
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "bench_monitor.jsonl")
+
+
+class NullNotifier(Notifier):
+    def send_message(self, message: str) -> None:
+        pass
+
+
+def process_tree_rss() -> Optional[int]:
+    """
+    RSS of this process and all its descendants (Playwright driver and Chromium), read from /proc.
+    """
+    try:
+        children: Dict[int, List[int]] = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    except OSError:
+        return None
+    pids, stack = [], [os.getpid()]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return process_rss_bytes(pids)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure(site: SyntheticSite, args: argparse.Namespace) -> None:
+    # Scraper helpers read Config class attributes, so the overrides are applied to the class.
+    Config.EVENT_LINK_PATTERN = f"{site.host}:{site.port}/events/"
+    Config.EVENT_LINK_BASE = site.base_url
+    Config.MIN_CHECK_INTERVAL = args.interval
+    Config.POLL_MAX_INTERVAL = max(args.interval, 1)
+    Config.SLEEP_INTERVAL = 1
+    Config.HOST_RATE_LIMIT = 10_000
+    Config.HOST_BURST = 10_000
+    Config.MAX_CONCURRENT_PAGES = args.concurrency
+    Config.PAGE_POOL_SIZE = args.concurrency
+    Config.METRICS_ENABLED = False
+    Config.LIVE_WATCH_URLS = []
+    Config.HTTP_ENGINE_URLS = site.performance_urls if args.engine == "http" else []
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    site = SyntheticSite(args.performances, args.events, args.seats, args.churn_ratio,
+                         args.churn_interval, args.seed)
+    await site.start()
+    configure(site, args)
+    logger = logging.getLogger("bench_monitor")
+    monitor = PerformanceMonitor(NullNotifier(), Config(), logger, site.performance_urls)
+
+    total_events = args.performances * args.events
+    measuring = False
+    # Every check is counted, including those that end at the fingerprint and never reach process_event.
+    checks = 0
+    processed = 0
+    latencies: List[float] = []
+    original_check = monitor.check_event
+    original_process = monitor.process_event
+    launched = time.monotonic()
+    first_check: Optional[float] = None
+
+    async def check_event(pool, event_url, performance_url):
+        nonlocal checks, first_check
+        await original_check(pool, event_url, performance_url)
+        if first_check is None:
+            first_check = time.monotonic() - launched
+        if measuring:
+            checks += 1
+
+    async def process_event(event_url, performance_url, show_title, event_datetime, rects, html=None):
+        nonlocal processed
+        await original_process(event_url, performance_url, show_title, event_datetime, rects, html)
+        if measuring:
+            processed += 1
+            latencies.extend(site.detected(event_url, rects, time.monotonic()))
+
+    monitor.check_event = check_event
+    monitor.process_event = process_event
+    task = asyncio.ensure_future(monitor.run_monitoring())
+    peak_rss = 0
+    try:
+        warmup_deadline = time.monotonic() + args.warmup_timeout
+        while len(monitor.seat_states_by_url) < total_events:
+            if task.done():
+                raise RuntimeError(f"Monitor stopped during warm-up: {task.exception()}")
+            if time.monotonic() > warmup_deadline:
+                raise RuntimeError(f"Warm-up did not finish: {len(monitor.seat_states_by_url)}/{total_events} "
+                                   f"events checked.")
+            await asyncio.sleep(0.2)
+
+        site.start_churn()
+        measuring = True
+        requests_before = site.requests
+        started = time.monotonic()
+        while time.monotonic() - started < args.duration:
+            await asyncio.sleep(0.5)
+            peak_rss = max(peak_rss, process_tree_rss() or 0)
+            if task.done():
+                raise RuntimeError(f"Monitor stopped: {task.exception()}")
+        duration = time.monotonic() - started
+        measuring = False
+        pages = site.requests - requests_before
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await site.close()
+
+    if not peak_rss:
+        # Without /proc, fall back to the peak RSS of this process (kilobytes on Linux, bytes on macOS).
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss = usage if sys.platform == "darwin" else usage * 1024
+
+    p50, p99 = percentile(latencies, 0.5), percentile(latencies, 0.99)
+    return {
+        "first_check_s": first_check,
+        "checks": checks,
+        "processed": processed,
+        "skipped": checks - processed,
+        "cycles_per_s": checks / total_events / duration,
+        "pages_per_s": pages / duration,
+        "detected": len(latencies),
+        "undetected": len(site.pending_free),
+        "latency_p50_s": p50,
+        "latency_p99_s": p99,
+        "peak_rss_mb": peak_rss / 2 ** 20,
+    }
+
+
+def store(params: Dict[str, Any], results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Appends the run to RESULTS_FILE and returns the previous run with the same parameters.
+    """
+    previous = None
+    if os.path.exists(RESULTS_FILE):
+        with open(RESULTS_FILE, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["params"] == params:
+                    previous = record
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "params": params,
+            "results": results,
+        }) + "\n")
+    return previous
+
+
+def report(results: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+    def fmt(value: Any) -> str:
+        return "n/a" if value is None else f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    for key, value in results.items():
+        line = f"{key:<16} {fmt(value):>10}"
+        if previous is not None:
+            line += f"   (previous {fmt(previous['results'].get(key))} @ {previous.get('revision')})"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PerformanceMonitor against a synthetic theatre site.")
+    parser.add_argument("--performances", type=int, default=5, help="Performance pages (K)")
+    parser.add_argument("--events", type=int, default=20, help="Events per performance (M)")
+    parser.add_argument("--seats", type=int, default=800, help="Seat rects per event (N)")
+    parser.add_argument("--churn-ratio", type=float, default=0.01, help="Fraction of seats recolored per tick")
+    parser.add_argument("--churn-interval", type=float, default=1.0, help="Seconds between churn ticks")
+    parser.add_argument("--interval", type=float, default=0, help="MIN_CHECK_INTERVAL during the run")
+    parser.add_argument("--concurrency", type=int, default=Config.MAX_CONCURRENT_PAGES)
+    parser.add_argument("--engine", choices=["browser", "http"], default="browser",
+                        help="Check event pages with Playwright or the HTTP fast path")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds after warm-up")
+    parser.add_argument("--warmup-timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    params = {key: value for key, value in vars(args).items() if key != "warmup_timeout"}
+    report(results, store(params, results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_seat_state.py
+#
+# Compares the former set-of-strings seat representation with SeatState bitsets,
+# and times HallIndex group queries (adjacent free seats in a row).
+# Run from the project root:  python -m benchmarks.bench_seat_state
+
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from config import Config
+from seat_state import ColorPalette, SeatLayout, SeatState, popcount
+
+SEATS = 1500        # Rects per hall
+ROW_LENGTH = 40     # Seats per row for group queries
+EVENTS = 300        # Events watched
+COLORS = ["rgb(66, 135, 245)", "rgb(245, 66, 66)", "rgb(66, 245, 126)", "rgb(173, 173, 173)"]
+
+
+def make_rects(rng: random.Random) -> List[Dict[str, Any]]:
+    return [{"index": i, "color": rng.choice(COLORS)} for i in range(SEATS)]
+
+
+def churn(rects: List[Dict[str, Any]], rng: random.Random, ratio: float = 0.02) -> List[Dict[str, Any]]:
+    changed = [dict(item) for item in rects]
+    for item in rng.sample(changed, int(len(changed) * ratio)):
+        item["color"] = rng.choice(COLORS)
+    return changed
+
+
+def legacy_state(rects: List[Dict[str, Any]]) -> set:
+    return {f"rect_{item['index']}_{item['color'].lower()}"
+            for item in rects
+            if item["color"] and item["color"].lower() not in Config.IGNORED_COLORS}
+
+
+def measure(name: str, build: Callable[[List[Dict[str, Any]]], Any],
+            diff: Callable[[Any, Any], int], cycles: List[List[List[Dict[str, Any]]]]) -> None:
+    tracemalloc.start()
+    states = [build(rects) for rects in cycles[0]]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    found = 0
+    for cycle in cycles[1:]:
+        for i, rects in enumerate(cycle):
+            current = build(rects)
+            found += diff(current, states[i])
+            states[i] = current
+    elapsed = time.perf_counter() - started
+    per_event_us = elapsed / (EVENTS * (len(cycles) - 1)) * 1e6
+    print(f"{name:<10} state memory {memory / 1024:>9.1f} KiB   "
+          f"build+diff {per_event_us:>8.1f} us/event   new seats found {found}")
+
+
+def measure_group_query(rng: random.Random, n: int = 4, repeat: int = 1000) -> None:
+    hall = [{"index": i, "color": rng.choice(COLORS), "row": str(i // ROW_LENGTH), "seat": str(i % ROW_LENGTH)}
+            for i in range(SEATS)]
+    layout = SeatLayout()
+    state = SeatState.from_rects(hall, Config.IGNORED_COLORS, ColorPalette(), layout)
+    index = layout.hall_index()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        index.has_group(state.free_mask, n)
+    per_query_us = (time.perf_counter() - started) / repeat * 1e6
+    print(f"group query ({n} adjacent seats, rows of {ROW_LENGTH}) {per_query_us:>8.1f} us")
+
+
+def main() -> None:
+    rng = random.Random(42)
+    cycles = [[make_rects(rng) for _ in range(EVENTS)]]
+    for _ in range(5):
+        cycles.append([churn(rects, rng) for rects in cycles[-1]])
+
+    print(f"{EVENTS} events x {SEATS} seats, {len(cycles) - 1} diff cycles (Python {sys.version.split()[0]})")
+    measure("set[str]", legacy_state, lambda cur, prev: len(cur - prev), cycles)
+    palette = ColorPalette()
+    measure("bitset",
+            lambda rects: SeatState.from_rects(rects, Config.IGNORED_COLORS, palette),
+            lambda cur, prev: popcount(cur.new_seats(prev)),
+            cycles)
+    measure_group_query(rng)
+
+
+if __name__ == "__main__":
+    main()
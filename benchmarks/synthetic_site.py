@@ -0,0 +1,171 @@
+# benchmarks/synthetic_site.py
+#
+# Local stand-in for the theatre site: K performance listing pages, M events
+# per performance and N seat rects per event, with random seat churn.
+
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+FREE_COLORS = ["rgb(66, 135, 245)", "rgb(245, 66, 66)", "rgb(66, 245, 126)"]
+TAKEN_COLOR = "rgb(173, 173, 173)"
+SEATS_PER_ROW = 30
+
+
+class SyntheticSite:
+    """
+    aiohttp server generating listing pages and seat maps.
+
+    Every churn_interval seconds, churn_ratio of each event's seats change
+    color. Seats that become free are recorded with the time of the change,
+    so a benchmark can measure how long the monitor takes to detect them.
+    Event pages carry an ETag that changes with their seat colors and honor If-None-Match.
+    """
+
+    def __init__(self, performances: int, events: int, seats: int, churn_ratio: float = 0.01,
+                 churn_interval: float = 1.0, seed: int = 42, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        :param performances: Number of performance listing pages (K).
+        :param events: Events per performance (M).
+        :param seats: Seat rects per event (N).
+        :param churn_ratio: Fraction of seats recolored per event and churn tick.
+        :param churn_interval: Seconds between churn ticks.
+        :param seed: Random seed, so runs with equal parameters serve equal pages.
+        :param host: Interface to bind.
+        :param port: TCP port (0 picks a free one).
+        """
+        self.performances = performances
+        self.events = events
+        self.seats = seats
+        self.churn_ratio = churn_ratio
+        self.churn_interval = churn_interval
+        self.host = host
+        self.port = port
+        self._rng = random.Random(seed)
+        self._colors: Dict[str, List[str]] = {}
+        self._versions: Dict[str, int] = {}
+        # (event URL, seat index) -> (color it became, monotonic time of the change)
+        self.pending_free: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._churn_task: Optional[asyncio.Task] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def performance_urls(self) -> List[str]:
+        return [f"{self.base_url}/performances/perf-{k}" for k in range(self.performances)]
+
+    def event_url(self, perf: int, event: int) -> str:
+        return f"{self.base_url}/events/{perf}-{event}"
+
+    def _seed_colors(self) -> None:
+        for k in range(self.performances):
+            for m in range(self.events):
+                self._colors[self.event_url(k, m)] = [
+                    self._rng.choice(FREE_COLORS) if self._rng.random() < 0.3 else TAKEN_COLOR
+                    for _ in range(self.seats)
+                ]
+
+    def churn(self) -> int:
+        """
+        Recolors a random subset of seats of every event.
+
+        :return: Number of seats that became free (or changed free color).
+        """
+        now = time.monotonic()
+        freed = 0
+        count = max(1, int(self.seats * self.churn_ratio))
+        for url, colors in self._colors.items():
+            for index in self._rng.sample(range(self.seats), count):
+                color = self._rng.choice(FREE_COLORS + [TAKEN_COLOR] * 3)
+                if color == colors[index]:
+                    continue
+                colors[index] = color
+                self._versions[url] = self._versions.get(url, 0) + 1
+                if color == TAKEN_COLOR:
+                    self.pending_free.pop((url, index), None)
+                else:
+                    self.pending_free[(url, index)] = (color, now)
+                    freed += 1
+        return freed
+
+    def detected(self, event_url: str, rects: List[dict], at: float) -> List[float]:
+        """
+        Resolves pending free seats that are visible in the given rects.
+
+        :param event_url: The checked event.
+        :param rects: Rects as extracted by the monitor.
+        :param at: Monotonic time the check completed.
+        :return: Detection latencies in seconds.
+        """
+        latencies = []
+        for item in rects:
+            key = (event_url, item["index"])
+            pending = self.pending_free.get(key)
+            if pending is not None and pending[0] == item["color"]:
+                latencies.append(at - pending[1])
+                del self.pending_free[key]
+        return latencies
+
+    async def _listing(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        k = int(request.match_info["perf"])
+        links = "\n".join(
+            f'<a href="{self.event_url(k, m)}">Дата {m}</a>' for m in range(self.events)
+        )
+        return web.Response(text=f"<html><body><h1>Вистава {k}</h1>{links}</body></html>",
+                            content_type="text/html")
+
+    async def _event(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        k, m = request.match_info["perf"], request.match_info["event"]
+        colors = self._colors.get(self.event_url(int(k), int(m)))
+        if colors is None:
+            raise web.HTTPNotFound()
+        etag = f'"{k}-{m}-{self._versions.get(self.event_url(int(k), int(m)), 0)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        rects = "".join(
+            f'<rect x="{(i % SEATS_PER_ROW) * 12}" y="{(i // SEATS_PER_ROW) * 12}" '
+            f'width="10" height="10" fill="{color}"/>'
+            for i, color in enumerate(colors)
+        )
+        html = (
+            f"<html><body><h1>Вистава {k}</h1>"
+            f'<div class="event-date">{int(m) % 28 + 1} квітня, 19:00</div>'
+            f"<svg>{rects}</svg></body></html>"
+        )
+        return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+
+    async def _churn_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.churn_interval)
+            self.churn()
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/performances/perf-{perf}", self._listing)
+        app.router.add_get("/events/{perf}-{event}", self._event)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._seed_colors()
+
+    def start_churn(self) -> None:
+        if self._churn_task is None:
+            self._churn_task = asyncio.ensure_future(self._churn_loop())
+
+    async def close(self) -> None:
+        if self._churn_task is not None:
+            self._churn_task.cancel()
+            await asyncio.gather(self._churn_task, return_exceptions=True)
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,74 @@
+# browser_daemon.py
+#
+# Long-running Chromium that monitors attach to over CDP (BROWSER_CDP_URL), so a
+# restart of the monitor skips the browser launch and keeps a warm profile and
+# disk cache. Start it once and leave it running:
+#   python -m browser_daemon --port 9222 --user-data-dir browser-profile
+#   BROWSER_CDP_URL=http://127.0.0.1:9222 python main.py
+# In sharded mode shard n attaches to port 9222 + n; start one browser per shard:
+#   python -m browser_daemon --port 9222 --user-data-dir browser-profile --shards 4
+
+import argparse
+import asyncio
+import logging
+import os
+from typing import List
+
+from playwright.async_api import async_playwright
+
+
+async def serve(port: int, user_data_dir: str, warm_urls: List[str], logger: logging.Logger,
+                shards: int = 1) -> None:
+    """
+    Launches persistent-profile Chromiums with local CDP endpoints and keeps them alive until cancelled.
+
+    :param port: Remote debugging port, bound to 127.0.0.1 only.
+    :param user_data_dir: Profile directory (cookies, disk cache) reused across daemon restarts.
+    :param warm_urls: Pages loaded once at startup to fill the disk cache.
+    :param logger: A configured logger.
+    :param shards: Number of browsers, on ports port..port+shards-1 with profiles user_data_dir/shard<n>.
+    """
+    async with async_playwright() as playwright:
+        contexts = []
+        try:
+            for n in range(shards):
+                profile = os.path.join(user_data_dir, f"shard{n}") if shards > 1 else user_data_dir
+                context = await playwright.chromium.launch_persistent_context(
+                    profile,
+                    headless=True,
+                    args=[f"--remote-debugging-port={port + n}", "--remote-debugging-address=127.0.0.1"]
+                )
+                contexts.append(context)
+                for url in warm_urls:
+                    page = await context.new_page()
+                    try:
+                        await page.goto(url, wait_until="load")
+                    except Exception as e:
+                        logger.warning(f"Could not warm {url}: {e}")
+                    finally:
+                        await page.close()
+                logger.info(f"Browser listening on http://127.0.0.1:{port + n} with profile {profile}.")
+            await asyncio.Event().wait()
+        finally:
+            for context in contexts:
+                await context.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a persistent browser for monitors to attach to over CDP.")
+    parser.add_argument("--port", type=int, default=9222, help="Remote debugging port")
+    parser.add_argument("--user-data-dir", default="browser-profile", help="Persistent profile directory")
+    parser.add_argument("--warm", nargs="*", default=[], metavar="URL", help="Pages to load once at startup")
+    parser.add_argument("--shards", type=int, default=1, help="Browsers to run, one per shard (SHARDS)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    logger = logging.getLogger("browser_daemon")
+    try:
+        asyncio.run(serve(args.port, args.user_data_dir, args.warm, logger, args.shards))
+    except KeyboardInterrupt:
+        logger.info("Browser daemon stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+# browser_recycler.py
+
+import asyncio
+import os
+import time
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from playwright.async_api import Browser, BrowserContext, Playwright
+
+from page_pool import PagePool
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_rss_bytes(pids: Iterable[int]) -> Optional[int]:
+    """
+    Sums the resident set size of the given processes from /proc.
+
+    :param pids: Process IDs.
+    :return: Total RSS in bytes, or None if /proc is not available.
+    """
+    total = 0
+    found = False
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * _PAGE_SIZE
+            found = True
+        except (OSError, ValueError, IndexError):
+            continue
+    return total if found else None
+
+
+def profile_pids(user_data_dir: str) -> List[int]:
+    """
+    Finds the Chromium running on a profile directory and all of its descendant processes in /proc.
+    A persistent context has no Browser object to ask over CDP, and Chromium is a child of the
+    Playwright driver rather than of this process.
+
+    :param user_data_dir: The profile directory the browser was launched with.
+    :return: Process IDs of the browser and its zygotes, renderers and helpers (empty if not found).
+    """
+    flag = f"--user-data-dir={os.path.abspath(user_data_dir)}".encode()
+    roots = []
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return []
+    for pid in entries:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                # The command name may contain spaces; the parent PID follows the closing parenthesis.
+                ppid = int(f.read().rsplit(b")", 1)[1].split()[1])
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(pid)
+        if flag in args and not any(arg.startswith(b"--type=") for arg in args):
+            roots.append(pid)
+    pids = []
+    while roots:
+        pid = roots.pop()
+        pids.append(pid)
+        roots.extend(children.get(pid, []))
+    return pids
+
+
+class BrowserGeneration:
+    """
+    One launched or attached browser with its context and page pool.
+    """
+
+    def __init__(self, number: int, browser: Optional[Browser], context: BrowserContext, pool: PagePool,
+                 owns_context: bool = True, profile: Optional[str] = None) -> None:
+        """
+        :param number: Generation counter.
+        :param browser: The browser (None for a persistent context, which has no Browser object).
+        :param context: The context pages are opened in.
+        :param pool: The page pool of the context.
+        :param owns_context: False when the context belongs to an attached browser and must outlive us.
+        :param profile: Profile directory of a persistent context, used to find its processes.
+        """
+        self.number = number
+        self.browser = browser
+        self.context = context
+        self.pool = pool
+        self.owns_context = owns_context
+        self.profile = profile
+        self.started_at = time.monotonic()
+
+    @property
+    def uptime(self) -> float:
+        return time.monotonic() - self.started_at
+
+    async def rss_bytes(self) -> Optional[int]:
+        """
+        RSS of all Chromium processes of this browser, or None if it cannot be measured.
+        An attached browser keeps running across generations, so recycling cannot reclaim its memory.
+        """
+        if not self.owns_context:
+            return None
+        if self.browser is None:
+            if self.profile is None:
+                return None
+            pids = await asyncio.get_running_loop().run_in_executor(None, profile_pids, self.profile)
+            return process_rss_bytes(pids)
+        try:
+            session = await self.browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+        except Exception:
+            return None
+        return process_rss_bytes(process["id"] for process in info.get("processInfo", []))
+
+
+class BrowserRecycler:
+    """
+    Owns the browser, context and page pool used by the monitor and replaces
+    them when the current generation exceeds its page-count, RSS or uptime
+    budget. The replacement is launched and warmed before it takes over; the
+    old generation is closed in the background once its leased pages are
+    released (or the drain timeout passes).
+
+    Instead of launching a fresh browser, a generation can attach over CDP to a
+    long-running browser (python -m browser_daemon) and use its default
+    context, whose profile and disk cache survive restarts. Detaching leaves
+    that browser running. Alternatively, a launched browser can keep its
+    profile in user_data_dir; generations alternate between two profile
+    directories there, because Chromium locks a profile while it runs.
+    """
+
+    def __init__(self, playwright: Playwright, logger: logging.Logger, pool_size: int, page_max_uses: int,
+                 max_pages: int = 0, max_rss_mb: float = 0, max_uptime: float = 0,
+                 drain_timeout: float = 120,
+                 setup_context: Optional[Callable[[BrowserContext], Awaitable[None]]] = None,
+                 cdp_url: str = "", user_data_dir: str = "") -> None:
+        """
+        :param playwright: The running Playwright instance.
+        :param logger: A configured logger.
+        :param pool_size: Size of each generation's page pool.
+        :param page_max_uses: Passed to PagePool as max_uses.
+        :param max_pages: Recycle after this many page leases (0 disables it).
+        :param max_rss_mb: Recycle when Chromium's RSS exceeds this many megabytes (0 disables it).
+        :param max_uptime: Recycle after this many seconds (0 disables it).
+        :param drain_timeout: Seconds to wait for leased pages of a retired generation before closing it.
+        :param setup_context: Coroutine applied to every new context (e.g. request interception).
+        :param cdp_url: Attach to the browser at this CDP endpoint (falls back to launching if it is unreachable).
+        :param user_data_dir: Directory for persistent profiles of launched browsers.
+        """
+        self.playwright = playwright
+        self.logger = logger
+        self.pool_size = pool_size
+        self.page_max_uses = page_max_uses
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.max_uptime = max_uptime
+        self.drain_timeout = drain_timeout
+        self.setup_context = setup_context
+        self.cdp_url = cdp_url
+        self.user_data_dir = user_data_dir
+        self.mode = "launched"
+        self._rss_unavailable_logged = False
+        self._current: Optional[BrowserGeneration] = None
+        self._generations = 0
+        self._retired: List[BrowserGeneration] = []
+        self._draining: List[asyncio.Task] = []
+
+    @property
+    def context(self) -> BrowserContext:
+        return self._current.context
+
+    @property
+    def pool(self) -> PagePool:
+        return self._current.pool
+
+    @property
+    def keeps_cache(self) -> bool:
+        """
+        True when the current context has a disk cache that survives restarts (attached or persistent profile).
+        """
+        return self.mode != "launched"
+
+    async def _open(self) -> Tuple[Optional[Browser], BrowserContext, bool, Optional[str]]:
+        chromium = self.playwright.chromium
+        if self.cdp_url:
+            try:
+                browser = await chromium.connect_over_cdp(self.cdp_url)
+            except Exception as e:
+                self.logger.warning(f"Could not attach to {self.cdp_url}, launching a browser instead: {e}")
+            else:
+                self.mode = "attached over CDP"
+                if browser.contexts:
+                    # The daemon's default context carries its profile and warm disk cache.
+                    return browser, browser.contexts[0], False, None
+                return browser, await browser.new_context(), True, None
+        if self.user_data_dir:
+            self.mode = "persistent profile"
+            profile = os.path.join(self.user_data_dir, f"profile-{self._generations % 2}")
+            return None, await chromium.launch_persistent_context(profile, headless=True), True, profile
+        self.mode = "launched"
+        browser = await chromium.launch(headless=True)
+        try:
+            return browser, await browser.new_context(), True, None
+        except Exception:
+            await browser.close()
+            raise
+
+    async def _launch(self) -> BrowserGeneration:
+        self._generations += 1
+        browser, context, owns_context, profile = await self._open()
+        generation = BrowserGeneration(self._generations, browser, context,
+                                       PagePool(context, self.pool_size, self.logger, self.page_max_uses),
+                                       owns_context, profile)
+        try:
+            if self.setup_context is not None:
+                await self.setup_context(context)
+            await generation.pool.warm(self.pool_size)
+        except Exception:
+            await self._close(generation)
+            raise
+        return generation
+
+    async def start(self) -> None:
+        """
+        Launches the first generation.
+        """
+        self._current = await self._launch()
+
+    async def recycle_reason(self) -> Optional[str]:
+        """
+        Returns why the current generation should be replaced, or None if it is within budget.
+        """
+        current = self._current
+        if self.max_pages and current.pool.total_leases >= self.max_pages:
+            return f"{current.pool.total_leases} pages served"
+        if self.max_uptime and current.uptime >= self.max_uptime:
+            return f"uptime {current.uptime / 3600:.1f}h"
+        if self.max_rss_mb:
+            rss = await current.rss_bytes()
+            if rss is None and current.owns_context and not self._rss_unavailable_logged:
+                self._rss_unavailable_logged = True
+                self.logger.warning(f"Cannot measure browser RSS ({self.mode}), BROWSER_MAX_RSS_MB does not apply.")
+            if rss is not None and rss / 2 ** 20 >= self.max_rss_mb:
+                return f"RSS {rss / 2 ** 20:.0f} MB"
+        return None
+
+    async def maybe_recycle(self) -> bool:
+        """
+        Replaces the current generation if it exceeds a budget.
+
+        :return: True if a new generation took over (its context differs from the previous one).
+        """
+        reason = await self.recycle_reason()
+        if reason is None:
+            return False
+        old = self._current
+        started = time.monotonic()
+        try:
+            new = await self._launch()
+        except Exception as e:
+            self.logger.error(f"Could not launch replacement browser, keeping generation {old.number}: {e}")
+            return False
+        self._current = new
+        self._retired.append(old)
+        self.logger.info(
+            f"Recycled browser generation {old.number} ({reason}); generation {new.number} "
+            f"warmed in {time.monotonic() - started:.2f}s."
+        )
+        task = asyncio.ensure_future(self._drain(old))
+        self._draining.append(task)
+        task.add_done_callback(self._draining.remove)
+        return True
+
+    async def _drain(self, generation: BrowserGeneration) -> None:
+        deadline = time.monotonic() + self.drain_timeout
+        while generation.pool.leased_pages and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+        if generation.pool.leased_pages:
+            self.logger.warning(f"Closing browser generation {generation.number} with "
+                                f"{generation.pool.leased_pages} pages still leased.")
+        self._retired.remove(generation)
+        await self._close(generation)
+
+    async def _close(self, generation: BrowserGeneration) -> None:
+        try:
+            await generation.pool.close()
+            if generation.owns_context:
+                await generation.context.close()
+            if generation.browser is not None:
+                # For an attached browser this only disconnects; the daemon keeps running.
+                await generation.browser.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing browser generation {generation.number}: {e}")
+
+    async def close(self) -> None:
+        """
+        Closes the current generation and any generation still draining.
+        """
+        for task in list(self._draining):
+            task.cancel()
+        await asyncio.gather(*self._draining, return_exceptions=True)
+        for generation in self._retired:
+            await self._close(generation)
+        self._retired.clear()
+        if self._current is not None:
+            await self._close(self._current)
+            self._current = None
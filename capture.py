@@ -0,0 +1,216 @@
+# capture.py
+#
+# Record-and-replay of scraped pages.
+# Replay a capture through the diff/notify pipeline without a browser:
+#   python -m capture captures/capture-20250412.jsonl.gz [--print-messages]
+
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+from notifier import Notifier
+from seat_state import seat_key
+
+
+def _encode_rects(rects: List[Dict[str, Any]]) -> Dict[str, Any]:
+    encoded: Dict[str, Any] = {"colors": [item["color"] for item in rects]}
+    indices = [item["index"] for item in rects]
+    if indices != list(range(len(indices))):
+        encoded["indices"] = indices
+    keys = [seat_key(item) for item in rects]
+    if any(not key.startswith("idx:") for key in keys):
+        encoded["keys"] = keys
+    return encoded
+
+
+def _decode_rects(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    indices = record.get("indices") or range(len(record["colors"]))
+    rects = [{"index": index, "color": color} for index, color in zip(indices, record["colors"])]
+    for item, key in zip(rects, record.get("keys") or []):
+        item["key"] = key
+    return rects
+
+
+class CaptureWriter:
+    """
+    Records extracted pages to gzip-compressed JSON lines, one file per day.
+
+    Record types:
+      - "event": url, perf, title, datetime, seat colors, stable seat keys and optionally raw HTML.
+      - "discovery": the full (event_url, performance_url) list, written only when it changes.
+    Records are buffered on the event loop and written off it by flush().
+    """
+
+    def __init__(self, directory: str, logger: logging.Logger, include_html: bool = False) -> None:
+        """
+        :param directory: Directory the capture files are written to.
+        :param logger: A configured logger.
+        :param include_html: Whether raw page HTML is recorded as well.
+        """
+        self.directory = directory
+        self.logger = logger
+        self.include_html = include_html
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_links: Optional[List[List[str]]] = None
+
+    def record_event(self, event_url: str, performance_url: str, show_title: str, event_datetime: str,
+                     rects: List[Dict[str, Any]], html: Optional[str] = None) -> None:
+        record = {"t": time.time(), "type": "event", "url": event_url, "perf": performance_url,
+                  "title": show_title, "datetime": event_datetime, **_encode_rects(rects)}
+        if self.include_html and html is not None:
+            record["html"] = html
+        self._buffer.append(record)
+
+    def record_discovery(self, event_links: List[Tuple[str, str]]) -> None:
+        links = sorted([event_url, perf_url] for event_url, perf_url in event_links)
+        if links != self._last_links:
+            self._last_links = links
+            self._buffer.append({"t": time.time(), "type": "discovery", "links": links})
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, f"capture-{datetime.now():%Y%m%d}.jsonl.gz")
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # Appending adds a new gzip member; readers see one continuous stream.
+        with gzip.open(self._path(), "at", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    async def flush(self) -> None:
+        """
+        Writes buffered records in an executor thread.
+        """
+        if not self._buffer:
+            return
+        records, self._buffer = self._buffer, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, records)
+        except Exception as e:
+            self.logger.error(f"Error writing capture records: {e}")
+
+
+def read_capture(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the records of capture files in order, with event rects decoded.
+
+    :param paths: Capture files (a directory expands to its capture-*.jsonl.gz files).
+    """
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "capture-*.jsonl.gz"))) if os.path.isdir(path) else [path]
+        for file in files:
+            with gzip.open(file, "rt", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["type"] == "event":
+                        record["rects"] = _decode_rects(record)
+                    yield record
+
+
+class ReplayClock:
+    """
+    Monotonic-style clock that follows the recorded timestamps instead of real time.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CollectingNotifier(Notifier):
+    def __init__(self, echo: bool = False) -> None:
+        self.messages: List[str] = []
+        self.echo = echo
+
+    def send_message(self, message: str) -> None:
+        self.messages.append(message)
+        if self.echo:
+            print(message)
+
+
+async def replay(records: Iterable[Dict[str, Any]], monitor: Any,
+                 flush_interval: float = Config.SLEEP_INTERVAL) -> Dict[str, Any]:
+    """
+    Feeds recorded pages through monitor.process_event as fast as possible.
+    Discovery records drive the first-seen logic, and the coalescer is flushed
+    every flush_interval seconds of recorded time, as in the live loop.
+
+    :param records: Records from read_capture.
+    :param monitor: A PerformanceMonitor (no browser is started).
+    :param flush_interval: Recorded seconds between coalescer flushes.
+    :return: Replay statistics.
+    """
+    clock = ReplayClock()
+    monitor.coalescer.clock = clock
+    events = discoveries = 0
+    next_flush: Optional[float] = None
+    started = time.perf_counter()
+    for record in records:
+        clock.now = record["t"]
+        if next_flush is None:
+            next_flush = record["t"] + flush_interval
+        while record["t"] >= next_flush:
+            clock.now = next_flush
+            monitor.coalescer.flush()
+            next_flush += flush_interval
+        clock.now = record["t"]
+        if record["type"] == "discovery":
+            discoveries += 1
+            monitor.note_discovered([tuple(link) for link in record["links"]])
+        elif record["type"] == "event":
+            events += 1
+            await monitor.process_event(record["url"], record["perf"], record["title"],
+                                        record["datetime"], record["rects"])
+    if next_flush is not None:
+        clock.now = next_flush + monitor.coalescer.debounce_window
+        monitor.coalescer.flush()
+    elapsed = time.perf_counter() - started
+    return {"events": events, "discoveries": discoveries, "seconds": elapsed,
+            "events_per_s": events / elapsed if elapsed else 0.0}
+
+
+def replay_config() -> Config:
+    """
+    Config for replays: everything that would write to the live stores (metrics port,
+    captures, seat history, saved seat states) is switched off.
+    """
+    cfg = Config()
+    cfg.METRICS_ENABLED = False
+    cfg.CAPTURE_DIR = ""
+    cfg.HISTORY_DIR = ""
+    cfg.STATE_DB_PATH = ""
+    return cfg
+
+
+def main() -> None:
+    from monitor import PerformanceMonitor
+
+    parser = argparse.ArgumentParser(description="Replay captured pages through the diff/notify pipeline.")
+    parser.add_argument("paths", nargs="+", help="Capture files or directories")
+    parser.add_argument("--print-messages", action="store_true", help="Print the notifications that would be sent")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("capture_replay")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    notifier = CollectingNotifier(echo=args.print_messages)
+    monitor = PerformanceMonitor(notifier, replay_config(), logger, performance_urls=[], send_notification=True)
+    stats = asyncio.run(replay(read_capture(args.paths), monitor))
+    print(f"Replayed {stats['events']} event pages and {stats['discoveries']} discovery updates "
+          f"in {stats['seconds']:.2f}s ({stats['events_per_s']:.0f} events/s); "
+          f"{len(notifier.messages)} notifications.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
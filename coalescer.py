@@ -0,0 +1,154 @@
+# coalescer.py
+
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from config import Config
+from notifier import Notifier
+
+
+@dataclass
+class SeatAlert:
+    """
+    New free seats found for one event.
+    """
+    show_title: str
+    event_datetime: str
+    event_url: str
+    performance_url: str
+    new_seats: int
+
+
+def format_alert(alert: SeatAlert) -> str:
+    """
+    Formats a single-event alert (the classic notification text).
+    """
+    return (
+        f"\n🎭 *{alert.show_title}*"
+        f"\n🕒 {alert.event_datetime}"
+        f"\n🎟 Нові вільні місця: {alert.new_seats}"
+        f"\n🔗 [Перейти до події]({alert.event_url})"
+    )
+
+
+def format_digest(alerts: List[SeatAlert]) -> str:
+    """
+    Formats the alerts of one show as a single digest message.
+    """
+    if len(alerts) == 1:
+        return format_alert(alerts[0])
+    lines = [f"\n🎭 *{alerts[0].show_title}*", f"🎟 Нові вільні місця на {len(alerts)} дат:"]
+    for alert in alerts:
+        lines.append(f"🕒 {alert.event_datetime} — {alert.new_seats} [→]({alert.event_url})")
+    return "\n".join(lines)
+
+
+def format_overflow(alerts: List[SeatAlert]) -> str:
+    """
+    Formats a one-line-per-show summary for alerts beyond the message cap.
+    """
+    totals: "OrderedDict[str, List[int]]" = OrderedDict()
+    for alert in alerts:
+        entry = totals.setdefault(alert.show_title, [0, 0])
+        entry[0] += 1
+        entry[1] += alert.new_seats
+    lines = ["\n🎟 Також нові вільні місця:"]
+    for title, (dates, seats) in totals.items():
+        lines.append(f"🎭 {title}: {seats} місць на {dates} дат")
+    return "\n".join(lines)
+
+
+class NotificationCoalescer:
+    """
+    Sits between the monitor and a Notifier and limits message volume.
+
+    - Alerts for an event seen for the first time are sent immediately.
+    - Other alerts are held until flush(); alerts for an event notified less
+      than debounce_window seconds ago are merged and held until the window ends.
+    - On flush, ready alerts are merged into one digest per show and at most
+      max_messages are sent; the rest is summarized in the last message.
+    """
+
+    def __init__(self, notifier: Notifier, logger: logging.Logger,
+                 debounce_window: float = Config.NOTIFY_DEBOUNCE_WINDOW,
+                 max_messages: int = Config.NOTIFY_MAX_MESSAGES,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param notifier: The notifier messages are delivered through.
+        :param logger: A configured logger.
+        :param debounce_window: Minimum seconds between two notifications about the same event.
+        :param max_messages: Maximum number of messages sent per flush.
+        :param clock: Time source in seconds (replays substitute the recorded time).
+        """
+        self.notifier = notifier
+        self.logger = logger
+        self.debounce_window = debounce_window
+        self.max_messages = max(max_messages, 1)
+        self.clock = clock
+        self._pending: "OrderedDict[str, SeatAlert]" = OrderedDict()
+        self._last_sent: Dict[str, float] = {}
+
+    def _send(self, message: str) -> None:
+        self.logger.info(message)
+        self.notifier.send_message(message)
+
+    def add(self, alert: SeatAlert, first_seen: bool = False) -> None:
+        """
+        Registers an alert.
+
+        :param alert: The alert.
+        :param first_seen: True if the event has just appeared; such alerts bypass coalescing.
+        """
+        if first_seen:
+            self._last_sent[alert.event_url] = self.clock()
+            self._pending.pop(alert.event_url, None)
+            self._send(format_alert(alert))
+            return
+        pending = self._pending.get(alert.event_url)
+        if pending is not None:
+            # Merge repeated changes: keep the latest texts and add up the seats.
+            alert.new_seats += pending.new_seats
+        self._pending[alert.event_url] = alert
+
+    def flush(self) -> int:
+        """
+        Sends the ready alerts as per-show digests.
+
+        :return: Number of messages sent.
+        """
+        now = self.clock()
+        ready = [
+            alert for url, alert in self._pending.items()
+            if now - self._last_sent.get(url, float("-inf")) >= self.debounce_window
+        ]
+        if not ready:
+            return 0
+        for alert in ready:
+            del self._pending[alert.event_url]
+            self._last_sent[alert.event_url] = now
+
+        by_show: "OrderedDict[str, List[SeatAlert]]" = OrderedDict()
+        for alert in ready:
+            by_show.setdefault(alert.performance_url, []).append(alert)
+        digests = list(by_show.values())
+
+        if len(digests) <= self.max_messages:
+            for alerts in digests:
+                self._send(format_digest(alerts))
+            return len(digests)
+
+        for alerts in digests[:self.max_messages - 1]:
+            self._send(format_digest(alerts))
+        overflow = [alert for alerts in digests[self.max_messages - 1:] for alert in alerts]
+        self._send(format_overflow(overflow))
+        return self.max_messages
+
+    def forget(self, event_url: str) -> None:
+        """
+        Drops pending alerts and debounce state of an event that is no longer monitored.
+        """
+        self._pending.pop(event_url, None)
+        self._last_sent.pop(event_url, None)
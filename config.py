@@ -1,7 +1,7 @@
 # config.py
 
 import os
-from typing import List
+from typing import Any, Dict, List
 from dotenv import load_dotenv
 
 load_dotenv()  # Load variables from .env file
@@ -16,13 +16,114 @@ class Config:
     BOT_TOKEN: str = os.getenv("BOT_TOKEN")
     CHAT_IDS: List[str] = os.getenv("CHAT_IDS", "").split(",")
 
+    # Notification coalescing
+    NOTIFY_DEBOUNCE_WINDOW: int = 60  # Minimum seconds between two alerts about the same event
+    NOTIFY_MAX_MESSAGES: int = 5      # Maximum messages per flush; the rest is merged into a summary
+
+    # Seat-state persistence for warm restarts (empty disables it)
+    STATE_DB_PATH: str = os.getenv("STATE_DB_PATH", "seat_state.db")
+
+    # Sharded mode: performances are split across worker processes, each with its own browser
+    SHARDS: int = int(os.getenv("SHARDS", "1"))  # Number of worker processes (1 runs in-process)
+    SHARD_HEARTBEAT_INTERVAL: int = 10   # Seconds between worker heartbeats
+    SHARD_HEARTBEAT_TIMEOUT: int = 120   # Restart a worker after this many seconds without a heartbeat
+    SHARD_RESTART_BACKOFF: float = 5.0   # Delay before the first restart of a failed worker, doubled per failure
+    SHARD_RESTART_BACKOFF_MAX: float = 600.0  # Upper bound for the restart delay
+    SHARD_MAX_RESTARTS: int = 10         # Consecutive failed starts after which a worker is left stopped
+    SHARD_STOP_TIMEOUT: int = 30         # Seconds a worker gets to flush its state before it is terminated
+    SHARD_REBALANCE_INTERVAL: int = 300  # Seconds between rebalancing decisions
+    SHARD_REBALANCE_BACKLOG: int = 20    # Overdue-event gap between shards that triggers a move
+
+    # Event links on performance pages: hrefs containing the pattern; relative hrefs are joined to the base
+    EVENT_LINK_PATTERN: str = os.getenv("EVENT_LINK_PATTERN", "sales.ft.org.ua/events/")
+    EVENT_LINK_BASE: str = os.getenv("EVENT_LINK_BASE", "https://sales.ft.org.ua")
+
+    # Capture mode: extracted pages are recorded for replay (python -m capture); empty disables it
+    CAPTURE_DIR: str = os.getenv("CAPTURE_DIR", "")
+    CAPTURE_HTML: bool = os.getenv("CAPTURE_HTML", "") == "1"  # Also record raw page HTML
+
+    # Seat history: every seat change is appended to a columnar store (python -m history); empty disables it
+    HISTORY_DIR: str = os.getenv("HISTORY_DIR", "")
+    HISTORY_SEGMENT_RECORDS: int = 1 << 20  # Rows per segment (18 bytes each, files are created sparse)
+    HISTORY_FLUSH_INTERVAL: float = 5.0     # Seconds between flushes of the current segment to disk
+
     # Colors to be ignored when checking for free seats
     IGNORED_COLORS: set = {"rgb(173, 173, 173)", "rgb(255, 255, 255)"}
 
+    # Only alert about new seats that are part of at least this many adjacent free seats in a row
+    # (1 alerts about every new seat; needs row/seat labels or x/y geometry on the seat rects)
+    MIN_ADJACENT_SEATS: int = int(os.getenv("MIN_ADJACENT_SEATS", "1"))
+
     # Timing configurations
-    SLEEP_INTERVAL: int = 10       # Seconds between monitoring cycles
-    MIN_CHECK_INTERVAL: int = 5    # Minimal wait in seconds between full checks
+    SLEEP_INTERVAL: int = 10       # Seconds between discovery syncs, state flushes and stats logging
+    MIN_CHECK_INTERVAL: int = 5    # Shortest interval in seconds between two checks of the same event
+
+    # Adaptive polling: each event's interval grows from MIN_CHECK_INTERVAL up to POLL_MAX_INTERVAL
+    POLL_MAX_INTERVAL: int = 900         # Longest interval in seconds between two checks of an event
+    POLL_STALENESS_SCALE: int = 3600     # Seconds without a seat change after which the interval doubles
+    POLL_HORIZON_DAYS: float = 7.0       # Days until the show after which the interval doubles
+    DISCOVERY_TTL: int = 3600      # Seconds before a performance page is crawled again for event links
+    DISCOVERY_QUEUE_SIZE: int = 64 # Discovered link sets waiting to be merged before crawls block
+    DISCOVERY_EMPTY_LIMIT: int = 3 # Consecutive empty crawls after which a performance's cached links are cleared
+
+    # Live watch: hot event URLs kept open in a tab with an in-page MutationObserver
+    LIVE_WATCH_URLS: List[str] = []
+    LIVE_SOFT_REFRESH: int = 300   # Seconds between reloads of a live-watched tab
+    LIVE_DEBOUNCE_MS: int = 200    # In-page delay used to batch seat map mutations
 
     # Playwright page load timeouts (in milliseconds)
     NAVIGATION_TIMEOUT: int = 60000  # 60 seconds
-    WAIT_TIMEOUT: int = 1000         # 1 second
+    WAIT_TIMEOUT: int = 1000         # 1 second, used for page types without a readiness condition
+
+    # Readiness conditions per page type: wait until `selector` matches at least `min_count`
+    # elements and the count has been stable for `stable_ms`, but no longer than `timeout_ms`.
+    READINESS: Dict[str, Dict[str, Any]] = {
+        "event": {"selector": "svg rect", "min_count": 1, "stable_ms": 300, "timeout_ms": 10000},
+        "listing": {"selector": "a[href*='/events/']", "min_count": 1, "stable_ms": 0, "timeout_ms": 10000},
+    }
+
+    # Scheduling of event checks
+    MAX_CONCURRENT_PAGES: int = 5  # Maximum number of pages open at the same time
+    HOST_RATE_LIMIT: float = 2.0   # Navigations per second allowed for each host
+    HOST_BURST: int = 5            # Navigations a host may receive in a single burst
+
+    # Page pool
+    PAGE_POOL_SIZE: int = 5        # Maximum number of warm pages kept by the pool
+    PAGE_MAX_USES: int = 200       # Replace a pooled page after this many uses (0 disables it)
+
+    # Browser recycling: a fresh browser is launched and warmed, then the old one is drained
+    BROWSER_MAX_PAGES: int = 5000       # Recycle after this many page loads (0 disables it)
+    BROWSER_MAX_RSS_MB: int = 1500      # Recycle when Chromium's resident memory exceeds this (0 disables it)
+    BROWSER_MAX_UPTIME: int = 6 * 3600  # Recycle after this many seconds (0 disables it)
+    BROWSER_DRAIN_TIMEOUT: int = 120    # Seconds to wait for in-flight pages before closing the old browser
+    # Attach to a running browser (python -m browser_daemon) instead of launching one, e.g. http://127.0.0.1:9222
+    BROWSER_CDP_URL: str = os.getenv("BROWSER_CDP_URL", "")
+    # Keep launched browsers' profiles and disk cache in this directory across restarts
+    BROWSER_USER_DATA_DIR: str = os.getenv("BROWSER_USER_DATA_DIR", "")
+
+    # Metrics endpoint (Prometheus text on /metrics, JSON on /metrics.json)
+    METRICS_ENABLED: bool = True
+    METRICS_HOST: str = "127.0.0.1"  # Keep local: the endpoint has no authentication
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9108"))
+
+    # Network profile (request interception on the browser context)
+    NETWORK_PROFILE_ENABLED: bool = True
+    NETWORK_PROFILE_DRY_RUN: bool = False  # Count matching requests without blocking them
+    BLOCK_RESOURCE_TYPES: set = {"image", "media", "font"}
+    BLOCK_URL_PATTERNS: List[str] = [
+        r"google-analytics\.com",
+        r"googletagmanager\.com",
+        r"connect\.facebook\.net",
+        r"doubleclick\.net",
+        r"hotjar\.com",
+    ]
+    ALLOW_URL_PATTERNS: List[str] = []  # Matching URLs are never blocked
+
+    # Browserless HTTP fast path for event pages (falls back to Playwright when unresolved)
+    HTTP_ENGINE_URLS: List[str] = []  # Performance URLs whose events are fetched over plain HTTP
+    HTTP_MAX_CONNECTIONS: int = 20    # Size of the pooled HTTP connection pool
+    HTTP_BROWSER_RETRY: int = 3600    # Seconds an event that needed the browser skips the HTTP attempt
+    HTTP_USER_AGENT: str = (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0 Safari/537.36"
+    )
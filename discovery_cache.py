@@ -0,0 +1,147 @@
+# discovery_cache.py
+
+import asyncio
+import time
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Returns a performance's event links, or None when the crawl failed.
+Loader = Callable[[str], Awaitable[Optional[List[Tuple[str, str]]]]]
+
+
+class _Entry:
+    def __init__(self, links: List[Tuple[str, str]], loaded_at: float) -> None:
+        self.links = links
+        self.loaded_at = loaded_at
+        self.stale = False
+        self.empty_results = 0
+
+
+class DiscoveryCache:
+    """
+    Caches the event links discovered on each performance page.
+
+    Expired or invalidated entries keep serving their last known links while
+    a background task re-crawls the listing page.
+
+    With an updates queue, every crawl that changes a performance's links puts
+    (performance_url, links, crawl_started) on it as soon as it finishes, so a
+    consumer can start checking one performance's events while the others are
+    still being crawled. A bounded queue makes crawls wait for the consumer.
+    """
+
+    def __init__(self, ttl: float, logger: logging.Logger, updates: Optional[asyncio.Queue] = None,
+                 empty_limit: int = 3) -> None:
+        """
+        :param ttl: Seconds a discovered link set stays fresh.
+        :param logger: A configured logger.
+        :param updates: Optional queue receiving changed link sets.
+        :param empty_limit: Consecutive empty crawls after which the cached links are replaced by the empty result.
+        """
+        self.ttl = ttl
+        self.empty_limit = empty_limit
+        self.logger = logger
+        self.updates = updates
+        self._entries: Dict[str, _Entry] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def _is_fresh(self, entry: Optional[_Entry]) -> bool:
+        return entry is not None and not entry.stale and time.monotonic() - entry.loaded_at < self.ttl
+
+    async def _load(self, perf_url: str, loader: Loader) -> None:
+        started = time.monotonic()
+        links = await loader(perf_url)
+        previous = self._entries.get(perf_url)
+        if links is None:
+            # A failed crawl caches nothing; the next refresh() retries.
+            if previous is not None:
+                previous.stale = True
+            return
+        if not links and previous is not None and previous.links:
+            previous.empty_results += 1
+            if previous.empty_results < self.empty_limit:
+                # A listing can come back empty transiently; keep the last known links until the next refresh.
+                self.logger.warning(f"Discovery for {perf_url} returned no links, keeping {len(previous.links)} cached "
+                                    f"({previous.empty_results}/{self.empty_limit}).")
+                previous.loaded_at = time.monotonic()
+                previous.stale = False
+                return
+            self.logger.warning(f"Discovery for {perf_url} returned no links {previous.empty_results} times in a row, "
+                                f"dropping {len(previous.links)} cached links.")
+        self._entries[perf_url] = _Entry(links, time.monotonic())
+        if self.updates is not None and (previous is None or previous.links != links):
+            await self.updates.put((perf_url, links, started))
+
+    def _refresh_in_background(self, perf_url: str, loader: Loader) -> None:
+        if perf_url in self._refreshing:
+            return
+        task = asyncio.ensure_future(self._load(perf_url, loader))
+        self._refreshing[perf_url] = task
+
+        def done(t: asyncio.Task) -> None:
+            self._refreshing.pop(perf_url, None)
+            if not t.cancelled() and t.exception() is not None:
+                self.logger.error(f"Background discovery refresh failed for {perf_url}: {t.exception()}")
+
+        task.add_done_callback(done)
+
+    def refresh(self, perf_urls: List[str], loader: Loader) -> None:
+        """
+        Starts crawls for performances that were never loaded or have expired, without waiting for them.
+        Results reach the updates queue.
+
+        :param perf_urls: Performance page URLs.
+        :param loader: Coroutine function that crawls one performance page.
+        """
+        for url in perf_urls:
+            if not self._is_fresh(self._entries.get(url)):
+                self._refresh_in_background(url, loader)
+
+    def seed(self, perf_url: str, links: List[Tuple[str, str]]) -> None:
+        """
+        Installs links known from a previous run. They are served right away but
+        count as stale, so the next refresh() re-crawls the performance; the crawl
+        only reaches the updates queue if the links changed.
+
+        :param perf_url: The performance page URL.
+        :param links: Its last known (event_url, performance_url) tuples.
+        """
+        if perf_url in self._entries:
+            return
+        entry = _Entry(links, time.monotonic())
+        entry.stale = True
+        self._entries[perf_url] = entry
+
+    def all_links(self, perf_urls: List[str]) -> List[Tuple[str, str]]:
+        """
+        Combined cached links of the given performances, without crawling.
+        """
+        return [link for url in perf_urls if url in self._entries for link in self._entries[url].links]
+
+    def invalidate(self, perf_url: str, event_url: Optional[str] = None) -> None:
+        """
+        Marks a performance for re-crawling, optionally dropping one dead event link right away.
+
+        :param perf_url: The performance page URL.
+        :param event_url: An event URL that is known to be gone (e.g. returned 404).
+        """
+        entry = self._entries.get(perf_url)
+        if entry is None:
+            return
+        if event_url is not None:
+            entry.links = [link for link in entry.links if link[0] != event_url]
+        entry.stale = True
+
+    def event_counts(self) -> Dict[str, int]:
+        """
+        Number of cached event links per performance URL.
+        """
+        return {url: len(entry.links) for url, entry in self._entries.items()}
+
+    async def close(self) -> None:
+        """
+        Cancels pending background refreshes.
+        """
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
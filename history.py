@@ -0,0 +1,535 @@
+# history.py
+#
+# Append-only seat availability history in memory-mapped columnar segments.
+# Query it from the command line:
+#   python -m history events history/
+#   python -m history stats history/ --event https://sales.ft.org.ua/events/123 [--since 2025-01-01]
+#   python -m history stats history/ --show https://ft.org.ua/performances/sluga-dvox-paniv
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import queue
+import statistics
+import struct
+import sys
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+
+# Column name, array typecode. One file per column and segment; row i of every
+# column file forms record i. Values use the native byte order.
+COLUMNS = (("ts", "q"), ("event", "I"), ("seat", "I"), ("color", "H"))
+NOT_FREE = 0  # Color code of a seat that is taken or hidden
+SNAPSHOT = 0x8000  # Color code flag of rows from a first observation (free seats that are not releases)
+DICTIONARY_FILE = "dictionary.jsonl"
+SEGMENTS_DIR = "segments"
+
+
+class Segment:
+    """
+    One fixed-capacity segment: a preallocated, memory-mapped file per column.
+
+    Timestamps (ms since the epoch) never decrease within a store and are never
+    zero, so the number of written rows is the length of the non-zero prefix
+    of the ts column, and time ranges are found by bisection.
+    """
+
+    def __init__(self, path: str, capacity: int, writable: bool = False) -> None:
+        """
+        :param path: Segment directory.
+        :param capacity: Rows per segment (files are created sparse at full size).
+        :param writable: Open for appending (creates the files if needed).
+        """
+        self.path = path
+        self.writable = writable
+        self._files = []
+        self._maps: Dict[str, mmap.mmap] = {}
+        self.columns: Dict[str, memoryview] = {}
+        if writable:
+            os.makedirs(path, exist_ok=True)
+        for name, typecode in COLUMNS:
+            file_path = os.path.join(path, name)
+            itemsize = struct.calcsize(typecode)
+            if writable:
+                f = open(file_path, "a+b")
+                if os.fstat(f.fileno()).st_size < capacity * itemsize:
+                    f.truncate(capacity * itemsize)
+                mapped = mmap.mmap(f.fileno(), 0)
+            else:
+                f = open(file_path, "rb")
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._files.append(f)
+            self._maps[name] = mapped
+            self.columns[name] = memoryview(mapped).cast(typecode)
+        self.capacity = len(self.columns["ts"])
+        ts = self.columns["ts"]
+        # First zero timestamp = end of the written rows.
+        lo, hi = 0, self.capacity
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ts[mid]:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.count = lo
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def first_ts(self) -> int:
+        return self.columns["ts"][0] if self.count else 0
+
+    @property
+    def last_ts(self) -> int:
+        return self.columns["ts"][self.count - 1] if self.count else 0
+
+    def append(self, ts: int, event: int, seat: int, color: int) -> None:
+        row = self.count
+        self.columns["event"][row] = event
+        self.columns["seat"][row] = seat
+        self.columns["color"][row] = color
+        # Written last: a non-zero timestamp marks a complete row.
+        self.columns["ts"][row] = ts
+        self.count = row + 1
+
+    def row_range(self, since_ms: Optional[int], until_ms: Optional[int]) -> Tuple[int, int]:
+        """
+        Rows [start, end) with since_ms <= ts < until_ms.
+        """
+        ts = self.columns["ts"]
+        start = bisect.bisect_left(ts, since_ms, 0, self.count) if since_ms is not None else 0
+        end = bisect.bisect_left(ts, until_ms, start, self.count) if until_ms is not None else self.count
+        return start, end
+
+    def event_rows(self, event: int, start: int, end: int) -> Iterator[int]:
+        """
+        Rows in [start, end) belonging to an event, found with a byte search over the event column.
+        """
+        itemsize = self.columns["event"].itemsize
+        mapped = self._maps["event"]
+        needle = struct.pack("=I", event)
+        position = mapped.find(needle, start * itemsize, end * itemsize)
+        while position >= 0:
+            if position % itemsize == 0:
+                yield position // itemsize
+                position = mapped.find(needle, position + itemsize, end * itemsize)
+            else:
+                position = mapped.find(needle, position + 1, end * itemsize)
+
+    def flush(self) -> None:
+        for mapped in self._maps.values():
+            mapped.flush()
+
+    def close(self) -> None:
+        for view in self.columns.values():
+            view.release()
+        self.columns.clear()
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+        for f in self._files:
+            f.close()
+        self._files.clear()
+
+
+class Dictionary:
+    """
+    Append-only JSON-lines file mapping event URLs, seat keys and colors to the
+    integer ids stored in the columns, plus per-event metadata.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.events: Dict[str, int] = {}
+        self.event_info: Dict[int, Dict[str, Any]] = {}
+        self.seats: Dict[str, int] = {}
+        self.seat_keys: Dict[int, str] = {}
+        self.colors: Dict[str, int] = {}
+        self.color_names: Dict[int, str] = {NOT_FREE: "taken"}
+        self._pending: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        continue  # A torn last line after a crash.
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        kind, ident = entry["kind"], entry.get("id")
+        if kind == "event":
+            self.events[entry["url"]] = ident
+            self.event_info.setdefault(ident, {}).update({k: v for k, v in entry.items() if k not in ("kind", "id")})
+        elif kind == "seat":
+            self.seats[entry["key"]] = ident
+            self.seat_keys[ident] = entry["key"]
+        elif kind == "color":
+            self.colors[entry["color"]] = ident
+            self.color_names[ident] = entry["color"]
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        self._apply(entry)
+        self._pending.append(entry)
+
+    def event_id(self, url: str, perf_url: str, title: str, show_time: Optional[str], ts: int) -> int:
+        ident = self.events.get(url)
+        if ident is None:
+            ident = len(self.events) + 1
+            self._add({"kind": "event", "id": ident, "url": url, "perf": perf_url,
+                       "title": title, "show_time": show_time, "first_seen": ts})
+            return ident
+        info = self.event_info[ident]
+        if info.get("title") != title or (show_time is not None and info.get("show_time") != show_time):
+            self._add({"kind": "event", "id": ident, "url": url, "title": title, "show_time": show_time})
+        return ident
+
+    def seat_id(self, key: str) -> int:
+        ident = self.seats.get(key)
+        if ident is None:
+            ident = len(self.seats) + 1
+            self._add({"kind": "seat", "id": ident, "key": key})
+        return ident
+
+    def color_code(self, color: Optional[str]) -> int:
+        if color is None:
+            return NOT_FREE
+        ident = self.colors.get(color)
+        if ident is None:
+            ident = len(self.colors) + 1
+            self._add({"kind": "color", "id": ident, "color": color})
+        return ident
+
+    def flush(self) -> None:
+        """
+        Appends new entries durably; called before rows that refer to them are written
+        to a segment, so a crash cannot leave rows whose ids are reassigned on restart.
+        """
+        if not self._pending:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in self._pending:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending = []
+
+
+def _segment_paths(directory: str) -> List[str]:
+    root = os.path.join(directory, SEGMENTS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return [os.path.join(root, name) for name in sorted(os.listdir(root)) if name.isdigit()]
+
+
+class HistoryWriter:
+    """
+    Appends seat changes to a history store from a background thread.
+
+    record() only puts the change on an in-memory queue, so the monitoring
+    loop never waits for disk I/O; the thread assigns ids, appends rows to
+    the current segment and flushes the maps every flush_interval seconds.
+    """
+
+    def __init__(self, directory: str, logger: logging.Logger,
+                 segment_records: int = Config.HISTORY_SEGMENT_RECORDS,
+                 flush_interval: float = Config.HISTORY_FLUSH_INTERVAL) -> None:
+        """
+        :param directory: Store directory (created if missing).
+        :param logger: A configured logger.
+        :param segment_records: Rows per segment file.
+        :param flush_interval: Seconds between msync calls of the current segment.
+        """
+        self.directory = directory
+        self.logger = logger
+        self.segment_records = segment_records
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        # Set by the thread when the store cannot be opened; record() then drops changes instead of queueing them.
+        self._disabled = False
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, event_url: str, perf_url: str, title: str, show_time: Optional[datetime],
+               changes: List[Tuple[str, Optional[str]]], snapshot: bool = False,
+               timestamp: Optional[float] = None) -> None:
+        """
+        Queues the seat changes of one check.
+
+        :param event_url: The checked event.
+        :param perf_url: Its performance page (the show).
+        :param title: The show title.
+        :param show_time: The parsed show date, if known.
+        :param changes: (seat key, new color or None when no longer free) pairs.
+        :param snapshot: True for a first observation, whose free seats are not releases.
+        :param timestamp: Observation time (defaults to now).
+        """
+        if changes and not self._disabled:
+            self._queue.put((timestamp if timestamp is not None else time.time(), event_url, perf_url, title,
+                             show_time.isoformat() if show_time else None, changes, snapshot))
+
+    def _open_segment(self, path: Optional[str] = None) -> Segment:
+        if path is None:
+            existing = _segment_paths(self.directory)
+            number = int(os.path.basename(existing[-1])) + 1 if existing else 0
+            path = os.path.join(self.directory, SEGMENTS_DIR, f"{number:06d}")
+        return Segment(path, self.segment_records, writable=True)
+
+    def _run(self) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            dictionary = Dictionary(os.path.join(self.directory, DICTIONARY_FILE))
+            existing = _segment_paths(self.directory)
+            segment = self._open_segment(existing[-1] if existing else None)
+        except Exception as e:
+            self.logger.error(f"Could not open history store {self.directory}, seat history is disabled: {e}")
+            self._disabled = True
+            # Drop what was queued before the failure, so nothing keeps the changes in memory.
+            try:
+                while True:
+                    self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            return
+        last_ts = segment.last_ts
+        next_flush = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, next_flush - time.monotonic())))
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if None in batch:
+                stopping = True
+                batch = [entry for entry in batch if entry is not None]
+            try:
+                for timestamp, event_url, perf_url, title, show_time, changes, snapshot in batch:
+                    # Keep the ts column sorted even if the wall clock steps back.
+                    ts = last_ts = max(int(timestamp * 1000), last_ts, 1)
+                    event = dictionary.event_id(event_url, perf_url, title, show_time, ts)
+                    flag = SNAPSHOT if snapshot else 0
+                    rows = [(dictionary.seat_id(key), dictionary.color_code(color) | flag) for key, color in changes]
+                    # Rows reach the shared maps immediately; their ids must be on disk first.
+                    dictionary.flush()
+                    for seat, color in rows:
+                        if segment.full:
+                            segment.flush()
+                            segment.close()
+                            segment = self._open_segment()
+                        segment.append(ts, event, seat, color)
+                if stopping or time.monotonic() >= next_flush:
+                    segment.flush()
+                    next_flush = time.monotonic() + self.flush_interval
+            except Exception as e:
+                self.logger.error(f"Error writing seat history: {e}")
+        segment.close()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Writes everything queued so far and stops the thread (blocking; call it from an executor).
+        """
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+@dataclass
+class SeatStats:
+    """
+    Aggregates of seat releases (a seat becoming free) and of how long released seats stayed free.
+    """
+    releases: int = 0
+    takes: int = 0
+    release_hours: List[int] = field(default_factory=lambda: [0] * 24)
+    release_weekdays: List[int] = field(default_factory=lambda: [0] * 7)
+    days_before_show: Dict[int, int] = field(default_factory=dict)
+    free_seconds: List[float] = field(default_factory=list)
+
+    def merge(self, other: "SeatStats") -> None:
+        self.releases += other.releases
+        self.takes += other.takes
+        self.release_hours = [a + b for a, b in zip(self.release_hours, other.release_hours)]
+        self.release_weekdays = [a + b for a, b in zip(self.release_weekdays, other.release_weekdays)]
+        for days, count in other.days_before_show.items():
+            self.days_before_show[days] = self.days_before_show.get(days, 0) + count
+        self.free_seconds.extend(other.free_seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        durations = sorted(self.free_seconds)
+
+        def quantile(q: float) -> Optional[float]:
+            return durations[min(len(durations) - 1, int(q * len(durations)))] if durations else None
+
+        return {
+            "releases": self.releases,
+            "takes": self.takes,
+            "release_hours": self.release_hours,
+            "release_weekdays": self.release_weekdays,
+            "days_before_show": dict(sorted(self.days_before_show.items())),
+            "free_seconds_p50": quantile(0.5),
+            "free_seconds_p90": quantile(0.9),
+            "free_seconds_mean": statistics.fmean(durations) if durations else None,
+        }
+
+
+def _ms(value: Optional[datetime]) -> Optional[int]:
+    return int(value.timestamp() * 1000) if value is not None else None
+
+
+class HistoryReader:
+    """
+    Read-only view of a history store. Segments outside the requested time
+    range are skipped by their first/last timestamps, the rest are bisected.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        :param directory: Store directory written by HistoryWriter.
+        """
+        self.directory = directory
+        self.dictionary = Dictionary(os.path.join(directory, DICTIONARY_FILE))
+        self.segments = [Segment(path, 0) for path in _segment_paths(directory)]
+
+    def events(self) -> List[Dict[str, Any]]:
+        """
+        Metadata of every recorded event (url, perf, title, show_time, first_seen).
+        """
+        return [{"url": url, **self.dictionary.event_info[ident]} for url, ident in self.dictionary.events.items()]
+
+    def scan(self, event_url: str, since: Optional[datetime] = None,
+             until: Optional[datetime] = None) -> Iterator[Tuple[int, str, Optional[str], bool]]:
+        """
+        Yields the changes of one event in time order.
+
+        :param event_url: The event URL.
+        :param since: Inclusive lower time bound.
+        :param until: Exclusive upper time bound.
+        :return: Iterator of (timestamp ms, seat key, color or None when taken, part of a snapshot).
+        """
+        event = self.dictionary.events.get(event_url)
+        if event is None:
+            return
+        since_ms, until_ms = _ms(since), _ms(until)
+        keys, names = self.dictionary.seat_keys, self.dictionary.color_names
+        for segment in self.segments:
+            if not segment.count or (since_ms is not None and segment.last_ts < since_ms) or \
+                    (until_ms is not None and segment.first_ts >= until_ms):
+                continue
+            start, end = segment.row_range(since_ms, until_ms)
+            ts, seats, colors = segment.columns["ts"], segment.columns["seat"], segment.columns["color"]
+            for row in segment.event_rows(event, start, end):
+                color = colors[row] & ~SNAPSHOT
+                yield (ts[row], keys.get(seats[row], str(seats[row])),
+                       names.get(color) if color != NOT_FREE else None, bool(colors[row] & SNAPSHOT))
+
+    def event_stats(self, event_url: str, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None) -> SeatStats:
+        """
+        Release times and free durations of one event's seats.
+        """
+        stats = SeatStats()
+        info = self.dictionary.event_info.get(self.dictionary.events.get(event_url, 0), {})
+        show_time = datetime.fromisoformat(info["show_time"]) if info.get("show_time") else None
+        free_since: Dict[str, int] = {}
+        last_snapshot = None
+        for ts, key, color, snapshot in self.scan(event_url, since, until):
+            if snapshot:
+                if ts != last_snapshot:
+                    # A fresh full observation: earlier open intervals have an unknown end.
+                    free_since.clear()
+                    last_snapshot = ts
+                if color is not None:
+                    free_since[key] = ts
+                continue
+            if color is None:
+                started = free_since.pop(key, None)
+                stats.takes += 1
+                if started is not None:
+                    stats.free_seconds.append((ts - started) / 1000)
+            elif key not in free_since:
+                free_since[key] = ts
+                stats.releases += 1
+                at = datetime.fromtimestamp(ts / 1000)
+                stats.release_hours[at.hour] += 1
+                stats.release_weekdays[at.weekday()] += 1
+                if show_time is not None:
+                    days = max(0, (show_time - at).days)
+                    stats.days_before_show[days] = stats.days_before_show.get(days, 0) + 1
+        return stats
+
+    def show_stats(self, show: str, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> SeatStats:
+        """
+        Aggregates over every event of a show.
+
+        :param show: The performance page URL or the show title.
+        """
+        stats = SeatStats()
+        for event in self.events():
+            if show in (event.get("perf"), event.get("title")):
+                stats.merge(self.event_stats(event["url"], since, until))
+        return stats
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+
+def open_readers(path: str) -> List[HistoryReader]:
+    """
+    Opens a store, or every store directly below path (e.g. one per shard).
+    """
+    if os.path.exists(os.path.join(path, DICTIONARY_FILE)):
+        return [HistoryReader(path)]
+    return [HistoryReader(os.path.join(path, name)) for name in sorted(os.listdir(path))
+            if os.path.exists(os.path.join(path, name, DICTIONARY_FILE))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the seat availability history.")
+    parser.add_argument("command", choices=["events", "stats"])
+    parser.add_argument("path", help="History directory (HISTORY_DIR)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--event", help="Event URL")
+    target.add_argument("--show", help="Performance URL or show title")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="ISO date/time, exclusive")
+    args = parser.parse_args()
+
+    readers = open_readers(args.path)
+    if not readers:
+        print(f"No history store found in {args.path}.", file=sys.stderr)
+        sys.exit(1)
+    if args.command == "events":
+        for reader in readers:
+            for event in reader.events():
+                print(json.dumps(event, ensure_ascii=False))
+        return
+    if not (args.event or args.show):
+        parser.error("stats needs --event or --show")
+    stats = SeatStats()
+    started = time.perf_counter()
+    for reader in readers:
+        if args.event:
+            stats.merge(reader.event_stats(args.event, args.since, args.until))
+        else:
+            stats.merge(reader.show_stats(args.show, args.since, args.until))
+        reader.close()
+    print(json.dumps(stats.summary(), indent=2))
+    print(f"Queried in {time.perf_counter() - started:.3f}s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
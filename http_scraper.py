@@ -0,0 +1,307 @@
+# http_scraper.py
+
+import re
+import hashlib
+import logging
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from config import Config
+from scraper import PageNotFoundError, PageSnapshot, DATETIME_SELECTORS, DEFAULT_DATETIME, DEFAULT_TITLE
+
+NAMED_COLORS = {
+    "none": "none",
+    "white": "rgb(255, 255, 255)",
+    "black": "rgb(0, 0, 0)",
+    "red": "rgb(255, 0, 0)",
+    "green": "rgb(0, 128, 0)",
+    "blue": "rgb(0, 0, 255)",
+    "gray": "rgb(128, 128, 128)",
+    "grey": "rgb(128, 128, 128)",
+}
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+             "source", "track", "wbr"}
+
+
+def normalize_color(value: Optional[str]) -> Optional[str]:
+    """
+    Converts an SVG/CSS color to the "rgb(r, g, b)" form returned by getComputedStyle.
+
+    :param value: The raw color value (hex, rgb(), or a common named color).
+    :return: The normalized color, or None if it cannot be resolved without a browser.
+    """
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in NAMED_COLORS:
+        return NAMED_COLORS[value]
+    if value.startswith("#"):
+        digits = value[1:]
+        if len(digits) == 3:
+            digits = "".join(c * 2 for c in digits)
+        if len(digits) != 6 or not re.fullmatch(r"[0-9a-f]{6}", digits):
+            return None
+        r, g, b = (int(digits[i:i + 2], 16) for i in (0, 2, 4))
+        return f"rgb({r}, {g}, {b})"
+    match = re.fullmatch(r"rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)", value)
+    if match:
+        return "rgb({}, {}, {})".format(*match.groups())
+    return None
+
+
+def _style_fill(style: Optional[str]) -> Optional[str]:
+    if not style:
+        return None
+    match = re.search(r"(?:^|;)\s*fill\s*:\s*([^;]+)", style)
+    return match.group(1).strip() if match else None
+
+
+class _EventPageParser(HTMLParser):
+    """
+    Collects the title, date text and rect fills from an event page in a single pass.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        # Each stack entry: (tag, classes, inherited fill)
+        self._stack: List[Tuple[str, set, Optional[str]]] = []
+        self._captures: List[Tuple[str, int, List[str]]] = []
+        self.title: Optional[str] = None
+        self.datetimes: Dict[str, str] = {}
+        self.rects: List[Dict[str, Any]] = []
+        self.unresolved = 0
+
+    def _matching_selectors(self, tag: str, classes: set) -> List[str]:
+        matched = []
+        for sel in DATETIME_SELECTORS:
+            if sel in self.datetimes:
+                continue
+            if sel == "time" and tag == "time":
+                matched.append(sel)
+            elif sel == ".event-info span":
+                if tag == "span" and any("event-info" in entry[1] for entry in self._stack):
+                    matched.append(sel)
+            elif sel.startswith(".") and sel[1:] in classes:
+                matched.append(sel)
+        return matched
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        classes = set((attributes.get("class") or "").split())
+        inherited = self._stack[-1][2] if self._stack else None
+        own_fill = _style_fill(attributes.get("style")) or attributes.get("fill")
+
+        if tag == "rect":
+            if own_fill is not None:
+                color = normalize_color(own_fill)
+            elif inherited is not None and not classes:
+                color = normalize_color(inherited)
+            else:
+                # Fill comes from CSS (or the SVG default) and needs computed styles.
+                color = None
+            if color is None:
+                self.unresolved += 1
+            self.rects.append({
+                "index": len(self.rects), "color": color, "id": attributes.get("id"),
+                "x": attributes.get("x"), "y": attributes.get("y"),
+                "row": attributes.get("data-row"), "seat": attributes.get("data-seat"),
+            })
+
+        if tag == "h1" and self.title is None:
+            self._captures.append(("h1", len(self._stack), []))
+        for sel in self._matching_selectors(tag, classes):
+            self._captures.append((sel, len(self._stack), []))
+
+        if tag not in VOID_TAGS:
+            self._stack.append((tag, classes, own_fill if own_fill is not None else inherited))
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if not any(entry[0] == tag for entry in self._stack):
+            return
+        while self._stack:
+            open_tag = self._stack.pop()[0]
+            depth = len(self._stack)
+            finished = [c for c in self._captures if c[1] == depth]
+            self._captures = [c for c in self._captures if c[1] != depth]
+            for name, _, parts in finished:
+                text = " ".join("".join(parts).split())
+                if name == "h1":
+                    if self.title is None and text:
+                        self.title = text
+                elif text and name not in self.datetimes:
+                    self.datetimes[name] = text
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        for _, _, parts in self._captures:
+            parts.append(data)
+
+
+class HttpPerformanceScraper:
+    """
+    Browserless engine for event pages: fetches HTML with a pooled aiohttp session
+    and reads the seat rects and their fill colors directly from the markup.
+    Results are only returned when every seat color could be resolved, so callers
+    can fall back to PerformanceScraper (Playwright) otherwise.
+
+    Given the fingerprint of the previous result, scrape_event() revalidates with
+    If-None-Match/If-Modified-Since when the server sent validators, and skips
+    parsing when the body hashes to the same fingerprint. Only fingerprints of
+    this engine (FINGERPRINT_PREFIX) are trusted: a page rendered by the browser
+    can change while its HTML shell, and thus the validators, stay the same.
+
+    A page whose seat colors could not be resolved goes straight to the browser
+    for browser_retry seconds, instead of being downloaded twice on every check.
+    """
+
+    FINGERPRINT_PREFIX = "http:"
+
+    def __init__(self, logger: logging.Logger, max_connections: int = Config.HTTP_MAX_CONNECTIONS,
+                 timeout: float = Config.NAVIGATION_TIMEOUT / 1000,
+                 browser_retry: float = Config.HTTP_BROWSER_RETRY) -> None:
+        """
+        :param logger: A configured logger.
+        :param max_connections: Size of the HTTP connection pool.
+        :param timeout: Total request timeout in seconds.
+        :param browser_retry: Seconds before the HTTP path is tried again for a page that needed the browser.
+        """
+        self.logger = logger
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.browser_retry = browser_retry
+        self._session: Optional[aiohttp.ClientSession] = None
+        # URL -> conditional request headers built from the last 200 response.
+        self._validators: Dict[str, Dict[str, str]] = {}
+        # URL -> monotonic time until which the page is left to the browser.
+        self._browser_until: Dict[str, float] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": Config.HTTP_USER_AGENT}
+            )
+        return self._session
+
+    async def fetch(self, url: str) -> Tuple[int, str]:
+        """
+        Fetches a page over the pooled session.
+
+        :param url: The URL to fetch.
+        :return: A (status code, body text) tuple.
+        """
+        status, body, _ = await self._fetch(url)
+        return status, body
+
+    async def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, str, Dict[str, str]]:
+        async with self._get_session().get(url, headers=headers) as response:
+            return response.status, await response.text(), dict(response.headers)
+
+    def _remember_validators(self, url: str, headers: Dict[str, str]) -> None:
+        validators = {}
+        if headers.get("ETag"):
+            validators["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        if validators:
+            self._validators[url] = validators
+        else:
+            self._validators.pop(url, None)
+
+    @staticmethod
+    def fingerprint(html: str) -> str:
+        """
+        Content hash of a response body.
+        """
+        return HttpPerformanceScraper.FINGERPRINT_PREFIX + hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+    @staticmethod
+    def parse_event_page(html: str) -> Optional[PageSnapshot]:
+        """
+        Parses an event page.
+
+        :param html: The page HTML.
+        :return: A PageSnapshot with title, datetime and rects, or None when the
+                 seat colors cannot be resolved without a browser.
+        """
+        parser = _EventPageParser()
+        parser.feed(html)
+        parser.close()
+        if not parser.rects or parser.unresolved:
+            return None
+        event_datetime = next(
+            (parser.datetimes[sel] for sel in DATETIME_SELECTORS if sel in parser.datetimes),
+            DEFAULT_DATETIME
+        )
+        return PageSnapshot(title=parser.title or DEFAULT_TITLE, datetime=event_datetime, rects=parser.rects,
+                            html=html)
+
+    async def scrape_event(self, url: str, known_fingerprint: Optional[str] = None) -> Optional[PageSnapshot]:
+        """
+        Fetches and parses an event page.
+
+        :param url: The event page URL.
+        :param known_fingerprint: Fingerprint of the previous result for this URL, if it is still current.
+        :return: The parsed event data (unchanged=True and no data when the page matches
+                 known_fingerprint), or None if the Playwright fallback is required.
+        :raises PageNotFoundError: If the event page responds with 404.
+        """
+        until = self._browser_until.get(url)
+        if until is not None:
+            if time.monotonic() < until:
+                return None
+            del self._browser_until[url]
+        if known_fingerprint is not None and not known_fingerprint.startswith(self.FINGERPRINT_PREFIX):
+            known_fingerprint = None
+        headers = self._validators.get(url) if known_fingerprint is not None else None
+        try:
+            status, html, response_headers = await self._fetch(url, headers)
+        except Exception as e:
+            self.logger.warning(f"HTTP fast path failed for {url}: {e}")
+            return None
+        if status == 304 and headers:
+            return PageSnapshot(fingerprint=known_fingerprint, unchanged=True)
+        if status == 404:
+            raise PageNotFoundError(url)
+        if status != 200:
+            self.logger.warning(f"HTTP fast path got status {status} for {url}.")
+            return None
+        self._remember_validators(url, response_headers)
+        fingerprint = self.fingerprint(html)
+        if fingerprint == known_fingerprint:
+            return PageSnapshot(fingerprint=fingerprint, unchanged=True)
+        result = self.parse_event_page(html)
+        if result is None:
+            # The browser takes over this page, so its validators must not short-circuit later checks.
+            self._validators.pop(url, None)
+            self._browser_until[url] = time.monotonic() + self.browser_retry
+            self.logger.info(f"HTTP fast path could not resolve seat colors for {url}, "
+                             f"using the browser for the next {self.browser_retry:.0f}s.")
+            return None
+        result.fingerprint = fingerprint
+        return result
+
+    def forget(self, url: str) -> None:
+        """
+        Drops the conditional request validators and browser preference of a URL.
+        """
+        self._validators.pop(url, None)
+        self._browser_until.pop(url, None)
+
+    async def close(self) -> None:
+        """
+        Closes the pooled HTTP session.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,155 @@
+# live_watch.py
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+from config import Config
+from scheduler import EventScheduler
+from scraper import PerformanceScraper, PageSnapshot, RECT_DESCRIPTOR
+
+# Installs a MutationObserver on the seat map and pushes changed rect fills
+# to Python through the exposed binding. Changes are debounced so a redraw of
+# the whole hall produces one callback; a full list is sent when the number
+# of rects changes.
+OBSERVER_SCRIPT = """
+    ({bindingName, debounceMs}) => {
+        if (window.__seatObserver) {
+            return;
+        }
+        const read = () => Array.from(document.querySelectorAll("rect")).map(r => getComputedStyle(r).fill);
+        let last = read();
+        let pending = null;
+        const report = () => {
+            pending = null;
+            const current = read();
+            if (current.length !== last.length) {
+                last = current;
+                window[bindingName]({full: Array.from(document.querySelectorAll("rect")).map(RECT_DESCRIPTOR)});
+                return;
+            }
+            const changes = [];
+            for (let i = 0; i < current.length; i++) {
+                if (current[i] !== last[i]) {
+                    changes.push({index: i, color: current[i]});
+                }
+            }
+            last = current;
+            if (changes.length) {
+                window[bindingName]({changes});
+            }
+        };
+        window.__seatObserver = new MutationObserver(() => {
+            if (!pending) {
+                pending = setTimeout(report, debounceMs);
+            }
+        });
+        window.__seatObserver.observe(document.body, {
+            subtree: true,
+            childList: true,
+            attributes: true,
+            attributeFilter: ["fill", "class", "style"]
+        });
+    }
+""".replace("RECT_DESCRIPTOR", RECT_DESCRIPTOR.strip())
+
+BINDING_NAME = "__seatMapChanged"
+
+
+class LiveWatcher:
+    """
+    Keeps one long-lived tab on a hot event and reacts to seat changes pushed
+    from the page, with a periodic soft refresh to pick up server-side changes
+    the page itself does not render.
+    """
+
+    def __init__(self, context: BrowserContext, event_url: str, performance_url: str,
+                 on_update: Callable[[PageSnapshot], Awaitable[None]], scheduler: EventScheduler,
+                 logger: logging.Logger, soft_refresh_interval: float = Config.LIVE_SOFT_REFRESH,
+                 debounce_ms: int = Config.LIVE_DEBOUNCE_MS) -> None:
+        """
+        :param context: The browser context the tab is opened in.
+        :param event_url: The event page to watch.
+        :param performance_url: The performance page the event belongs to.
+        :param on_update: Coroutine called with a full snapshot after every load and every pushed change.
+        :param scheduler: Scheduler whose slots (concurrency and host rate limit) gate each reload.
+        :param logger: A configured logger.
+        :param soft_refresh_interval: Seconds between reloads of the tab.
+        :param debounce_ms: Milliseconds the in-page observer waits to batch mutations.
+        """
+        self.context = context
+        self.event_url = event_url
+        self.performance_url = performance_url
+        self.on_update = on_update
+        self.scheduler = scheduler
+        self.logger = logger
+        self.soft_refresh_interval = soft_refresh_interval
+        self.debounce_ms = debounce_ms
+        self._snapshot: Optional[PageSnapshot] = None
+        self._page: Optional[Page] = None
+        self._crashed = asyncio.Event()
+
+    async def _on_change(self, source: Any, payload: Dict[str, Any]) -> None:
+        if self._snapshot is None:
+            return
+        if "full" in payload:
+            self._snapshot.rects = payload["full"]
+        else:
+            rects: List[Dict[str, Any]] = self._snapshot.rects
+            for change in payload["changes"]:
+                if change["index"] < len(rects):
+                    # Keep the rect's stable attributes; only its fill changed.
+                    rects[change["index"]]["color"] = change["color"]
+        self.logger.info(f"Live change pushed for {self.event_url}.")
+        await self.on_update(self._snapshot)
+
+    async def _open(self) -> Page:
+        page = await self.context.new_page()
+        page.on("crash", lambda _: self._crashed.set())
+        await page.expose_binding(BINDING_NAME, self._on_change)
+        return page
+
+    async def _load(self) -> None:
+        async with self.scheduler.slot(self.event_url):
+            await PerformanceScraper.navigate(self._page, self.event_url, "event")
+        self._snapshot = await PerformanceScraper.extract_snapshot(self._page, ["title", "datetime", "rects"])
+        await self.on_update(self._snapshot)
+        await self._page.evaluate(OBSERVER_SCRIPT, {"bindingName": BINDING_NAME, "debounceMs": self.debounce_ms})
+
+    async def run(self) -> None:
+        """
+        Watches the event until cancelled, reopening the tab after errors or crashes.
+        """
+        self.logger.info(f"Live watch started for {self.event_url}.")
+        try:
+            while True:
+                try:
+                    if self._crashed.is_set():
+                        self.logger.warning(f"Live watch page crashed for {self.event_url}, reopening.")
+                        self._crashed.clear()
+                        await self._close_page()
+                    if self._page is None or self._page.is_closed():
+                        self._page = await self._open()
+                    await self._load()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Live watch error for {self.event_url}: {e}")
+                    await self._close_page()
+                try:
+                    # Sleep until the next soft refresh, or wake up early if the tab crashes.
+                    await asyncio.wait_for(self._crashed.wait(), timeout=self.soft_refresh_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._close_page()
+
+    async def _close_page(self) -> None:
+        page, self._page, self._snapshot = self._page, None, None
+        if page is not None and not page.is_closed():
+            try:
+                await page.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing live watch page for {self.event_url}: {e}")
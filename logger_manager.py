@@ -1,8 +1,49 @@
 # logger_manager.py
 
 import sys
+import json
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from typing import Dict, List
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Compact one-line JSON log format.
+    """
+
+    def __init__(self, caller_info: bool = True, datefmt: str = None):
+        super().__init__(datefmt=datefmt)
+        self.caller_info = caller_info
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if self.caller_info:
+            entry["module"] = record.module
+            entry["line"] = record.lineno
+            entry["func"] = record.funcName
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+class _ThreadQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread unformatted.
+    The stock QueueHandler formats in the caller so records can be pickled;
+    an in-process queue does not need that, so formatting moves off the caller too.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
 class LoggerManager:
     """
@@ -15,47 +56,72 @@ class LoggerManager:
         max_bytes (int): Maximum size (in bytes) of the log file before rotating.
         backup_count (int): Number of rotated log files to keep.
         use_stderr (bool): Whether to add an additional handler that sends ERROR-level logs to sys.stderr.
+        use_queue (bool): Whether formatting and I/O run on a background thread (QueueHandler/QueueListener).
+        json_format (bool): Whether records are written as compact one-line JSON.
+        caller_info (bool): Whether module, line and function are logged; disabling it skips frame inspection.
     """
+
+    # Listener threads by logger name, so reconfiguring a logger stops the previous one.
+    _listeners: Dict[str, QueueListener] = {}
+
     def __init__(self,
                  logger_name: str = "custom_script",
                  log_level: int = logging.INFO,
                  log_file: str = None,
                  max_bytes: int = 2_000_000,
                  backup_count: int = 3,
-                 use_stderr: bool = True):
+                 use_stderr: bool = True,
+                 use_queue: bool = False,
+                 json_format: bool = False,
+                 caller_info: bool = True):
         self.logger_name = logger_name
         self.log_level = log_level
         self.log_file = log_file or f"{logger_name}.log"
         self.max_bytes = max_bytes
         self.backup_count = backup_count
         self.use_stderr = use_stderr
+        self.use_queue = use_queue
+        self.json_format = json_format
+        self.caller_info = caller_info
         self.logger = logging.getLogger(self.logger_name)
         self._setup_logger()
 
     def _setup_logger(self) -> None:
         # Clear any existing handlers to avoid duplications.
+        self._stop_listener()
         if self.logger.hasHandlers():
             self.logger.handlers.clear()
 
         # Set logger level
         self.logger.setLevel(self.log_level)
 
-        log_format = '%(asctime)s [%(levelname)s] [%(name)s] (%(module)s:%(lineno)d, %(funcName)s): %(message)s'
+        if not self.caller_info:
+            # Documented logging optimization: skips sys._getframe() for every record (process-wide).
+            logging._srcfile = None
+
         date_format = '%Y-%m-%d %H:%M:%S'
-        formatter = logging.Formatter(log_format, datefmt=date_format)
+        if self.json_format:
+            formatter = JsonFormatter(caller_info=self.caller_info, datefmt=date_format)
+        elif self.caller_info:
+            log_format = '%(asctime)s [%(levelname)s] [%(name)s] (%(module)s:%(lineno)d, %(funcName)s): %(message)s'
+            formatter = logging.Formatter(log_format, datefmt=date_format)
+        else:
+            formatter = logging.Formatter('%(asctime)s [%(levelname)s] [%(name)s]: %(message)s', datefmt=date_format)
+
+        handlers: List[logging.Handler] = []
 
         # Create a console handler for general logs (to stdout)
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(self.log_level)
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
         # Optionally add a separate error handler to stderr
         if self.use_stderr:
             error_handler = logging.StreamHandler(sys.stderr)
             error_handler.setLevel(logging.ERROR)
             error_handler.setFormatter(formatter)
-            self.logger.addHandler(error_handler)
+            handlers.append(error_handler)
 
         # Create and add a rotating file handler.
         file_handler = RotatingFileHandler(
@@ -66,7 +132,18 @@ class LoggerManager:
         )
         file_handler.setLevel(self.log_level)
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+        if self.use_queue:
+            # The caller only enqueues; formatting, writes and rollover happen on the listener thread.
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            LoggerManager._listeners[self.logger_name] = listener
+            self.logger.addHandler(_ThreadQueueHandler(log_queue))
+        else:
+            for handler in handlers:
+                self.logger.addHandler(handler)
 
         # Prevent log propagation to ancestor loggers.
         self.logger.propagate = False
@@ -74,12 +151,33 @@ class LoggerManager:
         # Optionally suppress logging from noisy external modules.
         logging.getLogger("py4j").setLevel(logging.ERROR)
 
+    def _stop_listener(self) -> None:
+        listener = LoggerManager._listeners.pop(self.logger_name, None)
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+    def close(self) -> None:
+        """
+        Flushes queued records and stops the listener thread (no-op without use_queue).
+        """
+        self._stop_listener()
+
     def get_logger(self) -> logging.Logger:
         """
         Returns the configured logger instance.
         """
         return self.logger
 
+@atexit.register
+def _stop_listeners() -> None:
+    # Flush records still queued when the interpreter exits.
+    for listener in list(LoggerManager._listeners.values()):
+        listener.stop()
+    LoggerManager._listeners.clear()
+
+
 # Example usage:
 if __name__ == "__main__":
     lm = LoggerManager("test_logger", log_level=logging.DEBUG)
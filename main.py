@@ -6,8 +6,10 @@ import logging
 
 from config import Config
 from logger_manager import LoggerManager
-from notifier import TelegramNotifier
+from notifier import AsyncTelegramNotifier
 from monitor import PerformanceMonitor
+from sharding import ShardCoordinator
+from state_store import SQLiteStateStore
 
 # Define the performance URLs to monitor
 PERFORMANCE_URLS = [
@@ -27,28 +29,60 @@ async def start_monitoring(logger_name: str) -> None:
         log_file='monitor.log',
         max_bytes=2_000_000,
         backup_count=3,
-        use_stderr=False
+        use_stderr=False,
+        use_queue=True,
+        json_format=os.getenv("LOG_FORMAT") == "json",
+        caller_info=False
     )
     logger_instance = logger_manager.logger
 
     # Initialize the notifier with Telegram-specific settings.
-    notifier = TelegramNotifier(
+    # Delivery runs in the background so alerts never block page checks.
+    notifier = AsyncTelegramNotifier(
         bot_token=cfg.BOT_TOKEN,
         chat_ids=cfg.CHAT_IDS,
         logger=logger_instance
     )
 
+    # Sharded mode: each worker process runs its own monitor and browser and
+    # sends its notifications back through this process's notifier.
+    if cfg.SHARDS > 1:
+        coordinator = ShardCoordinator(
+            notifier=notifier,
+            logger=logger_instance,
+            performance_urls=PERFORMANCE_URLS,
+            shards=cfg.SHARDS,
+            logger_name=logger_name,
+            send_notification=False
+        )
+        try:
+            await coordinator.run()
+        finally:
+            await notifier.close()
+            logger_manager.close()
+        return
+
+    # Persist seat states so a restart does not report every free seat as new.
+    state_store = SQLiteStateStore(cfg.STATE_DB_PATH, logger_instance) if cfg.STATE_DB_PATH else None
+
     # Create the performance monitor instance.
     monitor = PerformanceMonitor(
         notifier=notifier,
         config=cfg,
         logger=logger_instance,
         performance_urls=PERFORMANCE_URLS,
-        send_notification=False
+        send_notification=False,
+        state_store=state_store
     )
 
     # Start the monitoring process.
-    await monitor.run_monitoring()
+    try:
+        await monitor.run_monitoring()
+    finally:
+        await notifier.close()
+        if state_store is not None:
+            state_store.close()
+        logger_manager.close()
 
 def main() -> None:
     project_name = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
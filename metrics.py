@@ -0,0 +1,259 @@
+# metrics.py
+
+import json
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from aiohttp import web
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+               for key, value in items)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _finite(value: float) -> Optional[float]:
+    return None if value == float("inf") else value
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed buckets.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-quantile (inf if it falls past the last bucket).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    In-process registry of histograms, counters and callback gauges, keyed by name and labels.
+    """
+
+    def __init__(self, namespace: str = "performancewatch") -> None:
+        """
+        :param namespace: Prefix of every exported metric name.
+        """
+        self.namespace = namespace
+        self._help: Dict[str, str] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, Callable[[], float]]] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        """
+        Sets the HELP text exported for a metric.
+        """
+        self._help[name] = help_text
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """
+        Records a duration in the histogram name{labels}.
+        """
+        series = self._histograms.setdefault(name, {})
+        key = _labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, name: str, **labels: Any) -> Iterator[None]:
+        """
+        Records the duration of the block, including blocks that raise.
+        """
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - started, **labels)
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """
+        Increments the counter name{labels}.
+        """
+        series = self._counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def gauge(self, name: str, read: Callable[[], float], **labels: Any) -> None:
+        """
+        Registers (or replaces) a gauge whose value is read when metrics are exported.
+        """
+        self._gauges.setdefault(name, {})[_labels(labels)] = read
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(_labels(labels))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def _read_gauges(self) -> Dict[str, Dict[Labels, float]]:
+        values: Dict[str, Dict[Labels, float]] = {}
+        for name, series in self._gauges.items():
+            for key, read in series.items():
+                try:
+                    values.setdefault(name, {})[key] = float(read())
+                except Exception:
+                    continue
+        return values
+
+    def render_prometheus(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> str:
+            full = f"{self.namespace}_{name}"
+            if self._help.get(name):
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for name, series in sorted(self._histograms.items()):
+            full = header(name, "histogram")
+            for key, histogram in sorted(series.items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"{full}_bucket{_format_labels(key, ('le', repr(bound)))} {count}")
+                lines.append(f"{full}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                lines.append(f"{full}_sum{_format_labels(key)} {histogram.sum}")
+                lines.append(f"{full}_count{_format_labels(key)} {histogram.count}")
+        for name, series in sorted(self._counters.items()):
+            full = header(name, "counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{full}{_format_labels(key)} {value}")
+        for name, series in sorted(self._read_gauges().items()):
+            full = header(name, "gauge")
+            for key, value in sorted(series.items()):
+                lines.append(f"{full}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns all metrics as JSON-serializable data, with p50/p99 estimates for histograms.
+        """
+        def series_list(series: Dict[Labels, Any], convert: Callable[[Any], Any]) -> List[Dict[str, Any]]:
+            return [{"labels": dict(key), **convert(value)} for key, value in sorted(series.items())]
+
+        return {
+            "histograms": {
+                name: series_list(series, lambda h: {
+                    "count": h.count, "sum": h.sum,
+                    # JSON has no infinity; None means the quantile is above the last bucket.
+                    "p50": _finite(h.quantile(0.5)), "p99": _finite(h.quantile(0.99)),
+                    "buckets": dict(zip(map(str, h.buckets), h.counts)),
+                })
+                for name, series in self._histograms.items()
+            },
+            "counters": {name: series_list(series, lambda v: {"value": v})
+                         for name, series in self._counters.items()},
+            "gauges": {name: series_list(series, lambda v: {"value": v})
+                       for name, series in self._read_gauges().items()},
+        }
+
+
+# Process-wide registry used by the monitor, the scraper and the notifier.
+METRICS = MetricsRegistry()
+METRICS.describe("stage_seconds", "Duration of monitoring stages (navigation, settle, extract, diff, notify, check, cycle).")
+METRICS.describe("errors_total", "Failed operations by stage.")
+METRICS.describe("timeouts_total", "Timeouts by stage.")
+METRICS.describe("open_pages", "Pages alive in the page pool.")
+METRICS.describe("leased_pages", "Pages currently leased from the page pool.")
+METRICS.describe("polled_events", "Events in the polling queue.")
+METRICS.describe("due_events", "Events whose next check is overdue.")
+METRICS.describe("notification_queue", "Messages waiting for delivery.")
+METRICS.describe("page_checks_total", "Fingerprinted page checks by kind (event, listing) and result (changed, unchanged = skipped).")
+METRICS.describe("first_check_seconds", "Time from the start of a listing crawl to the first check of each newly discovered event.")
+METRICS.describe("startup_first_check_seconds", "Time from monitoring start to the first completed event check.")
+METRICS.describe("loop_lag_seconds", "How late the event loop woke up a periodic probe (time it spent blocked).")
+
+
+async def probe_loop_lag(registry: MetricsRegistry = METRICS, interval: float = 0.1) -> None:
+    """
+    Records event loop blocking until cancelled: sleeps interval seconds and
+    observes how much later than requested the loop resumed it.
+    """
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        registry.observe("loop_lag_seconds", max(0.0, time.monotonic() - started - interval))
+
+
+class MetricsServer:
+    """
+    Serves a registry over HTTP: /metrics (Prometheus text) and /metrics.json.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int, logger: logging.Logger) -> None:
+        """
+        :param registry: The registry to export.
+        :param host: Interface to bind (keep it local, the endpoint has no authentication).
+        :param port: TCP port (0 picks a free one).
+        :param logger: A configured logger.
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _prometheus(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.registry.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    async def _json(self, request: web.Request) -> web.Response:
+        return web.Response(text=json.dumps(self.registry.to_dict()), content_type="application/json")
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._prometheus)
+        app.router.add_get("/metrics.json", self._json)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self.logger.info(f"Metrics served on http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
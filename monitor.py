@@ -3,128 +3,546 @@
 import asyncio
 import time
 import logging
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from playwright.async_api import async_playwright, BrowserContext
+from playwright.async_api import async_playwright, BrowserContext, Page
 
 from config import Config
 from notifier import Notifier
-from scraper import PerformanceScraper
+from scraper import PerformanceScraper, PageNotFoundError, PageSnapshot, DEFAULT_TITLE, EVENT_FIELDS
+from scheduler import EventScheduler
+from page_pool import PagePool
+from browser_recycler import BrowserRecycler
+from network_profile import NetworkProfile
+from http_scraper import HttpPerformanceScraper
+from discovery_cache import DiscoveryCache
+from seat_state import ColorPalette, SeatLayout, SeatState, popcount
+from state_store import StateStore
+from live_watch import LiveWatcher
+from polling import AdaptivePollingPolicy, PollingQueue, parse_event_datetime
+from coalescer import NotificationCoalescer, SeatAlert
+from capture import CaptureWriter
+from history import HistoryWriter
+from metrics import METRICS, MetricsServer, probe_loop_lag
 
 class PerformanceMonitor:
     """
     Orchestrates monitoring for performance pages:
-      - Collects event links concurrently.
-      - Checks event pages for free seats.
+      - Collects event links concurrently and queues each performance's events as soon as its page is crawled.
+      - Checks event pages for free seats with continuously running workers.
       - Optionally sends notifications when free seats are detected.
     """
     def __init__(self, notifier: Notifier, config: Config, logger: logging.Logger,
-                 performance_urls: List[str], send_notification: bool = False) -> None:
+                 performance_urls: List[str], send_notification: bool = False,
+                 state_store: Optional[StateStore] = None) -> None:
         """
         :param notifier: An instance of Notifier for sending alerts.
         :param config: An instance of Config for general configurations.
         :param logger: A configured logger.
         :param performance_urls: List of performance page URLs to monitor.
         :param send_notification: If True, notifications are sent when free seats are detected.
+        :param state_store: Optional persistent store used to restore seat states after a restart.
         """
         self.notifier = notifier
         self.config = config
         self.logger = logger
         self.performance_urls = performance_urls
         self.send_notification = send_notification
-        self.previous_free_rects_by_url: Dict[str, set] = {}
-        self._last_check_time: float = 0.0
+        self.seat_states_by_url: Dict[str, SeatState] = {}
+        self.palette = ColorPalette()
+        self.state_store = state_store
+        self._dirty_states: Dict[str, SeatState] = {}
+        self._deleted_states: set = set()
+        # Performance URL -> links that changed since the last flush, persisted for the next warm start.
+        self._dirty_links: Dict[str, List[Tuple[str, str]]] = {}
+        self._live_watchers: Dict[str, asyncio.Task] = {}
+        self.polling_policy = AdaptivePollingPolicy(
+            min_interval=config.MIN_CHECK_INTERVAL,
+            max_interval=config.POLL_MAX_INTERVAL,
+            staleness_scale=config.POLL_STALENESS_SCALE,
+            horizon_days=config.POLL_HORIZON_DAYS
+        )
+        self.polling_queue = PollingQueue()
+        self.coalescer = NotificationCoalescer(
+            notifier, logger,
+            debounce_window=config.NOTIFY_DEBOUNCE_WINDOW,
+            max_messages=config.NOTIFY_MAX_MESSAGES
+        )
+        self._known_events: Dict[str, set] = {}
+        self._first_seen_events: set = set()
+        # Newly discovered event -> monotonic time its listing crawl started, until its first check.
+        self._awaiting_first_check: Dict[str, float] = {}
+        self._first_check_delays: List[float] = []
+        self._started: Optional[float] = None
+        # URL -> fingerprint of the page content behind its current seat state (or cached links).
+        self.fingerprints: Dict[str, str] = {}
+        self._fingerprint_checks: Dict[str, List[int]] = {}
+        self.network_profile = NetworkProfile(
+            blocked_resource_types=config.BLOCK_RESOURCE_TYPES,
+            blocked_url_patterns=config.BLOCK_URL_PATTERNS,
+            allowed_url_patterns=config.ALLOW_URL_PATTERNS,
+            logger=logger,
+            dry_run=config.NETWORK_PROFILE_DRY_RUN
+        ) if config.NETWORK_PROFILE_ENABLED else None
+        self.capture = CaptureWriter(config.CAPTURE_DIR, logger, config.CAPTURE_HTML) if config.CAPTURE_DIR else None
+        self.history = HistoryWriter(
+            config.HISTORY_DIR, logger,
+            segment_records=config.HISTORY_SEGMENT_RECORDS,
+            flush_interval=config.HISTORY_FLUSH_INTERVAL
+        ) if config.HISTORY_DIR else None
+        self.http_scraper = HttpPerformanceScraper(logger)
+        self.discovered: asyncio.Queue = asyncio.Queue(config.DISCOVERY_QUEUE_SIZE)
+        self.discovery_cache = DiscoveryCache(config.DISCOVERY_TTL, logger, updates=self.discovered,
+                                              empty_limit=config.DISCOVERY_EMPTY_LIMIT)
+        self.scheduler = EventScheduler(
+            max_concurrency=config.MAX_CONCURRENT_PAGES,
+            host_rate=config.HOST_RATE_LIMIT,
+            host_burst=config.HOST_BURST,
+            logger=logger
+        )
 
-    @staticmethod
-    async def get_event_links_for_perf(context: BrowserContext, perf_url: str, logger: logging.Logger) -> List[Tuple[str, str]]:
+    async def _crawl_listing(self, pool: PagePool, perf_url: str) -> Optional[List[Tuple[str, str]]]:
+        """
+        Crawls a performance page for discovery; when its event hrefs hash to the
+        fingerprint of the cached links, the cached links are returned as they are.
+        Returns None if the crawl failed, so the cache retries instead of storing an empty listing.
+        """
+        cached = self.discovery_cache.all_links([perf_url])
+        known = self.fingerprints.get(perf_url) if cached else None
+        async with self.scheduler.slot(perf_url):
+            try:
+                async with pool.lease() as page:
+                    await PerformanceScraper.navigate(page, perf_url, "listing")
+                    snapshot = await PerformanceScraper.extract_snapshot(page, ["links", "fingerprint"], known)
+            except Exception as e:
+                self.logger.error(f"Error extracting event links for {perf_url}: {e}")
+                METRICS.inc("errors_total", stage="discovery")
+                return None
+        self._count_fingerprint_check("listing", snapshot.unchanged)
+        if snapshot.unchanged:
+            return cached
+        self.logger.info(f"Extracted {len(snapshot.links)} event links from {perf_url}.")
+        if snapshot.links and snapshot.fingerprint:
+            self.fingerprints[perf_url] = snapshot.fingerprint
+        return [(link, perf_url) for link in snapshot.links]
+
+    def _count_fingerprint_check(self, kind: str, unchanged: bool) -> None:
+        METRICS.inc("page_checks_total", kind=kind, result="unchanged" if unchanged else "changed")
+        counts = self._fingerprint_checks.setdefault(kind, [0, 0])
+        counts[0] += 1
+        counts[1] += unchanged
+
+    async def check_event(self, pool: PagePool, event_url: str, performance_url: str) -> None:
+        with METRICS.time("stage_seconds", stage="check"):
+            await self._check_event(pool, event_url, performance_url)
+
+    async def _check_event(self, pool: PagePool, event_url: str, performance_url: str) -> None:
         try:
-            page = await PerformanceScraper.load_page(context, perf_url)
-            links = await PerformanceScraper.extract_event_links(page, logger)
-            await page.close()
-            return [(link, perf_url) for link in links]
+            known = self.fingerprints.get(event_url) if event_url in self.seat_states_by_url else None
+            if performance_url in self.config.HTTP_ENGINE_URLS:
+                snapshot = await self.http_scraper.scrape_event(event_url, known)
+                if snapshot is not None:
+                    await self._process_snapshot(event_url, performance_url, snapshot)
+                    return
+            async with pool.lease() as page:
+                await self._check_event_page(page, event_url, performance_url, known)
+        except PageNotFoundError:
+            self.logger.warning(f"Event {event_url} returned 404, re-crawling {performance_url}.")
+            self.discovery_cache.invalidate(performance_url, event_url)
+            self.seat_states_by_url.pop(event_url, None)
+            self._dirty_states.pop(event_url, None)
+            self._deleted_states.add(event_url)
+            self._forget_event(event_url)
         except Exception as e:
-            logger.error(f"Error extracting event links for {perf_url}: {e}")
-            return []
+            self.logger.error(f"Error checking event {event_url}: {e}")
+            METRICS.inc("errors_total", stage="check")
+            self.polling_policy.record_error(event_url)
+
+    async def _check_event_page(self, page: Page, event_url: str, performance_url: str,
+                                known_fingerprint: Optional[str] = None) -> None:
+        await PerformanceScraper.navigate(page, event_url, "event")
+        snapshot = await PerformanceScraper.extract_snapshot(page, EVENT_FIELDS, known_fingerprint)
+        if snapshot.html is None and not snapshot.unchanged and self.capture is not None and self.capture.include_html:
+            snapshot.html = await page.content()
+        await self._process_snapshot(event_url, performance_url, snapshot)
+
+    async def _process_snapshot(self, event_url: str, performance_url: str, snapshot: PageSnapshot) -> None:
+        self._count_fingerprint_check("event", snapshot.unchanged)
+        if snapshot.unchanged:
+            # Same content as the page behind the current seat state: skip the diff entirely.
+            self.polling_policy.record_check(event_url, False, None)
+            return
+        await self.process_event(event_url, performance_url, snapshot.title, snapshot.datetime,
+                                 snapshot.rects, snapshot.html)
+        if snapshot.fingerprint:
+            self.fingerprints[event_url] = snapshot.fingerprint
+
+    async def process_event(self, event_url: str, performance_url: str, show_title: str,
+                            event_datetime: str, rect_fill_colors: List[Dict[str, Any]],
+                            html: Optional[str] = None) -> None:
+        """
+        Diffs the extracted seat colors against the previous check and notifies about new free seats.
+
+        :param event_url: The event page URL.
+        :param performance_url: The performance page the event belongs to.
+        :param show_title: The show title.
+        :param event_datetime: The event date/time text.
+        :param rect_fill_colors: Rect dictionaries as returned by PerformanceScraper.get_rect_fill_colors.
+        :param html: Raw page HTML, recorded in capture mode when available.
+        """
+        # Whoever extracted this page re-records its fingerprint after the state is updated.
+        self.fingerprints.pop(event_url, None)
+        if self.capture is not None:
+            self.capture.record_event(event_url, performance_url, show_title, event_datetime,
+                                      rect_fill_colors, html)
+        if show_title == DEFAULT_TITLE:
+            show_title = await PerformanceScraper.get_fallback_name(performance_url)
+        self.logger.info(f"Event: {event_url} — found {len(rect_fill_colors)} rect elements.")
+
+        # Identify free seat elements based on their color. Seats keep their bit across checks
+        # through the event's layout; a fresh layout numbers them in DOM order, which also
+        # lines up with states saved before layouts existed.
+        with METRICS.time("stage_seconds", stage="diff"):
+            previous = self.seat_states_by_url.get(event_url)
+            layout = previous.layout if previous is not None and previous.layout is not None else SeatLayout()
+            seat_state = SeatState.from_rects(rect_fill_colors, self.config.IGNORED_COLORS, self.palette, layout)
+            new_mask = seat_state.new_seats(previous)
+            new_seats = popcount(new_mask)
+            group_size = self.config.MIN_ADJACENT_SEATS
+            if new_seats and group_size > 1:
+                hall = layout.hall_index()
+                if hall is not None:
+                    # Only new seats that form (or join) a group of adjacent free seats count.
+                    grouped = hall.new_seats_in_groups(seat_state.free_mask, new_mask, group_size)
+                    if grouped < new_seats:
+                        self.logger.info(f"Event: {event_url} — {new_seats - grouped} new seats "
+                                         f"without {group_size} adjacent free seats ignored.")
+                    new_seats = grouped
+
+        first_seen = event_url in self._first_seen_events
+        self._first_seen_events.discard(event_url)
+        if new_seats:
+            self.logger.info(f"New seats found for {show_title} ({event_datetime}): {new_seats}")
+            if self.send_notification:
+                alert = SeatAlert(show_title, event_datetime, event_url, performance_url, new_seats)
+                with METRICS.time("stage_seconds", stage="notify"):
+                    self.coalescer.add(alert, first_seen=first_seen)
+
+        self.seat_states_by_url[event_url] = seat_state
+        changed = seat_state != previous
+        show_time = parse_event_datetime(event_datetime)
+        if changed:
+            self._dirty_states[event_url] = seat_state
+            if self.history is not None:
+                self._record_history(event_url, performance_url, show_title, show_time, previous, seat_state)
+        self.polling_policy.record_check(event_url, changed, show_time)
+        self._note_first_check(event_url)
 
-    async def get_all_event_links(self, context: BrowserContext) -> List[Tuple[str, str]]:
-        tasks = [
-            self.get_event_links_for_perf(context, perf_url, self.logger)
-            for perf_url in self.performance_urls
+    def _record_history(self, event_url: str, performance_url: str, show_title: str, show_time: Any,
+                        previous: Optional[SeatState], seat_state: SeatState) -> None:
+        keys = seat_state.layout.keys if seat_state.layout is not None else None
+        changes = [
+            (keys[slot] if keys is not None else f"idx:{slot}", self.palette.color(code) if code is not None else None)
+            for slot, code in seat_state.changes(previous)
         ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        event_links: List[Tuple[str, str]] = []
-        for result in results:
-            if isinstance(result, Exception):
-                self.logger.error(f"Error in concurrent event link extraction: {result}")
-            else:
-                event_links.extend(result)
-        return event_links
-
-    async def check_event(self, context: BrowserContext, event_url: str, performance_url: str) -> None:
-        page = await context.new_page()
-        try:
-            await page.goto(event_url, timeout=self.config.NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
-            await page.wait_for_timeout(self.config.WAIT_TIMEOUT)
-
-            # Retrieve the show title and use fallback if necessary.
-            show_title = await PerformanceScraper.get_show_title(page, self.logger)
-            if show_title == "Вистава (назва не знайдена)":
-                show_title = await PerformanceScraper.get_fallback_name(performance_url)
-
-            event_datetime = await PerformanceScraper.get_event_datetime(page, self.logger)
-            rect_fill_colors = await PerformanceScraper.get_rect_fill_colors(page)
-            self.logger.info(f"Event: {event_url} — found {len(rect_fill_colors)} rect elements.")
-
-            # Identify free seat elements based on their color.
-            free_rects = {f"rect_{item['index']}_{item['color'].lower()}"
-                          for item in rect_fill_colors
-                          if item["color"] and item["color"].lower() not in self.config.IGNORED_COLORS}
-
-            previous = self.previous_free_rects_by_url.get(event_url, set())
-            new_seats = free_rects - previous
-
-            if new_seats:
-                msg = (
-                    f"\n🎭 *{show_title}*"
-                    f"\n🕒 {event_datetime}"
-                    f"\n🎟 Нові вільні місця: {len(new_seats)}"
-                    f"\n🔗 [Перейти до події]({event_url})"
+        # Without a previous state the free seats are a first observation, not releases.
+        self.history.record(event_url, performance_url, show_title, show_time, changes, snapshot=previous is None)
+
+    def _note_first_check(self, event_url: str) -> None:
+        now = time.monotonic()
+        if self._started is not None:
+            self.logger.info(f"First event checked {now - self._started:.2f}s after start.")
+            METRICS.observe("startup_first_check_seconds", now - self._started)
+            self._started = None
+        crawl_started = self._awaiting_first_check.pop(event_url, None)
+        if crawl_started is not None:
+            METRICS.observe("first_check_seconds", now - crawl_started)
+            self._first_check_delays.append(now - crawl_started)
+
+    def _start_live_watchers(self, context: BrowserContext,
+                             event_links: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Starts a LiveWatcher for every discovered event listed in Config.LIVE_WATCH_URLS.
+
+        :param context: The browser context live tabs are opened in.
+        :param event_links: Discovered (event_url, performance_url) tuples.
+        :return: The links that are not live-watched and still need polling.
+        """
+        polled = []
+        for event_url, perf_url in event_links:
+            if event_url not in self.config.LIVE_WATCH_URLS:
+                polled.append((event_url, perf_url))
+                continue
+            task = self._live_watchers.get(event_url)
+            if task is None or task.done():
+                watcher = LiveWatcher(
+                    context, event_url, perf_url,
+                    on_update=lambda snapshot, url=event_url, perf=perf_url: self.process_event(
+                        url, perf, snapshot.title, snapshot.datetime, snapshot.rects),
+                    scheduler=self.scheduler,
+                    logger=self.logger
                 )
-                self.logger.info(f"New seats found for {show_title}: {len(new_seats)}")
-                self.logger.info(msg)
-                if self.send_notification:
-                    self.notifier.send_message(msg)
+                self._live_watchers[event_url] = asyncio.ensure_future(watcher.run())
+        return polled
+
+    async def _stop_live_watchers(self) -> None:
+        for task in self._live_watchers.values():
+            task.cancel()
+        await asyncio.gather(*self._live_watchers.values(), return_exceptions=True)
+        self._live_watchers.clear()
 
-            self.previous_free_rects_by_url[event_url] = free_rects
+    def refresh_discovery(self, pool: PagePool) -> None:
+        """
+        Starts crawls of performance pages that were never crawled or whose links expired.
+        Results are merged by consume_discovery() as each page finishes.
+
+        :param pool: The page pool used for discovery.
+        """
+        self.discovery_cache.refresh(
+            self.performance_urls,
+            lambda perf_url: self._crawl_listing(pool, perf_url)
+        )
+
+    async def consume_discovery(self, browsers: BrowserRecycler) -> None:
+        """
+        Merges discovered link sets into the polling queue until cancelled.
+
+        :param browsers: The browser recycler (its current context hosts live-watch tabs).
+        """
+        while True:
+            perf_url, links, crawl_started = await self.discovered.get()
+            try:
+                self.merge_discovered(browsers.context, perf_url, links, crawl_started)
+            except Exception as e:
+                self.logger.error(f"Error merging discovered events for {perf_url}: {e}")
+                METRICS.inc("errors_total", stage="discovery")
 
+    def merge_discovered(self, context: Optional[BrowserContext], perf_url: str,
+                         links: List[Tuple[str, str]], crawl_started: float) -> None:
+        """
+        Feeds one performance's current event links to the polling queue; new events are due immediately.
+
+        :param context: The browser context live-watch tabs are opened in.
+        :param perf_url: The crawled performance page.
+        :param links: Its (event_url, performance_url) tuples.
+        :param crawl_started: Monotonic time the crawl started, for time-to-first-check reporting.
+        """
+        current = {event_url for event_url, _ in links}
+        # Live-watched events are not in the polling queue, so sync_performance() cannot report them as gone.
+        gone_live = [event_url for event_url in self._known_events.get(perf_url, set()) - current
+                     if event_url in self._live_watchers]
+        self.note_discovered(links, [perf_url])
+        self._dirty_links[perf_url] = links
+        if self.capture is not None:
+            self.capture.record_discovery(self.discovery_cache.all_links(self.performance_urls))
+        if context is not None:
+            polled = self._start_live_watchers(context, links)
+        else:
+            # Without a browser yet, live-watched events wait for _start_live_watchers().
+            polled = [link for link in links if link[0] not in self.config.LIVE_WATCH_URLS]
+        for event_url, _ in polled:
+            if event_url not in self.polling_queue:
+                self._awaiting_first_check[event_url] = crawl_started
+        for event_url in self.polling_queue.sync_performance(perf_url, polled) + gone_live:
+            self._forget_event(event_url)
+
+    def note_discovered(self, event_links: List[Tuple[str, str]], perf_urls: Optional[List[str]] = None) -> None:
+        """
+        Records a discovery result; events that appear after their performance's first crawl count as first seen.
+
+        :param event_links: Discovered (event_url, performance_url) tuples.
+        :param perf_urls: Performances the result covers (defaults to those present in event_links).
+        """
+        by_perf: Dict[str, set] = {perf_url: set() for perf_url in perf_urls or []}
+        for event_url, perf_url in event_links:
+            by_perf.setdefault(perf_url, set()).add(event_url)
+        for perf_url, discovered in by_perf.items():
+            known = self._known_events.get(perf_url)
+            if known is not None:
+                # Events that appear after the first discovery are alerted without coalescing.
+                self._first_seen_events |= discovered - known
+            self._known_events[perf_url] = discovered
+
+    def _forget_event(self, event_url: str) -> None:
+        self.polling_queue.remove(event_url)
+        self.polling_policy.forget(event_url)
+        self.coalescer.forget(event_url)
+        self._first_seen_events.discard(event_url)
+        self._awaiting_first_check.pop(event_url, None)
+        self.fingerprints.pop(event_url, None)
+        self.http_scraper.forget(event_url)
+        task = self._live_watchers.pop(event_url, None)
+        if task is not None:
+            # Cancelling runs the watcher's cleanup, which closes its live tab.
+            task.cancel()
+
+    def _register_gauges(self, browsers: BrowserRecycler) -> None:
+        METRICS.gauge("open_pages", lambda: browsers.pool.open_pages)
+        METRICS.gauge("leased_pages", lambda: browsers.pool.leased_pages)
+        METRICS.gauge("polled_events", lambda: len(self.polling_queue))
+        METRICS.gauge("due_events", self.polling_queue.due_count)
+        pending = getattr(self.notifier, "pending", None)
+        if pending is not None:
+            METRICS.gauge("notification_queue", lambda: self.notifier.pending)
+
+    def log_cycle_stats(self) -> None:
+        """
+        Logs per-interval statistics of the subsystems.
+        """
+        self.logger.info(f"Polling {len(self.polling_queue)} events, {self.polling_queue.due_count()} due now.")
+        for kind, (checks, unchanged) in sorted(self._fingerprint_checks.items()):
+            self.logger.info(f"Unchanged {kind} pages skipped: {unchanged}/{checks} ({unchanged / checks:.0%}).")
+        self._fingerprint_checks = {}
+        if self._first_check_delays:
+            delays, self._first_check_delays = self._first_check_delays, []
+            self.logger.info(
+                f"Checked {len(delays)} newly discovered events, first {min(delays):.2f}s and "
+                f"last {max(delays):.2f}s after their listing crawl started."
+            )
+        if self.network_profile:
+            self.network_profile.log_cycle_stats()
+        for page_type, stats in PerformanceScraper.take_readiness_stats().items():
+            self.logger.info(
+                f"Readiness wait ({page_type}): {stats['count']} pages, "
+                f"avg {stats['avg_ms']:.0f} ms, max {stats['max_ms']:.0f} ms."
+            )
+
+    def restore_state(self) -> None:
+        """
+        Loads the seat states saved by a previous run so the first cycle only reports real changes,
+        and queues the events last discovered so checks can start before any listing is re-crawled.
+        """
+        if self.state_store is None:
+            return
+        try:
+            self.seat_states_by_url.update(self.state_store.load(self.palette))
         except Exception as e:
-            self.logger.error(f"Error checking event {event_url}: {e}")
-        finally:
-            await page.close()
+            self.logger.error(f"Error loading stored seat states: {e}")
+        try:
+            stored_links = self.state_store.load_links()
+        except Exception as e:
+            self.logger.error(f"Error loading stored event links: {e}")
+            return
+        restored = 0
+        now = time.monotonic()
+        for perf_url in self.performance_urls:
+            links = stored_links.get(perf_url)
+            if not links:
+                continue
+            self.discovery_cache.seed(perf_url, links)
+            self.merge_discovered(None, perf_url, links, now)
+            self._dirty_links.pop(perf_url, None)
+            restored += len(links)
+        if restored:
+            self.logger.info(f"Warm start: {restored} events restored, listings are re-crawled in the background.")
+
+    async def flush_state(self) -> None:
+        """
+        Persists only the events whose seat state changed since the last flush, off the event loop.
+        """
+        if self.state_store is None or not (self._dirty_states or self._deleted_states or self._dirty_links):
+            return
+        dirty, self._dirty_states = self._dirty_states, {}
+        deleted, self._deleted_states = self._deleted_states, set()
+        links, self._dirty_links = self._dirty_links, {}
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.state_store.save, dirty, self.palette)
+            if deleted:
+                await loop.run_in_executor(None, self.state_store.delete, deleted)
+            if links:
+                await loop.run_in_executor(None, self.state_store.save_links, links)
+        except Exception as e:
+            self.logger.error(f"Error saving seat states: {e}")
+            # Retry on the next flush unless a newer state has been recorded meanwhile.
+            for url, state in dirty.items():
+                self._dirty_states.setdefault(url, state)
+            self._deleted_states |= deleted
+            for url, perf_links in links.items():
+                self._dirty_links.setdefault(url, perf_links)
 
     async def run_monitoring(self) -> None:
         self.logger.info("🎭 Monitoring started.")
+        self._started = time.monotonic()
+        self.restore_state()
         if self.send_notification:
             self.notifier.send_message("🎭 Monitoring multiple performances started.")
+        async def setup_context(context: BrowserContext) -> None:
+            # Request routing disables Chromium's HTTP cache, so it is skipped where the cache is kept warm.
+            await self.network_profile.attach(context, intercept=not browsers.keeps_cache)
+
         async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True)
-            context = await browser.new_context()
+            browsers = BrowserRecycler(
+                playwright, self.logger,
+                pool_size=self.config.PAGE_POOL_SIZE,
+                page_max_uses=self.config.PAGE_MAX_USES,
+                max_pages=self.config.BROWSER_MAX_PAGES,
+                max_rss_mb=self.config.BROWSER_MAX_RSS_MB,
+                max_uptime=self.config.BROWSER_MAX_UPTIME,
+                drain_timeout=self.config.BROWSER_DRAIN_TIMEOUT,
+                setup_context=setup_context if self.network_profile else None,
+                cdp_url=self.config.BROWSER_CDP_URL,
+                user_data_dir=self.config.BROWSER_USER_DATA_DIR
+            )
+            await browsers.start()
+            self.logger.info(f"Browser ready {time.monotonic() - self._started:.2f}s after start ({browsers.mode}).")
+            # Restored events were queued without a context; open their live-watch tabs now.
+            self._start_live_watchers(browsers.context, self.discovery_cache.all_links(self.performance_urls))
+            self._register_gauges(browsers)
+            metrics_server = MetricsServer(
+                METRICS, self.config.METRICS_HOST, self.config.METRICS_PORT, self.logger
+            ) if self.config.METRICS_ENABLED else None
+            if metrics_server is not None:
+                try:
+                    await metrics_server.start()
+                except OSError as e:
+                    self.logger.error(f"Could not start metrics server: {e}")
+                    metrics_server = None
 
-            while True:
-                elapsed = time.time() - self._last_check_time
-                if elapsed < self.config.MIN_CHECK_INTERVAL:
-                    await asyncio.sleep(self.config.MIN_CHECK_INTERVAL - elapsed)
-                self._last_check_time = time.time()
+            loop_lag = asyncio.ensure_future(probe_loop_lag())
+            consumer = asyncio.ensure_future(self.consume_discovery(browsers))
 
-                try:
-                    event_links = await self.get_all_event_links(context)
-                    if event_links:
-                        tasks = [
-                            self.check_event(context, link, perf_url)
-                            for (link, perf_url) in event_links
-                        ]
-                        await asyncio.gather(*tasks, return_exceptions=True)
-                except Exception as e:
-                    self.logger.error(f"Error in main monitoring loop: {e}")
-
-                await asyncio.sleep(self.config.SLEEP_INTERVAL)
+            # The pool is looked up per check so checks move to a recycled browser immediately.
+            workers = asyncio.ensure_future(self.scheduler.run_continuous(
+                self.polling_queue,
+                lambda link, perf_url: self.check_event(browsers.pool, link, perf_url),
+                self.polling_policy.next_interval
+            ))
+            try:
+                while True:
+                    with METRICS.time("stage_seconds", stage="cycle"):
+                        try:
+                            if await browsers.maybe_recycle():
+                                # Live tabs belong to the old context; reopen them in the new one.
+                                await self._stop_live_watchers()
+                                self._start_live_watchers(
+                                    browsers.context, self.discovery_cache.all_links(self.performance_urls))
+                            # Crawls run in the background and feed the workers as each page finishes.
+                            self.refresh_discovery(browsers.pool)
+                        except Exception as e:
+                            self.logger.error(f"Error in main monitoring loop: {e}")
+                            METRICS.inc("errors_total", stage="cycle")
+
+                        with METRICS.time("stage_seconds", stage="notify"):
+                            self.coalescer.flush()
+                        await self.flush_state()
+                        if self.capture is not None:
+                            await self.capture.flush()
+                        self.log_cycle_stats()
+                    await asyncio.sleep(self.config.SLEEP_INTERVAL)
+            finally:
+                workers.cancel()
+                loop_lag.cancel()
+                consumer.cancel()
+                await asyncio.gather(workers, loop_lag, consumer, return_exceptions=True)
+                await self._stop_live_watchers()
+                await self.flush_state()
+                if self.capture is not None:
+                    await self.capture.flush()
+                await self.discovery_cache.close()
+                if self.history is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, self.history.close)
+                await self.http_scraper.close()
+                await browsers.close()
+                if metrics_server is not None:
+                    await metrics_server.close()
@@ -0,0 +1,120 @@
+# network_profile.py
+
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable
+
+from playwright.async_api import BrowserContext, Request, Route
+
+
+class NetworkProfile:
+    """
+    Request-interception profile for a Playwright browser context.
+
+    Requests are blocked by resource type or URL pattern; allow patterns take precedence.
+    Note that enabling routing disables Chromium's HTTP cache for the context.
+    """
+
+    def __init__(self, blocked_resource_types: Iterable[str], blocked_url_patterns: Iterable[str],
+                 allowed_url_patterns: Iterable[str], logger: logging.Logger,
+                 dry_run: bool = False) -> None:
+        """
+        :param blocked_resource_types: Playwright resource types to block (e.g. "image", "font").
+        :param blocked_url_patterns: Regular expressions; matching URLs are blocked.
+        :param allowed_url_patterns: Regular expressions; matching URLs are never blocked.
+        :param logger: A configured logger.
+        :param dry_run: If True, requests are only counted, not blocked, so the bytes
+                        a profile would save can be measured.
+        """
+        self.blocked_resource_types = set(blocked_resource_types)
+        self.blocked_url_patterns = [re.compile(p) for p in blocked_url_patterns]
+        self.allowed_url_patterns = [re.compile(p) for p in allowed_url_patterns]
+        self.logger = logger
+        self.dry_run = dry_run
+        self._reset()
+
+    def _reset(self) -> None:
+        self.blocked_requests: Counter = Counter()
+        self.blocked_bytes = 0
+        self.allowed_requests = 0
+        self.received_bytes = 0
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """
+        Decides whether a request matches the profile's deny rules.
+
+        :param resource_type: The Playwright resource type of the request.
+        :param url: The request URL.
+        :return: True if the request should be blocked.
+        """
+        if any(p.search(url) for p in self.allowed_url_patterns):
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return any(p.search(url) for p in self.blocked_url_patterns)
+
+    async def attach(self, context: BrowserContext, intercept: bool = True) -> None:
+        """
+        Installs the interception route and transfer-size accounting on a context.
+
+        :param context: The browser context to apply the profile to.
+        :param intercept: False to only account responses, e.g. for a context whose
+                          warm disk cache matters more than the blocked requests.
+        """
+        if intercept:
+            await context.route("**/*", self._handle_route)
+        context.on("requestfinished", self._on_request_finished)
+
+    async def _handle_route(self, route: Route) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_requests[request.resource_type] += 1
+            if not self.dry_run:
+                await route.abort()
+                return
+        else:
+            self.allowed_requests += 1
+        await route.continue_()
+
+    async def _on_request_finished(self, request: Request) -> None:
+        # Content-Length is missing on chunked and compressed responses; the measured body size is not.
+        try:
+            size = (await request.sizes())["responseBodySize"]
+        except Exception:
+            return
+        self.received_bytes += size
+        if self.dry_run and self.should_block(request.resource_type, request.url):
+            self.blocked_bytes += size
+
+    def take_cycle_stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters collected since the previous call and resets them.
+
+        :return: Dictionary with blocked/allowed request counts and byte totals. blocked_bytes
+                 is only present in dry-run mode: aborted requests never report a size.
+        """
+        stats = {
+            "blocked_requests": sum(self.blocked_requests.values()),
+            "blocked_by_type": dict(self.blocked_requests),
+            "allowed_requests": self.allowed_requests,
+            "received_bytes": self.received_bytes,
+        }
+        if self.dry_run:
+            stats["blocked_bytes"] = self.blocked_bytes
+        self._reset()
+        return stats
+
+    def log_cycle_stats(self) -> None:
+        """
+        Logs and resets the per-cycle counters.
+        """
+        stats = self.take_cycle_stats()
+        blocked = f"blocked {stats['blocked_requests']} requests {stats['blocked_by_type']}"
+        if self.dry_run:
+            blocked = f"would block {stats['blocked_requests']} requests {stats['blocked_by_type']} " \
+                      f"({stats['blocked_bytes']} bytes)"
+        self.logger.info(
+            f"Network profile: {blocked}, allowed {stats['allowed_requests']} requests, "
+            f"received {stats['received_bytes']} bytes."
+        )
@@ -1,9 +1,13 @@
 # notifier.py
 
+import asyncio
 import logging
 import requests
+import aiohttp
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
+
+from metrics import METRICS
 
 
 class Notifier(ABC):
@@ -49,3 +53,137 @@ class TelegramNotifier(Notifier):
                 requests.post(url, data={"chat_id": chat_id, "text": message, "parse_mode": "Markdown"})
             except Exception as e:
                 self.logger.error(f"Error sending message to {chat_id}: {e}")
+
+
+class AsyncTelegramNotifier(Notifier):
+    """
+    Non-blocking Telegram notifier.
+
+    send_message only enqueues the message; a background task delivers it to
+    all chat IDs concurrently over a pooled aiohttp session, retrying 429
+    responses after Telegram's retry_after and other failures with
+    exponential backoff.
+    """
+
+    def __init__(self, bot_token: str, chat_ids: List[str], logger: logging.Logger,
+                 api_base: str = "https://api.telegram.org", max_retries: int = 3,
+                 timeout: float = 10.0, max_connections: int = 10, queue_size: int = 1000) -> None:
+        """
+        :param bot_token: The Telegram Bot API token.
+        :param chat_ids: A list of Telegram chat IDs.
+        :param logger: A logger instance for logging errors.
+        :param api_base: Base URL of the Bot API (overridable for tests).
+        :param max_retries: Retries per chat after the first attempt.
+        :param timeout: Total timeout in seconds for one HTTP request.
+        :param max_connections: Size of the HTTP connection pool.
+        :param queue_size: Maximum number of undelivered messages kept in memory.
+        """
+        self.bot_token = bot_token
+        self.chat_ids = [chat_id for chat_id in chat_ids if chat_id]
+        self.logger = logger
+        self.api_base = api_base.rstrip("/")
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def send_message(self, message: str) -> None:
+        """
+        Queues a message for delivery to all configured chat IDs without waiting.
+
+        :param message: The message text.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.logger.error("Notification queue is full, dropping message.")
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of messages waiting for delivery.
+        """
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """
+        Starts the delivery task if it is not running (requires a running event loop).
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self.deliver(message)
+            except Exception as e:
+                self.logger.error(f"Error delivering notification: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def deliver(self, message: str) -> None:
+        """
+        Sends a message to all chat IDs concurrently.
+
+        :param message: The message text.
+        """
+        with METRICS.time("stage_seconds", stage="delivery"):
+            await asyncio.gather(*(self._send_to(chat_id, message) for chat_id in self.chat_ids))
+
+    async def _send_to(self, chat_id: str, message: str) -> None:
+        url = f"{self.api_base}/bot{self.bot_token}/sendMessage"
+        data = {"chat_id": chat_id, "text": message, "parse_mode": "Markdown"}
+        for attempt in range(self.max_retries + 1):
+            delay = 2 ** attempt
+            try:
+                async with self._get_session().post(url, data=data) as response:
+                    if response.status == 200:
+                        return
+                    body = await response.json(content_type=None) or {}
+                    if response.status == 429:
+                        delay = (body.get("parameters") or {}).get("retry_after", delay)
+                    elif response.status < 500:
+                        # Client errors (bad token, unknown chat, malformed Markdown) will not succeed on retry.
+                        self.logger.error(f"Telegram rejected message to {chat_id}: "
+                                          f"{response.status} {body.get('description')}")
+                        METRICS.inc("errors_total", stage="delivery")
+                        return
+                    self.logger.warning(f"Telegram returned {response.status} for {chat_id}, "
+                                        f"retrying in {delay}s.")
+            except Exception as e:
+                self.logger.warning(f"Error sending message to {chat_id}: {e}")
+                if isinstance(e, asyncio.TimeoutError):
+                    METRICS.inc("timeouts_total", stage="delivery")
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+        self.logger.error(f"Giving up on message to {chat_id} after {self.max_retries + 1} attempts.")
+        METRICS.inc("errors_total", stage="delivery")
+
+    async def close(self, drain_timeout: float = 10.0) -> None:
+        """
+        Delivers queued messages (waiting at most drain_timeout seconds) and releases the session.
+
+        :param drain_timeout: Seconds to wait for the queue to drain.
+        """
+        if self._worker is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"{self._queue.qsize()} notifications were not delivered before shutdown.")
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
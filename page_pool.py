@@ -0,0 +1,118 @@
+# page_pool.py
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+from playwright.async_api import BrowserContext, Page
+
+
+class PagePool:
+    """
+    Keeps a bounded set of warm Playwright pages and leases them out,
+    so tabs are not created and closed for every URL.
+    """
+
+    def __init__(self, context: BrowserContext, max_size: int, logger: logging.Logger,
+                 max_uses: int = 0) -> None:
+        """
+        :param context: The browser context pages are created in.
+        :param max_size: Maximum number of pages alive at the same time.
+        :param logger: A configured logger.
+        :param max_uses: Replace a page after this many leases (0 disables it).
+        """
+        self.context = context
+        self.max_size = max_size
+        self.logger = logger
+        self.max_uses = max_uses
+        self._idle: List[Page] = []
+        self._uses: Dict[Page, int] = {}
+        self._crashed: set = set()
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._closed = False
+        self.total_leases = 0
+
+    @property
+    def open_pages(self) -> int:
+        """
+        Number of pages currently alive (leased or idle).
+        """
+        return len(self._uses)
+
+    @property
+    def leased_pages(self) -> int:
+        """
+        Number of pages currently leased out.
+        """
+        return len(self._uses) - len(self._idle)
+
+    async def _new_page(self) -> Page:
+        page = await self.context.new_page()
+        page.on("crash", lambda _: self._crashed.add(page))
+        self._uses[page] = 0
+        return page
+
+    def _is_healthy(self, page: Page) -> bool:
+        return page not in self._crashed and not page.is_closed()
+
+    async def _discard(self, page: Page) -> None:
+        self._uses.pop(page, None)
+        self._crashed.discard(page)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing pooled page: {e}")
+
+    async def _acquire(self) -> Page:
+        while self._idle:
+            page = self._idle.pop()
+            if self._is_healthy(page):
+                return page
+            self.logger.warning("Replacing crashed or closed pooled page.")
+            await self._discard(page)
+        return await self._new_page()
+
+    async def _release(self, page: Page) -> None:
+        self._uses[page] = self._uses.get(page, 0) + 1
+        if self._closed or not self._is_healthy(page) or (
+                self.max_uses and self._uses[page] >= self.max_uses):
+            await self._discard(page)
+            return
+        try:
+            # Drop the previous document so scripts and timers stop running while idle.
+            await page.goto("about:blank")
+        except Exception as e:
+            self.logger.warning(f"Error resetting pooled page, replacing it: {e}")
+            await self._discard(page)
+            return
+        self._idle.append(page)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Page]:
+        """
+        Leases a healthy page for the duration of the block and returns it to the pool afterwards.
+        """
+        async with self._semaphore:
+            page = await self._acquire()
+            self.total_leases += 1
+            try:
+                yield page
+            finally:
+                await self._release(page)
+
+    async def warm(self, count: int) -> None:
+        """
+        Opens idle pages ahead of use, up to count pages and the pool size.
+        """
+        while len(self._uses) < min(count, self.max_size):
+            self._idle.append(await self._new_page())
+
+    async def close(self) -> None:
+        """
+        Closes all idle pages; leased pages are closed when they are released.
+        """
+        self._closed = True
+        while self._idle:
+            await self._discard(self._idle.pop())
@@ -0,0 +1,278 @@
+# polling.py
+
+import asyncio
+import heapq
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+UKRAINIAN_MONTHS = {
+    "січня": 1, "лютого": 2, "березня": 3, "квітня": 4, "травня": 5, "червня": 6,
+    "липня": 7, "серпня": 8, "вересня": 9, "жовтня": 10, "листопада": 11, "грудня": 12,
+}
+
+
+def parse_event_datetime(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Parses the date text returned by PerformanceScraper.get_event_datetime,
+    e.g. "12 квітня 2025, 19:00", "12 квітня, 19:00" or "12.04.2025 19:00".
+    A missing year is resolved to the next occurrence of the date.
+
+    :param text: The event date/time text.
+    :param now: Reference time (defaults to the current local time).
+    :return: The parsed datetime, or None if the text has no recognizable date.
+    """
+    if not text:
+        return None
+    now = now or datetime.now()
+    lowered = text.lower()
+    day = month = year = None
+
+    match = re.search(r"(\d{1,2})\s+(" + "|".join(UKRAINIAN_MONTHS) + r")(?:\s+(\d{4}))?", lowered)
+    if match:
+        day, month = int(match.group(1)), UKRAINIAN_MONTHS[match.group(2)]
+        year = int(match.group(3)) if match.group(3) else None
+    else:
+        match = re.search(r"(\d{1,2})\.(\d{1,2})(?:\.(\d{2,4}))?", lowered)
+        if match:
+            day, month = int(match.group(1)), int(match.group(2))
+            if match.group(3):
+                year = int(match.group(3))
+                year = year + 2000 if year < 100 else year
+    if day is None:
+        return None
+
+    hour = minute = 0
+    time_match = re.search(r"(\d{1,2}):(\d{2})", lowered)
+    if time_match:
+        hour, minute = int(time_match.group(1)), int(time_match.group(2))
+
+    try:
+        if year is not None:
+            return datetime(year, month, day, hour, minute)
+        candidate = datetime(now.year, month, day, hour, minute)
+        if (now - candidate).days > 1:
+            candidate = datetime(now.year + 1, month, day, hour, minute)
+        return candidate
+    except ValueError:
+        return None
+
+
+class EventPollState:
+    """
+    What the adaptive policy knows about one event.
+    """
+
+    __slots__ = ("last_change", "errors", "show_time")
+
+    def __init__(self) -> None:
+        self.last_change: Optional[float] = None
+        self.errors = 0
+        self.show_time: Optional[datetime] = None
+
+
+class AdaptivePollingPolicy:
+    """
+    Computes how long to wait before an event is checked again.
+
+    The interval starts at min_interval and grows with the time since the
+    event's seats last changed and with the distance to the show date;
+    consecutive errors back off exponentially. The result is clamped to
+    [min_interval, max_interval].
+    """
+
+    def __init__(self, min_interval: float = Config.MIN_CHECK_INTERVAL,
+                 max_interval: float = Config.POLL_MAX_INTERVAL,
+                 staleness_scale: float = Config.POLL_STALENESS_SCALE,
+                 horizon_days: float = Config.POLL_HORIZON_DAYS) -> None:
+        """
+        :param min_interval: Shortest interval in seconds (hot events).
+        :param max_interval: Longest interval in seconds.
+        :param staleness_scale: Seconds without a change after which the interval doubles.
+        :param horizon_days: Days until the show after which the interval doubles.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.staleness_scale = staleness_scale
+        self.horizon_days = horizon_days
+        self.events: Dict[str, EventPollState] = {}
+
+    def _state(self, event_url: str) -> EventPollState:
+        state = self.events.get(event_url)
+        if state is None:
+            state = self.events[event_url] = EventPollState()
+        return state
+
+    def record_check(self, event_url: str, changed: bool, show_time: Optional[datetime]) -> None:
+        """
+        Records a successful check.
+
+        :param event_url: The checked event.
+        :param changed: Whether the seat state differed from the previous check.
+        :param show_time: The parsed show date, if known.
+        """
+        state = self._state(event_url)
+        state.errors = 0
+        if changed or state.last_change is None:
+            # Staleness counts from the first check, so events restored unchanged still slow down.
+            state.last_change = time.monotonic()
+        if show_time is not None:
+            state.show_time = show_time
+
+    def record_error(self, event_url: str) -> None:
+        """
+        Records a failed check.
+        """
+        self._state(event_url).errors += 1
+
+    def forget(self, event_url: str) -> None:
+        """
+        Drops the state of an event that is no longer monitored.
+        """
+        self.events.pop(event_url, None)
+
+    def next_interval(self, event_url: str, now: Optional[datetime] = None) -> float:
+        """
+        Seconds until the event should be checked again.
+        """
+        # Read-only: an event dropped by forget() while being checked must not come back.
+        state = self.events.get(event_url) or EventPollState()
+        interval = self.min_interval
+
+        if state.last_change is not None:
+            interval *= 1 + (time.monotonic() - state.last_change) / self.staleness_scale
+
+        if state.show_time is not None:
+            days_until = ((state.show_time - (now or datetime.now())).total_seconds()) / 86400
+            interval *= 1 + max(days_until, 0) / self.horizon_days
+
+        interval *= 2 ** min(state.errors, 10)
+        return max(self.min_interval, min(interval, self.max_interval))
+
+
+class PollingQueue:
+    """
+    Priority queue of events ordered by their next-due time, with one heap per
+    performance. When events of several performances are due, get() serves
+    the performances round-robin, so one with many dates cannot starve the
+    others during a backlog. Rescheduling an event leaves a stale heap entry
+    that is skipped on pop.
+    """
+
+    def __init__(self) -> None:
+        self._heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        # Performance URL -> counter value when one of its events was last handed out.
+        self._served: Dict[str, int] = {}
+        self._due: Dict[str, float] = {}
+        self._perf: Dict[str, str] = {}
+        self._leased: set = set()
+        self._counter = 0
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, event_url: str) -> bool:
+        return event_url in self._due or event_url in self._leased
+
+    def due_count(self) -> int:
+        """
+        Number of events whose due time has passed (the backlog waiting for a worker).
+        """
+        now = time.monotonic()
+        return sum(1 for due in self._due.values() if due <= now)
+
+    def schedule(self, event_url: str, perf_url: str, delay: float = 0.0) -> None:
+        """
+        Schedules (or reschedules) an event to be checked after delay seconds.
+        """
+        due = time.monotonic() + delay
+        self._leased.discard(event_url)
+        self._due[event_url] = due
+        self._perf[event_url] = perf_url
+        self._counter += 1
+        heapq.heappush(self._heaps.setdefault(perf_url, []), (due, self._counter, event_url))
+        self._changed.set()
+
+    def remove(self, event_url: str) -> None:
+        """
+        Stops checking an event (a check in progress is not rescheduled).
+        """
+        self._due.pop(event_url, None)
+        self._perf.pop(event_url, None)
+        self._leased.discard(event_url)
+
+    def sync_performance(self, perf_url: str, jobs: List[Tuple[str, str]]) -> List[str]:
+        """
+        Adds newly discovered events of one performance (due immediately) and removes
+        those of its events that are no longer listed.
+
+        :param perf_url: The performance whose event list was discovered.
+        :param jobs: Its current (event_url, performance_url) tuples.
+        :return: Event URLs of this performance that were removed.
+        """
+        current = {event_url for event_url, _ in jobs}
+        removed = sorted(url for url in set(self._due) | self._leased
+                         if self._perf.get(url) == perf_url and url not in current)
+        for url in removed:
+            self.remove(url)
+        for event_url, job_perf_url in jobs:
+            if event_url not in self:
+                self.schedule(event_url, job_perf_url)
+        return removed
+
+    async def get(self) -> Tuple[str, str]:
+        """
+        Waits for the next due event and leases it until it is rescheduled or removed.
+
+        :return: An (event_url, performance_url) tuple.
+        """
+        while True:
+            self._changed.clear()
+            now = time.monotonic()
+            next_due = None
+            pick = None
+            for perf_url in list(self._heaps):
+                head = self._head(perf_url)
+                if head is None:
+                    continue
+                if head <= now:
+                    if pick is None or self._served.get(perf_url, 0) < self._served.get(pick, 0):
+                        pick = perf_url
+                elif next_due is None or head < next_due:
+                    next_due = head
+            if pick is not None:
+                _, _, event_url = heapq.heappop(self._heaps[pick])
+                del self._due[event_url]
+                self._leased.add(event_url)
+                self._counter += 1
+                self._served[pick] = self._counter
+                return event_url, pick
+            delay = next_due - now if next_due is not None else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _head(self, perf_url: str) -> Optional[float]:
+        """
+        Due time of a performance's earliest event, dropping stale entries (and empty heaps).
+        """
+        heap = self._heaps[perf_url]
+        while heap:
+            due, _, event_url = heap[0]
+            if self._due.get(event_url) == due and self._perf.get(event_url) == perf_url:
+                return due
+            heapq.heappop(heap)
+        del self._heaps[perf_url]
+        return None
+
+    def release(self, event_url: str, delay: float) -> None:
+        """
+        Reschedules a leased event unless it was removed while being checked.
+        """
+        if event_url in self._leased:
+            self.schedule(event_url, self._perf[event_url], delay)
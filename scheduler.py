@@ -0,0 +1,114 @@
+# scheduler.py
+
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from polling import PollingQueue
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket used to rate limit requests to a single host.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens (burst size).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """
+        Waits until a token is available and consumes it.
+        The token is reserved before sleeping (the balance may go negative), so waiters are
+        served in arrival order without holding a lock across the sleep.
+        """
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return
+        try:
+            await asyncio.sleep(-self._tokens / self.rate)
+        except asyncio.CancelledError:
+            # Give the reservation back, or later waiters would wait for a token nobody used.
+            self._tokens += 1
+            raise
+
+
+class EventScheduler:
+    """
+    Runs page jobs with a global concurrency cap and a per-host token bucket.
+    Fairness across performances comes from the PollingQueue feeding it.
+    """
+
+    def __init__(self, max_concurrency: int, host_rate: float, host_burst: int,
+                 logger: logging.Logger) -> None:
+        """
+        :param max_concurrency: Maximum number of pages processed at the same time.
+        :param host_rate: Allowed navigations per second for each host.
+        :param host_burst: Number of navigations a host may receive in a burst.
+        :param logger: A configured logger.
+        """
+        self.max_concurrency = max_concurrency
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.logger = logger
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.host_rate, self.host_burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """
+        Holds one concurrency slot and one host token for the duration of the block.
+
+        :param url: The URL about to be loaded (used to select the host bucket).
+        """
+        async with self._semaphore:
+            await self._bucket_for(url).acquire()
+            yield
+
+    async def run_continuous(self, queue: "PollingQueue",
+                             worker: Callable[[str, str], Awaitable[None]],
+                             next_interval: Callable[[str], float]) -> None:
+        """
+        Runs max_concurrency workers that take due events from a PollingQueue until cancelled.
+        After each check the event is rescheduled with next_interval(event_url) seconds of delay.
+
+        :param queue: The polling queue feeding the workers.
+        :param worker: Coroutine function called as worker(event_url, performance_url).
+        :param next_interval: Returns the delay before an event's next check.
+        """
+        async def consume() -> None:
+            while True:
+                event_url, perf_url = await queue.get()
+                try:
+                    async with self.slot(event_url):
+                        await worker(event_url, perf_url)
+                except Exception as e:
+                    self.logger.error(f"Error processing {event_url}: {e}")
+                finally:
+                    queue.release(event_url, next_interval(event_url))
+
+        await asyncio.gather(*(consume() for _ in range(self.max_concurrency)))
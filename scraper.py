@@ -1,9 +1,129 @@
 # scraper.py
 
-from typing import List, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterable, Optional
+import time
 import logging
-from playwright.async_api import BrowserContext, Page
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 from config import Config
+from metrics import METRICS
+
+
+DEFAULT_TITLE = "Вистава (назва не знайдена)"
+DEFAULT_DATETIME = "Дата та час не знайдені"
+DATETIME_SELECTORS = [".event-date", ".event-datetime", "time", ".date", ".performance-date", ".event-info span"]
+SNAPSHOT_FIELDS = ("title", "datetime", "links", "rects")
+EVENT_FIELDS = ("title", "datetime", "rects", "fingerprint")
+
+# Describes one seat rect: DOM index, computed fill and the stable attributes seat_key() uses.
+RECT_DESCRIPTOR = """
+    (r, i) => ({
+        index: i,
+        color: getComputedStyle(r).fill,
+        id: r.id || null,
+        x: r.getAttribute("x"),
+        y: r.getAttribute("y"),
+        row: r.getAttribute("data-row"),
+        seat: r.getAttribute("data-seat")
+    })
+"""
+
+# Reads every requested field in one evaluate call. With "fingerprint", the other
+# requested fields are hashed in the page (two 32-bit FNV-1a lanes); if the hash
+# equals `known`, only the fingerprint is returned and nothing else is serialized.
+SNAPSHOT_SCRIPT = """
+    ({fields, datetimeSelectors, linkPattern, known}) => {
+        const want = new Set(fields);
+        const result = {};
+        if (want.has("title")) {
+            const h1 = document.querySelector("h1");
+            result.title = h1 ? h1.innerText.trim() : null;
+        }
+        if (want.has("datetime")) {
+            result.datetime = null;
+            for (const sel of datetimeSelectors) {
+                const el = document.querySelector(sel);
+                const text = el ? el.innerText.trim() : "";
+                if (text) {
+                    result.datetime = text;
+                    break;
+                }
+            }
+        }
+        if (want.has("links")) {
+            const anchors = document.querySelectorAll("a");
+            result.anchorCount = anchors.length;
+            result.links = [];
+            for (const a of anchors) {
+                const href = a.getAttribute("href");
+                if (href && href.includes(linkPattern)) {
+                    result.links.push(href);
+                }
+            }
+        }
+        if (want.has("rects")) {
+            result.rects = Array.from(document.querySelectorAll("rect")).map(RECT_DESCRIPTOR);
+        }
+        if (want.has("fingerprint")) {
+            const parts = [result.title, result.datetime, (result.links || []).join(" ")];
+            for (const r of result.rects || []) {
+                parts.push(r.color, r.id, r.x, r.y, r.row, r.seat);
+            }
+            const text = parts.join("\\u0001");
+            let h1 = 0x811c9dc5, h2 = 0x01000193 ^ text.length;
+            for (let i = 0; i < text.length; i++) {
+                const c = text.charCodeAt(i);
+                h1 = Math.imul(h1 ^ c, 0x01000193);
+                h2 = Math.imul(h2 ^ c, 0x5bd1e995);
+            }
+            result.fingerprint = (h1 >>> 0).toString(16).padStart(8, "0") + (h2 >>> 0).toString(16).padStart(8, "0");
+            if (result.fingerprint === known) {
+                return {fingerprint: result.fingerprint, unchanged: true};
+            }
+        }
+        return result;
+    }
+""".replace("RECT_DESCRIPTOR", RECT_DESCRIPTOR.strip())
+
+
+@dataclass
+class PageSnapshot:
+    """
+    Everything extracted from a page in one roundtrip.
+    """
+    title: str = DEFAULT_TITLE
+    datetime: str = DEFAULT_DATETIME
+    links: List[str] = field(default_factory=list)
+    rects: List[Dict[str, Any]] = field(default_factory=list)
+    anchor_count: int = 0
+    html: Optional[str] = None
+    # Content hash of the extracted fields; unchanged means it matched the caller's known fingerprint
+    # and no other field was extracted.
+    fingerprint: Optional[str] = None
+    unchanged: bool = False
+
+
+class PageNotFoundError(Exception):
+    """
+    Raised when a page responds with 404, e.g. an event that was removed from sale.
+    """
+
+
+# Polled in the page until the readiness selector matches enough elements
+# and the match count has not changed for stableMs milliseconds.
+READINESS_SCRIPT = """
+    ({selector, minCount, stableMs}) => {
+        const count = document.querySelectorAll(selector).length;
+        const now = performance.now();
+        const states = window.__readiness || (window.__readiness = {});
+        const state = states[selector] || (states[selector] = {count: -1, since: now});
+        if (count !== state.count) {
+            state.count = count;
+            state.since = now;
+        }
+        return count >= minCount && now - state.since >= stableMs;
+    }
+"""
 
 
 class PerformanceScraper:
@@ -11,19 +131,119 @@ class PerformanceScraper:
     Handles scraping data from performance pages using Playwright.
     """
 
+    # Readiness wait durations (ms) per page type, collected until take_readiness_stats() is called.
+    readiness_waits: Dict[str, List[float]] = {}
+
     @staticmethod
-    async def load_page(context: BrowserContext, url: str) -> Page:
+    async def navigate(page: Page, url: str, page_type: str = "event") -> float:
         """
-        Loads a page using Playwright with a predefined timeout and wait.
+        Navigates an existing page (e.g. one leased from a PagePool) and waits until it is ready.
 
-        :param context: A Playwright browser context.
+        :param page: The Page object to navigate.
         :param url: The URL to navigate to.
-        :return: The loaded Page object.
+        :param page_type: Key into Config.READINESS selecting the readiness condition.
+        :return: Milliseconds spent waiting for readiness after DOMContentLoaded.
+        :raises PageNotFoundError: If the page responds with 404.
         """
-        page = await context.new_page()
-        await page.goto(url, timeout=Config.NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
-        await page.wait_for_timeout(Config.WAIT_TIMEOUT)
-        return page
+        try:
+            with METRICS.time("stage_seconds", stage="navigation"):
+                response = await page.goto(url, timeout=Config.NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
+        except PlaywrightTimeoutError:
+            METRICS.inc("timeouts_total", stage="navigation")
+            raise
+        if response is not None and response.status == 404:
+            raise PageNotFoundError(url)
+        return await PerformanceScraper.wait_until_ready(page, page_type)
+
+    @staticmethod
+    async def wait_until_ready(page: Page, page_type: str) -> float:
+        """
+        Waits for the readiness condition configured for the page type, bounded by its timeout.
+        Falls back to a fixed Config.WAIT_TIMEOUT sleep for unknown page types.
+
+        :param page: The loaded Page object.
+        :param page_type: Key into Config.READINESS.
+        :return: Milliseconds spent waiting.
+        """
+        started = time.monotonic()
+        condition = Config.READINESS.get(page_type)
+        if condition is None:
+            await page.wait_for_timeout(Config.WAIT_TIMEOUT)
+        else:
+            try:
+                await page.wait_for_function(
+                    READINESS_SCRIPT,
+                    arg={
+                        "selector": condition["selector"],
+                        "minCount": condition.get("min_count", 1),
+                        "stableMs": condition.get("stable_ms", 0),
+                    },
+                    polling=condition.get("poll_ms", 100),
+                    timeout=condition["timeout_ms"]
+                )
+            except PlaywrightTimeoutError:
+                # The upper bound was reached; extract whatever the page has rendered so far.
+                METRICS.inc("timeouts_total", stage="settle")
+        waited = (time.monotonic() - started) * 1000
+        METRICS.observe("stage_seconds", waited / 1000, stage="settle")
+        PerformanceScraper.readiness_waits.setdefault(page_type, []).append(waited)
+        return waited
+
+    @staticmethod
+    def take_readiness_stats() -> Dict[str, Dict[str, float]]:
+        """
+        Summarizes and resets the recorded readiness waits.
+
+        :return: Per page type: number of waits, average and maximum milliseconds.
+        """
+        stats = {
+            page_type: {"count": len(waits), "avg_ms": sum(waits) / len(waits), "max_ms": max(waits)}
+            for page_type, waits in PerformanceScraper.readiness_waits.items() if waits
+        }
+        PerformanceScraper.readiness_waits = {}
+        return stats
+
+    @staticmethod
+    async def extract_snapshot(page: Page, fields: Iterable[str] = SNAPSHOT_FIELDS,
+                               known_fingerprint: Optional[str] = None) -> PageSnapshot:
+        """
+        Extracts the requested fields from the page in a single page.evaluate roundtrip.
+
+        :param page: The loaded Page object.
+        :param fields: Any of "title", "datetime", "links", "rects" and "fingerprint".
+        :param known_fingerprint: Fingerprint of the last extraction; when it still matches,
+                                  a snapshot with unchanged=True and no other data is returned.
+        :return: A PageSnapshot; fields that were not requested keep their defaults.
+        """
+        with METRICS.time("stage_seconds", stage="extract"):
+            data = await page.evaluate(SNAPSHOT_SCRIPT, {
+                "fields": list(fields),
+                "datetimeSelectors": DATETIME_SELECTORS,
+                "linkPattern": Config.EVENT_LINK_PATTERN,
+                "known": known_fingerprint,
+            })
+        if data.get("unchanged"):
+            return PageSnapshot(fingerprint=data["fingerprint"], unchanged=True)
+        snapshot = PageSnapshot(anchor_count=data.get("anchorCount", 0), rects=data.get("rects") or [],
+                                fingerprint=data.get("fingerprint"))
+        if data.get("title"):
+            snapshot.title = data["title"]
+        if data.get("datetime"):
+            snapshot.datetime = data["datetime"]
+        snapshot.links = sorted({PerformanceScraper.absolute_event_url(href) for href in data.get("links") or []})
+        return snapshot
+
+    @staticmethod
+    def absolute_event_url(href: str) -> str:
+        """
+        Turns an event href into an absolute URL on the sales host.
+
+        :param href: The raw href attribute.
+        :return: The absolute event URL.
+        """
+        if href.startswith("//"):
+            return f"https:{href}"
+        return href if href.startswith("http") else f"{Config.EVENT_LINK_BASE}{href}"
 
     @staticmethod
     async def get_show_title(page: Page, logger: logging.Logger) -> str:
@@ -35,11 +255,10 @@ class PerformanceScraper:
         :return: The show title or a fallback string if not found.
         """
         try:
-            h1 = await page.query_selector("h1")
-            return (await h1.inner_text()).strip() if h1 else "Вистава (назва не знайдена)"
+            return (await PerformanceScraper.extract_snapshot(page, ["title"])).title
         except Exception as e:
             logger.error(f"Error extracting show title: {e}")
-            return "Вистава (назва не знайдена)"
+            return DEFAULT_TITLE
 
     @staticmethod
     async def get_event_datetime(page: Page, logger: logging.Logger) -> str:
@@ -50,37 +269,25 @@ class PerformanceScraper:
         :param logger: Logger instance for logging errors.
         :return: The event date/time string or a default message if not found.
         """
-        selectors = [".event-date", ".event-datetime", "time", ".date", ".performance-date", ".event-info span"]
-        for sel in selectors:
-            try:
-                el = await page.query_selector(sel)
-                if el:
-                    text = (await el.inner_text()).strip()
-                    if text:
-                        return text
-            except Exception as e:
-                logger.error(f"Error extracting event datetime using selector '{sel}': {e}")
-        return "Дата та час не знайдені"
+        try:
+            return (await PerformanceScraper.extract_snapshot(page, ["datetime"])).datetime
+        except Exception as e:
+            logger.error(f"Error extracting event datetime: {e}")
+            return DEFAULT_DATETIME
 
     @staticmethod
     async def extract_event_links(page: Page, logger: logging.Logger) -> List[str]:
         """
-        Extracts event links from the current page by iterating over all anchor tags.
+        Extracts event links from the current page by reading the href of all anchor tags.
 
         :param page: The loaded Page object.
         :param logger: Logger instance for logging information.
         :return: A list of extracted event URLs.
         """
-        anchors = await page.query_selector_all("a")
-        logger.info(f"Found {len(anchors)} links on the page.")
-        event_links = set()
-        for a in anchors:
-            href = await a.get_attribute("href")
-            if href and "sales.ft.org.ua/events/" in href:
-                full_url = href if href.startswith("http") else f"https://sales.ft.org.ua{href}"
-                event_links.add(full_url)
-        logger.info(f"Extracted {len(event_links)} event links.")
-        return list(event_links)
+        snapshot = await PerformanceScraper.extract_snapshot(page, ["links"])
+        logger.info(f"Found {snapshot.anchor_count} links on the page.")
+        logger.info(f"Extracted {len(snapshot.links)} event links.")
+        return snapshot.links
 
     @staticmethod
     async def get_fallback_name(performance_url: str) -> str:
@@ -95,16 +302,9 @@ class PerformanceScraper:
     @staticmethod
     async def get_rect_fill_colors(page: Page) -> List[Dict[str, Any]]:
         """
-        Executes a script in the page context that extracts the 'fill' attribute
-        of all <rect> elements (used to determine seat availability).
+        Extracts the computed 'fill' of all <rect> elements (used to determine seat availability).
 
         :param page: The loaded Page object.
         :return: A list of dictionaries for each <rect> element found.
         """
-        script = """
-            () => {
-                return Array.from(document.querySelectorAll('rect'))
-                            .map((r, i) => ({index: i, color: getComputedStyle(r).fill}));
-            }
-        """
-        return await page.evaluate(script)
+        return (await PerformanceScraper.extract_snapshot(page, ["rects"])).rects
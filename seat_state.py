@@ -0,0 +1,432 @@
+# seat_state.py
+
+import re
+import struct
+import operator
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def popcount(mask: int) -> int:
+    """
+    Number of set bits in a non-negative bitset.
+    """
+    return bin(mask).count("1")
+
+
+def mask_from_indices(indices: Iterable[int], size: int) -> int:
+    """
+    Builds a bitset from seat indices in O(n) (shifting a big int per seat would be O(n^2)).
+
+    :param indices: Seat indices to set.
+    :param size: Total number of seats (upper bound for the indices).
+    :return: The bitset as a Python int.
+    """
+    buffer = bytearray((size >> 3) + 1)
+    for i in indices:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def indices_from_mask(mask: int) -> List[int]:
+    """
+    Returns the positions of the set bits of a bitset in ascending order.
+    """
+    indices = []
+    offset = 0
+    for byte in mask.to_bytes((mask.bit_length() + 7) // 8, "little"):
+        while byte:
+            low = byte & -byte
+            indices.append(offset + low.bit_length() - 1)
+            byte ^= low
+        offset += 8
+    return indices
+
+
+_MISSING = object()
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def seat_key(item: Dict[str, Any]) -> str:
+    """
+    Stable identity of a seat rect, independent of its DOM position and color.
+
+    Preference order: an explicit "key", row/seat labels, x/y geometry, the element id,
+    and finally the DOM index (for pages that expose nothing better).
+
+    :param item: A rect dictionary as extracted by the scrapers.
+    :return: The seat key, e.g. "rs:5:12", "xy:120:48", "id:s-17" or "idx:3".
+    """
+    if item.get("key"):
+        return item["key"]
+    if item.get("row") and item.get("seat"):
+        return f"rs:{item['row']}:{item['seat']}"
+    x, y = _number(item.get("x")), _number(item.get("y"))
+    if x is not None and y is not None:
+        return f"xy:{x:g}:{y:g}"
+    if item.get("id"):
+        return f"id:{item['id']}"
+    return f"idx:{item['index']}"
+
+
+def seat_keys(rects: List[Dict[str, Any]]) -> List[str]:
+    """
+    Seat keys for all rects of a page; repeated keys get an occurrence suffix so they stay distinct.
+    """
+    keys = []
+    seen: Dict[str, int] = {}
+    for item in rects:
+        key = seat_key(item)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keys.append(key if count == 0 else f"{key}#{count}")
+    return keys
+
+
+def _natural(label: str) -> Tuple[float, str]:
+    match = re.match(r"\s*(-?\d+(?:\.\d+)?)", label)
+    return (float(match.group(1)), label) if match else (float("inf"), label)
+
+
+class HallIndex:
+    """
+    Row-ordered view of a hall for group queries.
+
+    Each seat slot maps to a bit position in "row space", where the seats of a
+    row are consecutive and rows (and aisles within a row) are separated by an
+    empty bit. N adjacent free seats then exist exactly where N shifted copies
+    of the row-space free mask overlap.
+    """
+
+    __slots__ = ("positions", "identity", "_gather", "_slots")
+
+    def __init__(self, positions: List[int]) -> None:
+        """
+        :param positions: Row-space bit position per seat slot (-1 for slots outside any row).
+        """
+        self.positions = positions
+        self.identity = positions == list(range(len(positions)))
+        self._slots = len(positions)
+        # Row-space position -> slot, with separators pointing at an always-zero sentinel slot,
+        # so the permutation runs in C via itemgetter instead of a Python loop over seats.
+        order = [self._slots] * (max(positions, default=-1) + 1)
+        for slot, position in enumerate(positions):
+            if position >= 0:
+                order[position] = slot
+        order.append(self._slots)  # At least two items, so itemgetter always returns a tuple.
+        self._gather = operator.itemgetter(*order, self._slots)
+
+    @classmethod
+    def from_keys(cls, keys: List[str]) -> Optional["HallIndex"]:
+        """
+        Builds the index from seat keys with row/seat labels or geometry.
+
+        :param keys: Seat keys in slot order.
+        :return: The index, or None if no key carries row information.
+        """
+        rows: Dict[Any, List[Tuple[Any, float, int]]] = {}
+        for slot, key in enumerate(keys):
+            parts = key.split("#", 1)[0].split(":")
+            if parts[0] == "rs" and len(parts) >= 3:
+                row, seat = parts[1], ":".join(parts[2:])
+                number = _natural(seat)[0]
+                rows.setdefault(("rs", _natural(row)), []).append((_natural(seat), number, slot))
+            elif parts[0] == "xy" and len(parts) == 3:
+                x, y = float(parts[1]), float(parts[2])
+                rows.setdefault(("xy", (y, "")), []).append((x, x, slot))
+        if not rows:
+            return None
+
+        positions = [-1] * len(keys)
+        position = 0
+        for _, seats in sorted(rows.items(), key=lambda entry: entry[0]):
+            seats.sort()
+            steps = sorted(b[1] - a[1] for a, b in zip(seats, seats[1:]))
+            pitch = steps[len(steps) // 2] if steps else 0
+            previous = None
+            for _, coordinate, slot in seats:
+                if previous is not None and pitch and coordinate - previous > pitch * 1.5:
+                    position += 1  # An aisle or missing seat breaks adjacency.
+                positions[slot] = position
+                position += 1
+                previous = coordinate
+            position += 1  # Row separator.
+        return cls(positions)
+
+    def to_row_space(self, mask: int) -> int:
+        """
+        Maps a slot-space bitset to row space (slots outside any row are dropped).
+        """
+        if self.identity:
+            return mask
+        bits = bin(mask)[:1:-1][:self._slots].ljust(self._slots, "0") + "0"
+        return int("".join(reversed(self._gather(bits))), 2)
+
+    @staticmethod
+    def group_mask(row_mask: int, n: int) -> int:
+        """
+        Row-space bits that belong to a run of at least n adjacent set bits.
+        """
+        starts = row_mask
+        for i in range(1, n):
+            starts &= row_mask >> i
+            if not starts:
+                return 0
+        covered = starts
+        for i in range(1, n):
+            covered |= starts << i
+        return covered
+
+    def has_group(self, free_mask: int, n: int) -> bool:
+        """
+        Whether at least n adjacent free seats exist in one row.
+        """
+        return bool(self.group_mask(self.to_row_space(free_mask), n))
+
+    def new_seats_in_groups(self, free_mask: int, new_mask: int, n: int) -> int:
+        """
+        Number of new free seats that are part of a group of at least n adjacent free seats.
+        """
+        return popcount(self.group_mask(self.to_row_space(free_mask), n) & self.to_row_space(new_mask))
+
+
+class SeatLayout:
+    """
+    Append-only mapping from seat keys to bit slots for one event, so a seat
+    keeps its bit across checks even if rects are reordered or added.
+    A fresh layout assigns slots in DOM order.
+    """
+
+    __slots__ = ("keys", "_slots", "_index")
+
+    def __init__(self, keys: Optional[List[str]] = None) -> None:
+        self.keys: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._index: Any = _MISSING
+        for key in keys or []:
+            self.slot(key)
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def slot(self, key: str) -> int:
+        """
+        Returns the slot of a seat key, assigning the next free slot to unknown keys.
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self.keys)
+            self.keys.append(key)
+            self._index = _MISSING
+        return slot
+
+    def hall_index(self) -> Optional[HallIndex]:
+        """
+        The group query index for this layout (rebuilt only after new seats appear).
+        """
+        if self._index is _MISSING:
+            self._index = HallIndex.from_keys(self.keys)
+        return self._index
+
+
+class ColorPalette:
+    """
+    Maps seat colors to small integer codes shared by all events.
+    """
+
+    def __init__(self) -> None:
+        self.colors: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, color: str) -> int:
+        """
+        Returns the code for a color, registering it on first use.
+        """
+        code = self._codes.get(color)
+        if code is None:
+            code = len(self.colors)
+            self.colors.append(color)
+            self._codes[color] = code
+        return code
+
+    def color(self, code: int) -> str:
+        """
+        Returns the color registered for a code.
+        """
+        return self.colors[code]
+
+
+class SeatState:
+    """
+    Compact free-seat state of one event: one bitset of free seats per palette color.
+
+    Bits are seat slots of a SeatLayout when one is used, DOM indices otherwise.
+    A seat counts as new when it is free now and was not free before; a color
+    (price tier) change of a seat that stays free is not a new seat.
+    """
+
+    __slots__ = ("size", "masks", "layout")
+
+    def __init__(self, size: int, masks: Dict[int, int], layout: Optional[SeatLayout] = None) -> None:
+        """
+        :param size: Number of bit slots.
+        :param masks: Free-seat bitset per palette color code.
+        :param layout: The seat layout the slots refer to, if any.
+        """
+        self.size = size
+        self.masks = masks
+        self.layout = layout
+
+    @classmethod
+    def from_rects(cls, rects: List[Dict[str, Any]], ignored_colors: Iterable[str],
+                   palette: ColorPalette, layout: Optional[SeatLayout] = None) -> "SeatState":
+        """
+        Builds the state from rect dictionaries as returned by PerformanceScraper.get_rect_fill_colors.
+
+        :param rects: List of {"index", "color"} dictionaries, optionally with stable attributes (see seat_key).
+        :param ignored_colors: Colors that mark taken or non-seat rects.
+        :param palette: The shared color palette.
+        :param layout: Seat layout of the event; when given, bits are layout slots instead of DOM indices.
+        :return: The seat state.
+        """
+        ignored = set(ignored_colors)
+        if layout is not None:
+            slots = [layout.slot(key) for key in seat_keys(rects)]
+            size = layout.size
+        else:
+            slots = [item["index"] for item in rects]
+            size = max(slots, default=-1) + 1
+        # Raw color string -> bit buffer (None for ignored colors), so each distinct color is normalized once.
+        buffers: Dict[str, Optional[bytearray]] = {}
+        by_code: Dict[int, bytearray] = {}
+        for item, index in zip(rects, slots):
+            color = item["color"]
+            if not color:
+                continue
+            buffer = buffers.get(color, _MISSING)
+            if buffer is _MISSING:
+                normalized = color.lower()
+                if normalized in ignored:
+                    buffer = None
+                else:
+                    code = palette.code(normalized)
+                    buffer = by_code.get(code)
+                    if buffer is None:
+                        buffer = by_code[code] = bytearray((size >> 3) + 1)
+                buffers[color] = buffer
+            if buffer is not None:
+                buffer[index >> 3] |= 1 << (index & 7)
+        masks = {code: int.from_bytes(buffer, "little") for code, buffer in by_code.items()}
+        return cls(size, masks, layout)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SeatState) and self.size == other.size and \
+            {c: m for c, m in self.masks.items() if m} == {c: m for c, m in other.masks.items() if m}
+
+    @property
+    def free_mask(self) -> int:
+        """
+        Bitset of all free seats regardless of color.
+        """
+        mask = 0
+        for color_mask in self.masks.values():
+            mask |= color_mask
+        return mask
+
+    @property
+    def free_count(self) -> int:
+        """
+        Number of free seats.
+        """
+        return sum(popcount(mask) for mask in self.masks.values())
+
+    def new_seats(self, previous: Optional["SeatState"]) -> int:
+        """
+        Bitset of seats that are free now but were not free before.
+
+        :param previous: The state from the previous check, or None.
+        :return: The bitset of new free seats.
+        """
+        if previous is None:
+            return self.free_mask
+        return self.free_mask & ~previous.free_mask
+
+    def changes(self, previous: Optional["SeatState"]) -> List[Tuple[int, Optional[int]]]:
+        """
+        Seats whose color differs from the previous state (both states must share bit slots).
+
+        :param previous: The state from the previous check, or None.
+        :return: (slot, new color code, or None when the seat is no longer free), by slot.
+        """
+        old = previous.masks if previous is not None else {}
+        changed = 0
+        for code in set(self.masks) | set(old):
+            changed |= self.masks.get(code, 0) ^ old.get(code, 0)
+        if not changed:
+            return []
+        result: Dict[int, Optional[int]] = dict.fromkeys(indices_from_mask(changed))
+        for code, mask in self.masks.items():
+            for slot in indices_from_mask(mask & changed):
+                result[slot] = code
+        return sorted(result.items())
+
+    def to_bytes(self, palette: ColorPalette) -> bytes:
+        """
+        Serializes the state with color names instead of process-local palette codes.
+
+        :param palette: The palette the state's codes refer to.
+        :return: The encoded state.
+        """
+        parts = [struct.pack("<IH", self.size, len(self.masks))]
+        for code, mask in self.masks.items():
+            color = palette.color(code).encode("utf-8")
+            mask_bytes = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+            parts.append(struct.pack("<B", len(color)) + color)
+            parts.append(struct.pack("<I", len(mask_bytes)) + mask_bytes)
+        if self.layout is not None:
+            # Optional trailing section; states written before layouts existed simply end here.
+            parts.append(b"L" + struct.pack("<I", self.layout.size))
+            for key in self.layout.keys:
+                encoded = key.encode("utf-8")
+                parts.append(struct.pack("<H", len(encoded)) + encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, palette: ColorPalette) -> "SeatState":
+        """
+        Decodes a state produced by to_bytes, registering its colors in the palette.
+
+        :param data: The encoded state.
+        :param palette: The palette to map colors into.
+        :return: The decoded state.
+        """
+        size, count = struct.unpack_from("<IH", data, 0)
+        offset = 6
+        masks = {}
+        for _ in range(count):
+            (color_len,) = struct.unpack_from("<B", data, offset)
+            offset += 1
+            color = data[offset:offset + color_len].decode("utf-8")
+            offset += color_len
+            (mask_len,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            masks[palette.code(color)] = int.from_bytes(data[offset:offset + mask_len], "little")
+            offset += mask_len
+        layout = None
+        if data[offset:offset + 1] == b"L":
+            (key_count,) = struct.unpack_from("<I", data, offset + 1)
+            offset += 5
+            keys = []
+            for _ in range(key_count):
+                (key_len,) = struct.unpack_from("<H", data, offset)
+                offset += 2
+                keys.append(data[offset:offset + key_len].decode("utf-8"))
+                offset += key_len
+            layout = SeatLayout(keys)
+        return cls(size, masks, layout)
@@ -22,6 +22,7 @@ setup(
     install_requires=[
         "playwright~=1.51.0",
         "requests~=2.32.3",
+        "aiohttp~=3.9",
         "python-dotenv>=1.0.0",
         "pytest~=8.3.5",
         "setuptools>=70.0.0",
@@ -0,0 +1,344 @@
+# sharding.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from config import Config
+from notifier import Notifier
+
+
+def partition(performance_urls: List[str], shards: int) -> List[List[str]]:
+    """
+    Splits performance URLs round-robin into at most `shards` non-empty groups.
+
+    :param performance_urls: All monitored performance URLs.
+    :param shards: Desired number of shards.
+    :return: One list of performance URLs per shard.
+    """
+    groups: List[List[str]] = [[] for _ in range(max(1, min(shards, len(performance_urls))))]
+    for i, url in enumerate(performance_urls):
+        groups[i % len(groups)].append(url)
+    return groups
+
+
+def shard_cdp_url(cdp_url: str, shard_id: int) -> str:
+    """
+    CDP endpoint of a shard's own browser: the configured port plus the shard index,
+    matching the browsers started by python -m browser_daemon --shards N.
+
+    :param cdp_url: The configured endpoint, e.g. http://127.0.0.1:9222.
+    :param shard_id: Index of the shard.
+    :return: The shard's endpoint, e.g. http://127.0.0.1:9223 for shard 1.
+    """
+    parts = urlsplit(cdp_url)
+    if parts.port is None:
+        raise ValueError(f"BROWSER_CDP_URL needs an explicit port in sharded mode: {cdp_url}")
+    host = parts.hostname if ":" not in parts.hostname else f"[{parts.hostname}]"
+    return urlunsplit(parts._replace(netloc=f"{host}:{parts.port + shard_id}"))
+
+
+def shard_db_path(path: str, shard_id: int) -> str:
+    """
+    State database of a shard, next to the configured one: seat_state.db -> seat_state.shard1.db.
+    """
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.shard{shard_id}{ext}"
+
+
+def plan_rebalance(assignments: List[List[str]], backlogs: List[int], events_by_perf: Dict[str, int],
+                   threshold: int) -> Optional[Tuple[int, int, str]]:
+    """
+    Picks one performance to move from the most backlogged shard to the least loaded one.
+
+    :param assignments: Performance URLs per shard.
+    :param backlogs: Number of overdue events per shard.
+    :param events_by_perf: Discovered event count per performance URL.
+    :param threshold: Minimum backlog difference that justifies a move.
+    :return: (source shard, target shard, performance URL), or None if no move is needed.
+    """
+    if len(assignments) < 2:
+        return None
+    source = max(range(len(backlogs)), key=lambda i: backlogs[i])
+    target = min(range(len(backlogs)), key=lambda i: backlogs[i])
+    if backlogs[source] - backlogs[target] < threshold or len(assignments[source]) < 2:
+        return None
+    # Move the smallest performance so the slow shard sheds load without swapping roles.
+    perf_url = min(assignments[source], key=lambda url: events_by_perf.get(url, 0))
+    return source, target, perf_url
+
+
+class QueueNotifier(Notifier):
+    """
+    Worker-side notifier that forwards messages to the coordinator over a multiprocessing queue.
+    """
+
+    def __init__(self, shard_id: int, result_queue: Any) -> None:
+        """
+        :param shard_id: Index of the shard the worker runs.
+        :param result_queue: The coordinator's multiprocessing queue.
+        """
+        self.shard_id = shard_id
+        self.result_queue = result_queue
+
+    def send_message(self, message: str) -> None:
+        self.result_queue.put(("notify", self.shard_id, message))
+
+
+def run_shard(shard_id: int, generation: int, performance_urls: List[str], result_queue: Any,
+              logger_name: str, send_notification: bool, shards: int = 1, stop_event: Any = None) -> None:
+    """
+    Entry point of a worker process: runs its own PerformanceMonitor and browser for a subset of performances.
+
+    :param shard_id: Index of the shard.
+    :param generation: Restart counter, echoed in heartbeats so stale ones are ignored.
+    :param performance_urls: Performance URLs assigned to this shard.
+    :param result_queue: Queue for notifications and heartbeats back to the coordinator.
+    :param logger_name: Base logger name; the shard index is appended.
+    :param send_notification: Passed through to PerformanceMonitor.
+    :param shards: Total number of shards; the site-wide caps in Config are split between them.
+    :param stop_event: multiprocessing.Event set by the coordinator to ask the shard to flush its state and exit.
+    """
+    # Imported here so the coordinator process does not load Playwright.
+    from logger_manager import LoggerManager
+    from monitor import PerformanceMonitor
+    from state_store import SQLiteStateStore
+
+    logger = LoggerManager(
+        logger_name=f"{logger_name}.shard{shard_id}",
+        log_file=f"monitor.shard{shard_id}.log",
+        use_stderr=False,
+        use_queue=True,
+        json_format=os.getenv("LOG_FORMAT") == "json",
+        caller_info=False
+    ).get_logger()
+
+    async def heartbeat(monitor: "PerformanceMonitor") -> None:
+        while True:
+            result_queue.put(("heartbeat", shard_id, {
+                "generation": generation,
+                "events": len(monitor.polling_queue),
+                "backlog": monitor.polling_queue.due_count(),
+                "events_by_perf": monitor.discovery_cache.event_counts(),
+            }))
+            await asyncio.sleep(Config.SHARD_HEARTBEAT_INTERVAL)
+
+    async def wait_for_stop(monitoring: "asyncio.Future") -> None:
+        # Cancelling run_monitoring runs its cleanup, which flushes seat states, links and history.
+        while stop_event is None or not stop_event.is_set():
+            await asyncio.sleep(0.5)
+        monitoring.cancel()
+
+    async def main() -> None:
+        cfg = Config()
+        # Every shard exports its own metrics next to the coordinator's port.
+        cfg.METRICS_PORT = Config.METRICS_PORT + 1 + shard_id
+        # The configured page and rate caps are site-wide; every shard gets its share.
+        cfg.MAX_CONCURRENT_PAGES = max(1, Config.MAX_CONCURRENT_PAGES // shards)
+        cfg.HOST_RATE_LIMIT = Config.HOST_RATE_LIMIT / shards
+        cfg.HOST_BURST = max(1, Config.HOST_BURST // shards)
+        if cfg.HISTORY_DIR:
+            # History stores are single-writer; python -m history reads all shard stores below HISTORY_DIR.
+            cfg.HISTORY_DIR = os.path.join(Config.HISTORY_DIR, f"shard{shard_id}")
+        if cfg.BROWSER_CDP_URL:
+            # One daemon browser per shard keeps the shards isolated (and their RSS budgets separate).
+            cfg.BROWSER_CDP_URL = shard_cdp_url(Config.BROWSER_CDP_URL, shard_id)
+        if cfg.BROWSER_USER_DATA_DIR:
+            # A profile can only be used by one browser at a time.
+            cfg.BROWSER_USER_DATA_DIR = os.path.join(Config.BROWSER_USER_DATA_DIR, f"shard{shard_id}")
+        state_store = None
+        if cfg.STATE_DB_PATH:
+            # Each shard writes its own file (no cross-process write locks) and reads its siblings'
+            # (and a pre-sharding database), so a moved performance keeps its seat states.
+            state_store = SQLiteStateStore(
+                shard_db_path(cfg.STATE_DB_PATH, shard_id), logger,
+                read_paths=[cfg.STATE_DB_PATH] + [shard_db_path(cfg.STATE_DB_PATH, n) for n in range(shards)]
+            )
+        monitor = PerformanceMonitor(
+            notifier=QueueNotifier(shard_id, result_queue),
+            config=cfg,
+            logger=logger,
+            performance_urls=performance_urls,
+            send_notification=send_notification,
+            state_store=state_store
+        )
+        beat = asyncio.ensure_future(heartbeat(monitor))
+        monitoring = asyncio.ensure_future(monitor.run_monitoring())
+        stop = asyncio.ensure_future(wait_for_stop(monitoring))
+        try:
+            await monitoring
+        except asyncio.CancelledError:
+            logger.info(f"Shard {shard_id} stopped.")
+        finally:
+            beat.cancel()
+            stop.cancel()
+            if state_store is not None:
+                state_store.close()
+
+    logger.info(f"Shard {shard_id} started with {len(performance_urls)} performances.")
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardCoordinator:
+    """
+    Partitions performances across worker processes, each with its own
+    PerformanceMonitor and browser, and delivers their notifications through
+    a single notifier. Dead or silent shards are restarted, and a performance
+    is moved from a backlogged shard to the least loaded one when shard
+    backlogs diverge.
+    """
+
+    def __init__(self, notifier: Notifier, logger: logging.Logger, performance_urls: List[str],
+                 shards: int, logger_name: str, send_notification: bool = False) -> None:
+        """
+        :param notifier: Notifier that delivers the messages produced by all shards.
+        :param logger: A configured logger.
+        :param performance_urls: All monitored performance URLs.
+        :param shards: Number of worker processes.
+        :param logger_name: Base logger name for worker processes.
+        :param send_notification: Passed through to every shard's PerformanceMonitor.
+        """
+        self.notifier = notifier
+        self.logger = logger
+        self.logger_name = logger_name
+        self.send_notification = send_notification
+        self.assignments = partition(performance_urls, shards)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queue = self._ctx.Queue()
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * len(self.assignments)
+        self._stop_events: List[Any] = [None] * len(self.assignments)
+        self._generations = [0] * len(self.assignments)
+        self._last_heartbeat = [0.0] * len(self.assignments)
+        self._backlogs = [0] * len(self.assignments)
+        self._events_by_perf: Dict[str, int] = {}
+        # Consecutive failures without a heartbeat in between, and when a failed shard may start again.
+        self._failures = [0] * len(self.assignments)
+        self._restart_at: List[Optional[float]] = [None] * len(self.assignments)
+
+    def _start(self, shard_id: int) -> None:
+        self._restart_at[shard_id] = None
+        self._generations[shard_id] += 1
+        self._backlogs[shard_id] = 0
+        self._last_heartbeat[shard_id] = time.monotonic()
+        self._stop_events[shard_id] = self._ctx.Event()
+        process = self._ctx.Process(
+            target=run_shard,
+            args=(shard_id, self._generations[shard_id], self.assignments[shard_id], self._queue,
+                  self.logger_name, self.send_notification, len(self.assignments), self._stop_events[shard_id]),
+            name=f"shard-{shard_id}",
+            daemon=True
+        )
+        process.start()
+        self._processes[shard_id] = process
+        self.logger.info(f"Started shard {shard_id} (pid {process.pid}) with "
+                         f"{len(self.assignments[shard_id])} performances.")
+
+    async def _stop(self, shard_id: int) -> None:
+        """
+        Asks a shard to flush its state and exit, and terminates it if it has not exited after
+        SHARD_STOP_TIMEOUT seconds. The join runs in an executor so supervision of the other shards continues.
+        """
+        process = self._processes[shard_id]
+        self._processes[shard_id] = None
+        if process is None or not process.is_alive():
+            return
+        loop = asyncio.get_running_loop()
+        self._stop_events[shard_id].set()
+        await loop.run_in_executor(None, process.join, Config.SHARD_STOP_TIMEOUT)
+        if process.is_alive():
+            self.logger.warning(f"Shard {shard_id} did not exit within {Config.SHARD_STOP_TIMEOUT}s, terminating it.")
+            process.terminate()
+            await loop.run_in_executor(None, process.join, 10)
+
+    async def _restart(self, shard_id: int) -> None:
+        await self._stop(shard_id)
+        self._start(shard_id)
+
+    def _handle(self, item: Tuple[str, int, Any]) -> None:
+        kind, shard_id, payload = item
+        if kind == "notify":
+            self.notifier.send_message(payload)
+        elif kind == "heartbeat" and payload["generation"] == self._generations[shard_id]:
+            self._last_heartbeat[shard_id] = time.monotonic()
+            self._failures[shard_id] = 0
+            self._backlogs[shard_id] = payload["backlog"]
+            self._events_by_perf.update(payload["events_by_perf"])
+
+    async def _fail(self, shard_id: int, reason: str) -> None:
+        """
+        Stops a failed shard and schedules its restart with exponential backoff, so a shard that
+        crashes on startup (bad config, port taken) is not respawned every second.
+        """
+        await self._stop(shard_id)
+        self._failures[shard_id] += 1
+        if self._failures[shard_id] > Config.SHARD_MAX_RESTARTS:
+            self.logger.critical(f"Shard {shard_id} {reason} {self._failures[shard_id]} times in a row, "
+                                 f"leaving it stopped.")
+            return
+        delay = min(Config.SHARD_RESTART_BACKOFF * 2 ** (self._failures[shard_id] - 1),
+                    Config.SHARD_RESTART_BACKOFF_MAX)
+        self._restart_at[shard_id] = time.monotonic() + delay
+        self.logger.error(f"Shard {shard_id} {reason}, restarting it in {delay:.0f}s.")
+
+    async def _check_health(self) -> None:
+        now = time.monotonic()
+        for shard_id, process in enumerate(self._processes):
+            if process is None:
+                restart_at = self._restart_at[shard_id]
+                if restart_at is not None and now >= restart_at:
+                    self._start(shard_id)
+            elif not process.is_alive():
+                await self._fail(shard_id, "died")
+            elif now - self._last_heartbeat[shard_id] > Config.SHARD_HEARTBEAT_TIMEOUT:
+                await self._fail(shard_id, "stopped sending heartbeats")
+
+    async def _rebalance(self) -> None:
+        if any(process is None for process in self._processes):
+            # Backlogs of a shard that is waiting to restart are stale.
+            return
+        move = plan_rebalance(self.assignments, self._backlogs, self._events_by_perf,
+                              Config.SHARD_REBALANCE_BACKLOG)
+        if move is None:
+            return
+        source, target, perf_url = move
+        self.logger.warning(f"Moving {perf_url} from shard {source} (backlog {self._backlogs[source]}) "
+                            f"to shard {target} (backlog {self._backlogs[target]}).")
+        self.assignments[source].remove(perf_url)
+        self.assignments[target].append(perf_url)
+        await asyncio.gather(self._restart(source), self._restart(target))
+
+    async def run(self) -> None:
+        """
+        Starts all shards and supervises them until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        for shard_id in range(len(self.assignments)):
+            self._start(shard_id)
+        next_check = time.monotonic() + 1.0
+        last_rebalance = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = await loop.run_in_executor(None, self._queue.get, True, 1.0)
+                    self._handle(item)
+                except queue_module.Empty:
+                    pass
+                # Supervise on a clock: a stream of notifications or heartbeats must not starve health checks.
+                now = time.monotonic()
+                if now < next_check:
+                    continue
+                next_check = now + 1.0
+                await self._check_health()
+                if now - last_rebalance >= Config.SHARD_REBALANCE_INTERVAL:
+                    last_rebalance = now
+                    await self._rebalance()
+        finally:
+            await asyncio.gather(*(self._stop(shard_id) for shard_id in range(len(self._processes))))
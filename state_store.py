@@ -0,0 +1,212 @@
+# state_store.py
+
+import json
+import os
+import sqlite3
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from seat_state import ColorPalette, SeatState
+
+
+class StateStore(ABC):
+    """
+    Abstract persistent store for per-event seat states.
+    Subclasses must implement load, save and delete; storing discovered event
+    links (for a warm start) is optional.
+    """
+
+    @abstractmethod
+    def load(self, palette: ColorPalette) -> Dict[str, SeatState]:
+        """
+        Loads the last saved state of every event.
+
+        :param palette: The palette to register stored colors in.
+        :return: Seat states keyed by event URL.
+        """
+        raise NotImplementedError("This is an interface method.")
+
+    @abstractmethod
+    def save(self, states: Dict[str, SeatState], palette: ColorPalette) -> None:
+        """
+        Persists the given (changed) event states.
+
+        :param states: Seat states keyed by event URL.
+        :param palette: The palette the states' color codes refer to.
+        """
+        raise NotImplementedError("This is an interface method.")
+
+    @abstractmethod
+    def delete(self, event_urls: Iterable[str]) -> None:
+        """
+        Removes events that no longer exist.
+
+        :param event_urls: Event URLs to remove.
+        """
+        raise NotImplementedError("This is an interface method.")
+
+    def load_links(self) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Loads the event links last discovered on each performance page.
+
+        :return: (event_url, performance_url) tuples keyed by performance URL.
+        """
+        return {}
+
+    def save_links(self, links: Dict[str, List[Tuple[str, str]]]) -> None:
+        """
+        Persists the current event links of the given performances.
+
+        :param links: (event_url, performance_url) tuples keyed by performance URL.
+        """
+
+    def close(self) -> None:
+        """
+        Releases any resources held by the store.
+        """
+
+
+class SQLiteStateStore(StateStore):
+    """
+    Seat-state store backed by an SQLite database in WAL mode.
+
+    Each save is a single transaction that upserts only the given events, and
+    WAL makes every committed write durable across crashes without rewriting
+    the whole database.
+
+    Loads can also read other databases (e.g. those of sibling shards, which
+    each write their own file); per event or performance the newest row wins.
+    Deleted events leave a tombstone, so an older state in another database
+    does not bring them back.
+    """
+
+    def __init__(self, path: str, logger: logging.Logger, read_paths: Iterable[str] = ()) -> None:
+        """
+        :param path: Path of the SQLite database file.
+        :param logger: A configured logger.
+        :param read_paths: Further databases that are only read, by load() and load_links().
+        """
+        self.path = path
+        self.logger = logger
+        self.read_paths = [p for p in read_paths if p != path]
+        # Saves run in an executor thread; the monitor never issues two at once.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seat_states ("
+            " event_url TEXT PRIMARY KEY,"
+            " state BLOB NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS deleted_events ("
+            " event_url TEXT PRIMARY KEY,"
+            " deleted_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS event_links ("
+            " perf_url TEXT PRIMARY KEY,"
+            " links TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _rows(self, query: str) -> Iterator[Tuple]:
+        """
+        Yields the rows of a query against this database and every readable database in read_paths.
+        """
+        yield from self._conn.execute(query)
+        for path in self.read_paths:
+            if not os.path.exists(path):
+                continue
+            try:
+                conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            except sqlite3.Error as e:
+                self.logger.error(f"Could not open {path}: {e}")
+                continue
+            try:
+                yield from conn.execute(query).fetchall()
+            except sqlite3.OperationalError as e:
+                # Databases written by an older version lack newer tables.
+                if "no such table" not in str(e):
+                    self.logger.error(f"Could not read {path}: {e}")
+            except sqlite3.Error as e:
+                self.logger.error(f"Could not read {path}: {e}")
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _newest(rows: Iterable[Tuple]) -> Dict[str, Tuple]:
+        newest: Dict[str, Tuple] = {}
+        for key, value, updated_at in rows:
+            if key not in newest or updated_at > newest[key][1]:
+                newest[key] = (value, updated_at)
+        return newest
+
+    def load(self, palette: ColorPalette) -> Dict[str, SeatState]:
+        started = time.monotonic()
+        states = {}
+        rows = self._newest(self._rows("SELECT event_url, state, updated_at FROM seat_states"))
+        deleted = self._newest(self._rows("SELECT event_url, NULL, deleted_at FROM deleted_events"))
+        for event_url, (blob, updated_at) in rows.items():
+            if event_url in deleted and deleted[event_url][1] >= updated_at:
+                continue
+            try:
+                states[event_url] = SeatState.from_bytes(blob, palette)
+            except Exception as e:
+                self.logger.error(f"Skipping corrupt stored state for {event_url}: {e}")
+        self.logger.info(f"Loaded {len(states)} seat states from {self.path} "
+                         f"in {(time.monotonic() - started) * 1000:.0f} ms.")
+        return states
+
+    def save(self, states: Dict[str, SeatState], palette: ColorPalette) -> None:
+        if not states:
+            return
+        now = time.time()
+        rows = [(url, state.to_bytes(palette), now) for url, state in states.items()]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO seat_states (event_url, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(event_url) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                rows
+            )
+            self._conn.executemany("DELETE FROM deleted_events WHERE event_url = ?", [(url,) for url in states])
+
+    def delete(self, event_urls: Iterable[str]) -> None:
+        now = time.time()
+        urls = [(url,) for url in event_urls]
+        with self._conn:
+            self._conn.executemany("DELETE FROM seat_states WHERE event_url = ?", urls)
+            self._conn.executemany(
+                "INSERT INTO deleted_events (event_url, deleted_at) VALUES (?, ?) "
+                "ON CONFLICT(event_url) DO UPDATE SET deleted_at = excluded.deleted_at",
+                [(url, now) for url, in urls]
+            )
+
+    def load_links(self) -> Dict[str, List[Tuple[str, str]]]:
+        links = {}
+        rows = self._newest(self._rows("SELECT perf_url, links, updated_at FROM event_links"))
+        for perf_url, (data, _) in rows.items():
+            try:
+                links[perf_url] = [(event_url, link_perf) for event_url, link_perf in json.loads(data)]
+            except Exception as e:
+                self.logger.error(f"Skipping corrupt stored links for {perf_url}: {e}")
+        return links
+
+    def save_links(self, links: Dict[str, List[Tuple[str, str]]]) -> None:
+        if not links:
+            return
+        now = time.time()
+        rows = [(perf_url, json.dumps(perf_links), now) for perf_url, perf_links in links.items()]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO event_links (perf_url, links, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(perf_url) DO UPDATE SET links = excluded.links, updated_at = excluded.updated_at",
+                rows
+            )
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,188 @@
+# tests/test_browser_recycler.py
+
+import asyncio
+import logging
+import os
+import pytest
+
+from browser_recycler import BrowserRecycler, process_rss_bytes, profile_pids
+
+
+class DummyPage:
+    def __init__(self):
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    def is_closed(self):
+        return self.closed
+
+    def on(self, event, handler):
+        pass
+
+
+class DummyContext:
+    def __init__(self):
+        self.closed = False
+
+    async def new_page(self):
+        return DummyPage()
+
+    async def close(self):
+        self.closed = True
+
+
+class DummyBrowser:
+    def __init__(self, contexts=()):
+        self.closed = False
+        self.contexts = list(contexts)
+
+    async def new_context(self):
+        return DummyContext()
+
+    async def close(self):
+        self.closed = True
+
+
+class DummyChromium:
+    def __init__(self):
+        self.browsers = []
+        self.profiles = []
+        self.daemon = None  # Default context of the browser reachable over CDP
+
+    async def launch(self, **kwargs):
+        self.browsers.append(DummyBrowser())
+        return self.browsers[-1]
+
+    async def connect_over_cdp(self, endpoint_url, **kwargs):
+        if self.daemon is None:
+            raise ConnectionError("connection refused")
+        self.browsers.append(DummyBrowser([self.daemon]))
+        return self.browsers[-1]
+
+    async def launch_persistent_context(self, user_data_dir, **kwargs):
+        self.profiles.append(user_data_dir)
+        return DummyContext()
+
+
+class DummyPlaywright:
+    def __init__(self):
+        self.chromium = DummyChromium()
+
+
+def test_process_rss_bytes_reads_proc():
+    """
+    Test that RSS is summed from /proc for known processes, and None is returned when no process could be read.
+    """
+    if not os.path.exists(f"/proc/{os.getpid()}/statm"):
+        pytest.skip("/proc is not available")
+    assert process_rss_bytes([os.getpid()]) > 0
+    assert process_rss_bytes([]) is None
+
+
+def test_profile_pids_finds_browser_process_tree(tmp_path):
+    """
+    Test that the browser running on a profile is found by its command line, together with its child processes.
+    """
+    import subprocess
+    import sys
+    import time
+
+    if not os.path.exists("/proc/self/stat"):
+        pytest.skip("/proc is not available")
+    script = ("import subprocess, sys, time; "
+              "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)', '--type=renderer']); "
+              "time.sleep(30)")
+    browser = subprocess.Popen([sys.executable, "-c", script, f"--user-data-dir={tmp_path}"])
+    try:
+        deadline = time.monotonic() + 10
+        pids = profile_pids(str(tmp_path))
+        while len(pids) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            pids = profile_pids(str(tmp_path))
+        assert pids[0] == browser.pid and len(pids) == 2
+        assert process_rss_bytes(pids) > 0
+        assert profile_pids(str(tmp_path / "other")) == []
+    finally:
+        for pid in profile_pids(str(tmp_path))[1:]:
+            os.kill(pid, 9)
+        browser.kill()
+        browser.wait()
+
+
+@pytest.mark.asyncio
+async def test_recycle_warms_new_browser_and_drains_old():
+    """
+    Test that a generation over its page budget is replaced by a warmed one,
+    and the old browser is closed only after its leased page is released.
+    """
+    playwright = DummyPlaywright()
+    recycler = BrowserRecycler(playwright, logging.getLogger("test_browser_recycler"),
+                               pool_size=2, page_max_uses=0, max_pages=2)
+    await recycler.start()
+    old_pool = recycler.pool
+    assert old_pool.open_pages == 2
+    assert not await recycler.maybe_recycle()
+
+    async with old_pool.lease():
+        pass
+    async with old_pool.lease():
+        assert await recycler.maybe_recycle()
+        assert recycler.pool is not old_pool
+        assert recycler.pool.open_pages == 2
+        await asyncio.sleep(0)
+        assert not playwright.chromium.browsers[0].closed
+
+    await asyncio.wait_for(asyncio.gather(*recycler._draining), timeout=5)
+    assert playwright.chromium.browsers[0].closed
+    assert not playwright.chromium.browsers[1].closed
+
+    await recycler.close()
+    assert playwright.chromium.browsers[1].closed
+
+
+@pytest.mark.asyncio
+async def test_attach_over_cdp_keeps_daemon_context():
+    """
+    Test that an attached generation uses the daemon's default context and only disconnects on close,
+    and that an unreachable endpoint falls back to launching a browser.
+    """
+    playwright = DummyPlaywright()
+    playwright.chromium.daemon = DummyContext()
+    recycler = BrowserRecycler(playwright, logging.getLogger("test_browser_recycler"),
+                               pool_size=1, page_max_uses=0, cdp_url="http://127.0.0.1:9222")
+    await recycler.start()
+    assert recycler.context is playwright.chromium.daemon
+    assert recycler.mode == "attached over CDP" and recycler.keeps_cache
+    await recycler.close()
+    assert playwright.chromium.browsers[0].closed
+    assert not playwright.chromium.daemon.closed
+
+    playwright.chromium.daemon = None
+    fallback = BrowserRecycler(playwright, logging.getLogger("test_browser_recycler"),
+                               pool_size=1, page_max_uses=0, cdp_url="http://127.0.0.1:9222")
+    await fallback.start()
+    assert fallback.mode == "launched" and not fallback.keeps_cache
+    await fallback.close()
+
+
+@pytest.mark.asyncio
+async def test_persistent_profiles_alternate_between_generations(tmp_path):
+    """
+    Test that recycled generations with a user data dir switch profiles, since a running browser locks its own.
+    """
+    playwright = DummyPlaywright()
+    recycler = BrowserRecycler(playwright, logging.getLogger("test_browser_recycler"),
+                               pool_size=1, page_max_uses=0, max_pages=1, user_data_dir=str(tmp_path))
+    await recycler.start()
+    assert await recycler._current.rss_bytes() is None
+    async with recycler.pool.lease():
+        pass
+    assert await recycler.maybe_recycle()
+    assert playwright.chromium.profiles == [str(tmp_path / "profile-1"), str(tmp_path / "profile-0")]
+    assert recycler.mode == "persistent profile"
+    await recycler.close()
@@ -0,0 +1,78 @@
+# tests/test_capture.py
+
+import logging
+
+import pytest
+
+from capture import CaptureWriter, CollectingNotifier, read_capture, replay, replay_config
+from config import Config
+from monitor import PerformanceMonitor
+
+FREE = "rgb(66, 135, 245)"
+TAKEN = "rgb(173, 173, 173)"
+PERF = "http://perf/show"
+
+
+def rects(*colors):
+    return [{"index": i, "color": color} for i, color in enumerate(colors)]
+
+
+@pytest.mark.asyncio
+async def test_capture_roundtrip_skips_unchanged_discovery(tmp_path):
+    """
+    Test that captured pages read back as written and an unchanged discovery result is recorded only once.
+    """
+    writer = CaptureWriter(str(tmp_path), logging.getLogger("test_capture"), include_html=True)
+    writer.record_discovery([("http://sales/events/1", PERF)])
+    writer.record_discovery([("http://sales/events/1", PERF)])
+    writer.record_event("http://sales/events/1", PERF, "Show", "12 квітня", rects(FREE, TAKEN), "<svg/>")
+    await writer.flush()
+    writer.record_event("http://sales/events/1", PERF, "Show", "12 квітня",
+                        [{"index": 3, "color": FREE}])
+    await writer.flush()
+
+    records = list(read_capture([str(tmp_path)]))
+    assert [r["type"] for r in records] == ["discovery", "event", "event"]
+    assert records[1]["rects"] == rects(FREE, TAKEN)
+    assert records[1]["html"] == "<svg/>"
+    assert records[2]["rects"] == [{"index": 3, "color": FREE}]
+
+
+@pytest.mark.asyncio
+async def test_replay_drives_diff_and_coalescing_on_recorded_time():
+    """
+    Test that a replay produces the notifications the live run would have sent:
+    a digest after the debounce window, and an immediate alert for a new date.
+    """
+    a, b = "http://sales/events/a", "http://sales/events/b"
+    records = [
+        {"t": 1000.0, "type": "discovery", "links": [[a, PERF]]},
+        {"t": 1001.0, "type": "event", "url": a, "perf": PERF, "title": "Show", "datetime": "1",
+         "rects": rects(TAKEN, TAKEN)},
+        {"t": 1002.0, "type": "event", "url": a, "perf": PERF, "title": "Show", "datetime": "1",
+         "rects": rects(FREE, TAKEN)},
+        {"t": 1003.0, "type": "discovery", "links": [[a, PERF], [b, PERF]]},
+        {"t": 1004.0, "type": "event", "url": b, "perf": PERF, "title": "Show", "datetime": "2",
+         "rects": rects(FREE, FREE)},
+    ]
+    notifier = CollectingNotifier()
+    monitor = PerformanceMonitor(notifier, Config(), logging.getLogger("test_capture"), [],
+                                 send_notification=True)
+    stats = await replay(records, monitor, flush_interval=10)
+
+    assert stats["events"] == 3 and stats["discoveries"] == 2
+    assert len(notifier.messages) == 2
+    assert "Нові вільні місця: 2" in notifier.messages[0] and b in notifier.messages[0]
+    assert "Нові вільні місця: 1" in notifier.messages[1] and a in notifier.messages[1]
+
+
+def test_replay_config_leaves_live_stores_alone(monkeypatch):
+    """
+    Test that a replay neither captures nor records history nor saves seat states, even if the environment enables them.
+    """
+    monkeypatch.setattr(Config, "CAPTURE_DIR", "captures")
+    monkeypatch.setattr(Config, "HISTORY_DIR", "history")
+    cfg = replay_config()
+    assert not (cfg.CAPTURE_DIR or cfg.HISTORY_DIR or cfg.STATE_DB_PATH or cfg.METRICS_ENABLED)
+    monitor = PerformanceMonitor(CollectingNotifier(), cfg, logging.getLogger("test_capture"), [])
+    assert monitor.capture is None and monitor.history is None
@@ -0,0 +1,70 @@
+# tests/test_coalescer.py
+
+import logging
+
+from coalescer import NotificationCoalescer, SeatAlert
+from notifier import Notifier
+
+
+class DummyNotifier(Notifier):
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, message: str) -> None:
+        self.messages.append(message)
+
+
+def alert(show, event, seats=1):
+    return SeatAlert(f"Show {show}", f"Date {event}", f"http://sales/events/{event}",
+                     f"http://perf/{show}", seats)
+
+
+def make_coalescer(**kwargs):
+    notifier = DummyNotifier()
+    params = dict(debounce_window=60, max_messages=3)
+    params.update(kwargs)
+    return notifier, NotificationCoalescer(notifier, logging.getLogger("test_coalescer"), **params)
+
+
+def test_alerts_are_merged_into_one_digest_per_show():
+    """
+    Test that one flush sends a single digest per show and first-seen events go out immediately.
+    """
+    notifier, coalescer = make_coalescer()
+    coalescer.add(alert("A", 1))
+    coalescer.add(alert("A", 2))
+    coalescer.add(alert("B", 3))
+    coalescer.add(alert("C", 4), first_seen=True)
+    assert len(notifier.messages) == 1
+
+    assert coalescer.flush() == 2
+    assert len(notifier.messages) == 3
+    assert "Date 1" in notifier.messages[1] and "Date 2" in notifier.messages[1]
+
+
+def test_repeated_changes_are_debounced():
+    """
+    Test that an event notified within the debounce window is held and its seats accumulate.
+    """
+    notifier, coalescer = make_coalescer()
+    coalescer.add(alert("A", 1, seats=2))
+    coalescer.flush()
+    coalescer.add(alert("A", 1, seats=3))
+    coalescer.add(alert("A", 1, seats=4))
+    assert coalescer.flush() == 0
+
+    coalescer.debounce_window = 0
+    assert coalescer.flush() == 1
+    assert "Нові вільні місця: 7" in notifier.messages[-1]
+
+
+def test_message_volume_is_capped():
+    """
+    Test that shows beyond the cap are summarized in the last message.
+    """
+    notifier, coalescer = make_coalescer(max_messages=3)
+    for show in range(10):
+        coalescer.add(alert(show, show))
+    assert coalescer.flush() == 3
+    assert len(notifier.messages) == 3
+    assert "Show 9" in notifier.messages[-1]
@@ -0,0 +1,112 @@
+# tests/test_discovery_cache.py
+
+import asyncio
+import logging
+import pytest
+
+from discovery_cache import DiscoveryCache
+
+
+async def refreshed(cache, loader, perf_urls=("http://perf",)):
+    cache.refresh(list(perf_urls), loader)
+    await asyncio.gather(*cache._refreshing.values())
+
+
+@pytest.mark.asyncio
+async def test_cached_links_are_reused_until_invalidated():
+    """
+    Test that a fresh entry is served from cache and an invalidated one is refreshed in the background.
+    """
+    calls = []
+
+    async def loader(perf_url):
+        calls.append(perf_url)
+        return [(f"{perf_url}/event{len(calls)}", perf_url)]
+
+    cache = DiscoveryCache(ttl=3600, logger=logging.getLogger("test_discovery_cache"))
+    await refreshed(cache, loader)
+    await refreshed(cache, loader)
+    assert cache.all_links(["http://perf"]) == [("http://perf/event1", "http://perf")]
+    assert len(calls) == 1
+
+    cache.invalidate("http://perf", "http://perf/event1")
+    assert cache.all_links(["http://perf"]) == []  # The dead link is dropped immediately.
+    await refreshed(cache, loader)
+    assert cache.all_links(["http://perf"]) == [("http://perf/event2", "http://perf")]
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_empty_refresh_keeps_previous_links():
+    """
+    Test that an empty refresh keeps the cached links until the next refresh is due,
+    and that empty_limit empty results in a row clear them.
+    """
+    calls = []
+
+    async def loader(perf_url):
+        calls.append(perf_url)
+        return [("http://perf/event1", "http://perf")] if len(calls) == 1 else []
+
+    updates: asyncio.Queue = asyncio.Queue(4)
+    cache = DiscoveryCache(ttl=3600, logger=logging.getLogger("test_discovery_cache"), updates=updates,
+                           empty_limit=2)
+    await refreshed(cache, loader)
+    updates.get_nowait()
+    cache.invalidate("http://perf")
+    await refreshed(cache, loader)
+    assert cache.all_links(["http://perf"]) == [("http://perf/event1", "http://perf")]
+    await refreshed(cache, loader)  # The empty result counts as a refresh: not crawled again.
+    assert len(calls) == 2
+
+    cache.invalidate("http://perf")
+    await refreshed(cache, loader)
+    assert cache.all_links(["http://perf"]) == []
+    assert updates.get_nowait()[:2] == ("http://perf", [])
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_refresh_publishes_changed_link_sets():
+    """
+    Test that refresh() crawls in the background and queues only link sets that changed.
+    """
+    async def loader(perf_url):
+        return [(f"{perf_url}/event1", perf_url)]
+
+    updates: asyncio.Queue = asyncio.Queue(4)
+    cache = DiscoveryCache(ttl=0, logger=logging.getLogger("test_discovery_cache"), updates=updates)
+    cache.refresh(["http://perf"], loader)
+    perf_url, links, _ = await asyncio.wait_for(updates.get(), timeout=1)
+    assert (perf_url, links) == ("http://perf", [("http://perf/event1", "http://perf")])
+
+    cache.refresh(["http://perf"], loader)  # Expired (ttl=0) but unchanged.
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert updates.empty()
+    assert cache.all_links(["http://perf"]) == links
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_crawl_is_retried_on_next_refresh():
+    """
+    Test that a failed crawl (None) is not cached as an empty listing nor counted towards empty_limit.
+    """
+    results = [None, [("http://perf/event1", "http://perf")], None, None, None]
+
+    async def loader(perf_url):
+        return results.pop(0)
+
+    cache = DiscoveryCache(ttl=3600, logger=logging.getLogger("test_discovery_cache"), empty_limit=2)
+    await refreshed(cache, loader)
+    assert cache.event_counts() == {}
+    await refreshed(cache, loader)  # Retried right away despite the long TTL.
+    assert cache.all_links(["http://perf"]) == [("http://perf/event1", "http://perf")]
+
+    cache.invalidate("http://perf")
+    for _ in range(3):
+        await refreshed(cache, loader)
+    assert cache.all_links(["http://perf"]) == [("http://perf/event1", "http://perf")]
+    assert not results
+    await cache.close()
@@ -0,0 +1,133 @@
+# tests/test_history.py
+
+import logging
+import time
+from datetime import datetime
+
+import pytest
+
+from config import Config
+from history import HistoryReader, HistoryWriter, open_readers
+from monitor import PerformanceMonitor
+from notifier import Notifier
+
+EVENT = "http://example.com/events/1"
+OTHER = "http://example.com/events/2"
+PERF = "http://example.com/performances/show"
+
+
+def ts(hour: int, minute: int = 0) -> float:
+    return datetime(2025, 4, 10, hour, minute).timestamp()
+
+
+def test_history_round_trip_across_segments(tmp_path):
+    """
+    Test that changes written across several segments are read back per event and aggregated.
+    """
+    writer = HistoryWriter(str(tmp_path), logging.getLogger("test_history"), segment_records=3, flush_interval=60)
+    show_time = datetime(2025, 4, 12, 19, 0)
+    writer.record(EVENT, PERF, "Show", show_time, [("rs:1:1", "rgb(0, 0, 255)"), ("rs:1:2", "rgb(0, 0, 255)")],
+                  snapshot=True, timestamp=ts(9))
+    writer.record(OTHER, PERF, "Show", None, [("rs:1:1", "rgb(0, 0, 255)")], timestamp=ts(9, 30))
+    writer.record(EVENT, PERF, "Show", show_time, [("rs:1:1", None)], timestamp=ts(10))
+    writer.record(EVENT, PERF, "Show", show_time, [("rs:2:5", "rgb(255, 0, 0)")], timestamp=ts(14))
+    writer.record(EVENT, PERF, "Show", show_time, [("rs:2:5", None)], timestamp=ts(14, 30))
+    writer.close(timeout=5)
+
+    reader = HistoryReader(str(tmp_path))
+    assert len(reader.segments) == 2
+    rows = list(reader.scan(EVENT))
+    assert [row[1:3] for row in rows] == [
+        ("rs:1:1", "rgb(0, 0, 255)"), ("rs:1:2", "rgb(0, 0, 255)"), ("rs:1:1", None),
+        ("rs:2:5", "rgb(255, 0, 0)"), ("rs:2:5", None),
+    ]
+    assert [row[3] for row in rows] == [True, True, False, False, False]
+
+    stats = reader.event_stats(EVENT)
+    assert stats.releases == 1  # The snapshot seats are not releases.
+    assert stats.takes == 2
+    assert stats.release_hours[14] == 1
+    assert stats.days_before_show == {2: 1}
+    assert sorted(stats.free_seconds) == [1800.0, 3600.0]
+
+    # Time ranges are bisected per segment.
+    assert [row[1] for row in reader.scan(EVENT, since=datetime(2025, 4, 10, 12), until=datetime(2025, 4, 10, 14, 1))] \
+        == ["rs:2:5"]
+    assert reader.show_stats(PERF).releases == 2
+    reader.close()
+
+    # A restarted writer reopens the last segment and starts a new one once it is full.
+    writer = HistoryWriter(str(tmp_path), logging.getLogger("test_history"), segment_records=3, flush_interval=60)
+    writer.record(OTHER, PERF, "Show", None, [("rs:1:1", None)], timestamp=ts(16))
+    writer.close(timeout=5)
+    [reader] = open_readers(str(tmp_path))
+    assert len(reader.segments) == 3
+    assert reader.event_stats(OTHER).free_seconds == [6.5 * 3600]
+    reader.close()
+
+
+def test_dictionary_is_durable_before_rows_are_written(tmp_path):
+    """
+    Test that the ids used by rows already in the segment maps are on disk even if the
+    writer dies before its periodic flush.
+    """
+    writer = HistoryWriter(str(tmp_path), logging.getLogger("test_history"), segment_records=16, flush_interval=3600)
+    writer.record(EVENT, PERF, "Show", None, [("rs:1:1", "rgb(0, 0, 255)"), ("rs:1:2", None)], timestamp=ts(9))
+    deadline = time.monotonic() + 5
+    while True:
+        # No close(): this is what a restart after a crash finds (the maps share the page cache).
+        reader = HistoryReader(str(tmp_path))
+        if reader.segments and reader.segments[-1].count == 2:
+            break
+        reader.close()
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert [row[1:3] for row in reader.scan(EVENT)] == [("rs:1:1", "rgb(0, 0, 255)"), ("rs:1:2", None)]
+    reader.close()
+    writer.close(timeout=5)
+
+
+def test_writer_stops_queueing_when_store_cannot_be_opened(tmp_path):
+    """
+    Test that a writer whose store cannot be opened drops later changes instead of queueing them forever.
+    """
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    writer = HistoryWriter(str(blocker), logging.getLogger("test_history"))
+    writer._thread.join(timeout=5)
+    assert not writer._thread.is_alive()
+    for _ in range(100):
+        writer.record(EVENT, PERF, "Show", None, [("rs:1:1", "rgb(0, 0, 255)")], timestamp=ts(9))
+    assert writer._queue.empty()
+    writer.close(timeout=5)
+
+
+class DummyNotifier(Notifier):
+    def send_message(self, message: str) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_seat_changes(tmp_path):
+    """
+    Test that process_event appends only the seats that changed, keyed by their stable seat keys.
+    """
+    cfg = Config()
+    cfg.HISTORY_DIR = str(tmp_path)
+    monitor = PerformanceMonitor(DummyNotifier(), cfg, logging.getLogger("test_history"), [PERF])
+    free, taken = "rgb(0, 0, 255)", "rgb(173, 173, 173)"
+
+    def rects(*colors):
+        return [{"index": i, "color": color, "row": "1", "seat": str(i + 1)} for i, color in enumerate(colors)]
+
+    await monitor.process_event(EVENT, PERF, "Show", "12 квітня 2025, 19:00", rects(free, taken, taken))
+    await monitor.process_event(EVENT, PERF, "Show", "12 квітня 2025, 19:00", rects(free, taken, taken))
+    await monitor.process_event(EVENT, PERF, "Show", "12 квітня 2025, 19:00", rects(taken, free, taken))
+    monitor.history.close(timeout=5)
+
+    reader = HistoryReader(str(tmp_path))
+    assert [row[1:] for row in reader.scan(EVENT)] == [
+        ("rs:1:1", free, True), ("rs:1:1", None, False), ("rs:1:2", free, False),
+    ]
+    assert reader.events()[0]["show_time"] == "2025-04-12T19:00:00"
+    reader.close()
@@ -0,0 +1,114 @@
+# tests/test_http_scraper.py
+
+import logging
+
+import pytest
+
+from http_scraper import HttpPerformanceScraper, normalize_color
+
+EVENT_PAGE = """
+<html><body>
+  <h1> Весілля Фігаро </h1>
+  <div class="event-info"><span>12 квітня, 19:00</span></div>
+  <svg>
+    <g fill="#ADADAD">
+      <rect x="0" y="0" width="10" height="10"/>
+    </g>
+    <rect x="10" y="0" width="10" height="10" style="fill: #3a7"></rect>
+    <rect x="20" y="0" width="10" height="10" fill="rgb(255,255,255)"/>
+  </svg>
+</body></html>
+"""
+
+
+def test_normalize_color():
+    """
+    Test conversion of hex, rgb() and named colors to the computed-style form.
+    """
+    assert normalize_color("#fff") == "rgb(255, 255, 255)"
+    assert normalize_color("#ADADAD") == "rgb(173, 173, 173)"
+    assert normalize_color("rgb(1,2,3)") == "rgb(1, 2, 3)"
+    assert normalize_color("white") == "rgb(255, 255, 255)"
+    assert normalize_color("var(--seat-free)") is None
+
+
+def test_parse_event_page():
+    """
+    Test that title, datetime and rect colors are read from plain HTML.
+    """
+    result = HttpPerformanceScraper.parse_event_page(EVENT_PAGE)
+    assert result.title == "Весілля Фігаро"
+    assert result.datetime == "12 квітня, 19:00"
+    assert [r["color"] for r in result.rects] == [
+        "rgb(173, 173, 173)", "rgb(51, 170, 119)", "rgb(255, 255, 255)"
+    ]
+
+
+def test_parse_event_page_requires_fallback_for_css_colors():
+    """
+    Test that rects colored by CSS classes are reported as unresolved.
+    """
+    html = '<svg><rect class="seat free"/><rect fill="#000"/></svg>'
+    assert HttpPerformanceScraper.parse_event_page(html) is None
+    assert HttpPerformanceScraper.parse_event_page("<html><h1>No map</h1></html>") is None
+
+
+@pytest.mark.asyncio
+async def test_fallback_page_is_not_revalidated():
+    """
+    Test that a page handed to the browser drops its validators, so a later 304 for its
+    unchanged HTML shell cannot mark the browser-rendered seats as unchanged.
+    """
+    scraper = HttpPerformanceScraper(logging.getLogger("test_http_scraper"), browser_retry=0)
+    shell = '<svg><rect class="seat free"/></svg>'
+    requests = []
+
+    async def fetch(url, headers=None):
+        requests.append(headers)
+        if headers:
+            return 304, "", {}
+        return 200, shell, {"ETag": '"v1"'}
+
+    scraper._fetch = fetch
+    assert await scraper.scrape_event("http://example.com/events/1") is None
+    # The browser fallback stored its in-page fingerprint for this event.
+    assert await scraper.scrape_event("http://example.com/events/1", "a1b2c3d4e5f6a7b8") is None
+    assert requests == [None, None]
+
+    # Even with validators on record, only fingerprints of the HTTP engine are revalidated.
+    scraper._validators["http://example.com/events/1"] = {"If-None-Match": '"v1"'}
+    assert await scraper.scrape_event("http://example.com/events/1", "a1b2c3d4e5f6a7b8") is None
+    assert requests[-1] is None
+
+
+@pytest.mark.asyncio
+async def test_page_needing_browser_skips_http_until_retry(monkeypatch):
+    """
+    Test that a page whose colors needed the browser is not fetched over HTTP again until the retry deadline.
+    """
+    import http_scraper
+
+    clock = [100.0]
+    monkeypatch.setattr(http_scraper.time, "monotonic", lambda: clock[0])
+    scraper = HttpPerformanceScraper(logging.getLogger("test_http_scraper"), browser_retry=60)
+    requests = []
+
+    async def fetch(url, headers=None):
+        requests.append(url)
+        return 200, '<svg><rect class="seat free"/></svg>', {}
+
+    scraper._fetch = fetch
+    url = "http://example.com/events/1"
+    assert await scraper.scrape_event(url) is None
+    clock[0] += 59
+    assert await scraper.scrape_event(url) is None
+    assert requests == [url]
+
+    clock[0] += 1
+    assert await scraper.scrape_event(url) is None
+    assert requests == [url, url]
+
+    # A forgotten event starts over with the HTTP path.
+    scraper.forget(url)
+    assert await scraper.scrape_event(url) is None
+    assert len(requests) == 3
@@ -0,0 +1,29 @@
+# tests/test_live_watch.py
+
+import logging
+import pytest
+
+from live_watch import LiveWatcher
+from scraper import PageSnapshot
+
+
+@pytest.mark.asyncio
+async def test_pushed_changes_update_snapshot():
+    """
+    Test that diffs pushed from the page are applied to the last snapshot before it is processed.
+    """
+    updates = []
+
+    async def on_update(snapshot):
+        updates.append([item["color"] for item in snapshot.rects])
+
+    watcher = LiveWatcher(context=None, event_url="http://example.com/event1",
+                          performance_url="http://example.com/performance1",
+                          on_update=on_update, scheduler=None,
+                          logger=logging.getLogger("test_live_watch"))
+    watcher._snapshot = PageSnapshot(rects=[{"index": 0, "color": "a"}, {"index": 1, "color": "b"}])
+
+    await watcher._on_change(None, {"changes": [{"index": 1, "color": "c"}]})
+    await watcher._on_change(None, {"full": [{"index": 0, "color": "d"}]})
+
+    assert updates == [["a", "c"], ["d"]]
@@ -0,0 +1,46 @@
+# tests/test_logger_manager.py
+
+import json
+import logging
+import threading
+
+from logger_manager import LoggerManager
+
+
+def test_queue_mode_writes_from_listener_thread(tmp_path):
+    """
+    Test that in queue mode the logger only enqueues and a background thread writes the file.
+    """
+    log_file = tmp_path / "queue.log"
+    manager = LoggerManager("test_queue_logger", log_file=str(log_file), use_stderr=False,
+                            use_queue=True, json_format=True)
+    logger = manager.get_logger()
+    writers = []
+    file_handler = next(h for h in LoggerManager._listeners["test_queue_logger"].handlers
+                        if isinstance(h, logging.FileHandler))
+    original_emit = file_handler.emit
+    file_handler.emit = lambda record: (writers.append(threading.current_thread()), original_emit(record))
+
+    logger.info("first")
+    logger.error("second")
+    manager.close()
+
+    assert all(thread is not threading.current_thread() for thread in writers) and len(writers) == 2
+    entries = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [(e["level"], e["msg"]) for e in entries] == [("INFO", "first"), ("ERROR", "second")]
+    assert entries[0]["func"] == "test_queue_mode_writes_from_listener_thread"
+    assert "test_queue_logger" not in LoggerManager._listeners
+
+
+def test_reconfiguring_stops_previous_listener(tmp_path):
+    """
+    Test that configuring a logger name again stops the queue listener of the previous configuration.
+    """
+    first = LoggerManager("test_reconfigured_logger", log_file=str(tmp_path / "a.log"),
+                          use_stderr=False, use_queue=True)
+    listener = LoggerManager._listeners["test_reconfigured_logger"]
+    second = LoggerManager("test_reconfigured_logger", log_file=str(tmp_path / "b.log"), use_stderr=False)
+    assert listener._thread is None
+    assert "test_reconfigured_logger" not in LoggerManager._listeners
+    assert len(second.get_logger().handlers) == 2
+    first.close()
@@ -0,0 +1,69 @@
+# tests/test_metrics.py
+
+import json
+import logging
+
+import aiohttp
+import pytest
+
+from metrics import MetricsRegistry, MetricsServer
+
+
+def test_histogram_counters_and_gauges_render_as_prometheus_text():
+    """
+    Test that histograms, counters and gauges render as Prometheus text and failing gauges are skipped.
+    """
+    registry = MetricsRegistry(namespace="test")
+    registry.describe("stage_seconds", "Stage durations.")
+    registry.observe("stage_seconds", 0.02, stage="navigation")
+    registry.observe("stage_seconds", 3.0, stage="navigation")
+    registry.inc("errors_total", stage="check")
+    registry.inc("errors_total", stage="check")
+    registry.gauge("open_pages", lambda: 4)
+    registry.gauge("broken", lambda: 1 / 0)
+
+    text = registry.render_prometheus()
+    assert "# HELP test_stage_seconds Stage durations." in text
+    assert 'test_stage_seconds_bucket{stage="navigation",le="0.025"} 1' in text
+    assert 'test_stage_seconds_bucket{stage="navigation",le="+Inf"} 2' in text
+    assert 'test_stage_seconds_count{stage="navigation"} 2' in text
+    assert 'test_errors_total{stage="check"} 2' in text
+    assert "test_open_pages 4.0" in text
+    # A failing gauge callback is skipped instead of breaking the export.
+    assert "test_broken" not in text
+
+
+def test_time_records_blocks_that_raise():
+    """
+    Test that time() records the duration of a block even when it raises.
+    """
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        with registry.time("stage_seconds", stage="extract"):
+            raise ValueError()
+    assert registry.histogram("stage_seconds", stage="extract").count == 1
+
+
+@pytest.mark.asyncio
+async def test_server_exposes_prometheus_and_json():
+    """
+    Test that the server serves Prometheus text on /metrics and percentiles as JSON on /metrics.json.
+    """
+    registry = MetricsRegistry()
+    for value in (0.001, 0.2, 0.2, 0.7):
+        registry.observe("stage_seconds", value, stage="diff")
+    server = MetricsServer(registry, "127.0.0.1", 0, logging.getLogger("test_metrics"))
+    await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                assert "performancewatch_stage_seconds_count" in await response.text()
+            async with session.get(f"http://127.0.0.1:{server.port}/metrics.json") as response:
+                data = json.loads(await response.text())
+    finally:
+        await server.close()
+    series = data["histograms"]["stage_seconds"][0]
+    assert series["labels"] == {"stage": "diff"}
+    assert series["count"] == 4
+    assert series["p50"] == 0.25
+    assert series["p99"] == 1.0
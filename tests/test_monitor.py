@@ -7,6 +7,7 @@ import pytest
 from monitor import PerformanceMonitor
 from config import Config
 from notifier import Notifier
+from page_pool import PagePool
 
 # Create a dummy notifier that simply records any messages sent.
 class DummyNotifier(Notifier):
@@ -16,39 +17,10 @@ class DummyNotifier(Notifier):
     def send_message(self, message: str) -> None:
         self.messages.append(message)
 
-@pytest.mark.asyncio
-async def test_get_all_event_links(monkeypatch):
-    """
-    Test that get_all_event_links correctly aggregates event links.
-    """
-
-    cfg = Config()
-    logger = logging.getLogger("test_monitor")
-    dummy_notifier = DummyNotifier()
-    performance_urls = ["http://example.com/performance1"]
-
-    monitor = PerformanceMonitor(
-        notifier=dummy_notifier,
-        config=cfg,
-        logger=logger,
-        performance_urls=performance_urls,
-        send_notification=False
-    )
-
-    # Monkey-patch get_event_links_for_perf to return a dummy link.
-    async def dummy_get_event_links_for_perf(context, perf_url, logger):
-        return [("http://example.com/event1", perf_url)]
-    monkeypatch.setattr(monitor, "get_event_links_for_perf", dummy_get_event_links_for_perf)
-
-    event_links = await monitor.get_all_event_links(context=None)
-    assert len(event_links) == 1
-    assert event_links[0][0] == "http://example.com/event1"
-    assert event_links[0][1] == "http://example.com/performance1"
-
 @pytest.mark.asyncio
 async def test_check_event(monkeypatch):
     """
-    Test check_event by replacing the scraper methods with dummy implementations.
+    Test check_event by replacing the scraper's snapshot extraction with a dummy implementation.
     """
 
     cfg = Config()
@@ -69,6 +41,8 @@ async def test_check_event(monkeypatch):
             pass
         async def wait_for_timeout(self, timeout):
             pass
+        async def wait_for_function(self, script, arg=None, polling=None, timeout=None):
+            pass
         async def evaluate(self, script):
             # Simulate two rect elements:
             # One with a free seat color (not ignored) and one with an ignored color.
@@ -78,33 +52,244 @@ async def test_check_event(monkeypatch):
             ]
         async def close(self):
             pass
+        def is_closed(self):
+            return False
+        def on(self, event, handler):
+            pass
 
-    # Dummy implementation for the scraper functions:
-    async def dummy_load_page(context, url):
-        return DummyPage()
-    async def dummy_get_show_title(page, logger):
-        return "Test Show"
-    async def dummy_get_event_datetime(page, logger):
-        return "2025-01-01 20:00"
-    async def dummy_extract_event_links(page, logger):
-        return []
-    async def dummy_get_fallback_name(performance_url):
-        return "Fallback Show"
-    async def dummy_get_rect_fill_colors(page):
-        return await page.evaluate(None)
-
-    # Monkey-patch the PerformanceScraper methods used by check_event.
-    from scraper import PerformanceScraper
-    monkeypatch.setattr(PerformanceScraper, "load_page", dummy_load_page)
-    monkeypatch.setattr(PerformanceScraper, "get_show_title", dummy_get_show_title)
-    monkeypatch.setattr(PerformanceScraper, "get_event_datetime", dummy_get_event_datetime)
-    monkeypatch.setattr(PerformanceScraper, "extract_event_links", dummy_extract_event_links)
-    monkeypatch.setattr(PerformanceScraper, "get_fallback_name", dummy_get_fallback_name)
-    monkeypatch.setattr(PerformanceScraper, "get_rect_fill_colors", dummy_get_rect_fill_colors)
+    class DummyContext:
+        async def new_page(self):
+            return DummyPage()
+
+    # Dummy implementation of the only scraper call check_event makes on the page.
+    async def dummy_extract_snapshot(page, fields=None, known_fingerprint=None):
+        return PageSnapshot(title="Test Show", datetime="2025-01-01 20:00", rects=await page.evaluate(None))
+
+    from scraper import PerformanceScraper, PageSnapshot
+    monkeypatch.setattr(PerformanceScraper, "extract_snapshot", dummy_extract_snapshot)
 
     # Call check_event on a dummy event URL.
-    await monitor.check_event(context=None, event_url="http://example.com/event1", performance_url="http://example.com/performance1")
+    pool = PagePool(DummyContext(), max_size=1, logger=logger)
+    await monitor.check_event(pool=pool, event_url="http://example.com/event1", performance_url="http://example.com/performance1")
 
     # Since send_notification is disabled (send_notification=False), no message should be sent.
     # Even though a free seat is detected ("rgb(0, 0, 0)" is not in IGNORED_COLORS).
     assert len(dummy_notifier.messages) == 0
+    assert monitor.seat_states_by_url["http://example.com/event1"].free_count == 1
+
+@pytest.mark.asyncio
+async def test_navigate_records_readiness_wait():
+    """
+    Test that navigate waits on the configured readiness condition and records the time spent.
+    """
+    from scraper import PerformanceScraper
+
+    class DummyPage:
+        def __init__(self):
+            self.conditions = []
+        async def goto(self, url, timeout, wait_until):
+            return None
+        async def wait_for_function(self, script, arg=None, polling=None, timeout=None):
+            self.conditions.append((arg, timeout))
+
+    page = DummyPage()
+    PerformanceScraper.take_readiness_stats()
+    await PerformanceScraper.navigate(page, "http://example.com/event1", "event")
+
+    assert page.conditions == [(
+        {"selector": Config.READINESS["event"]["selector"],
+         "minCount": Config.READINESS["event"]["min_count"],
+         "stableMs": Config.READINESS["event"]["stable_ms"]},
+        Config.READINESS["event"]["timeout_ms"]
+    )]
+    stats = PerformanceScraper.take_readiness_stats()
+    assert stats["event"]["count"] == 1
+    assert PerformanceScraper.take_readiness_stats() == {}
+
+@pytest.mark.asyncio
+async def test_extract_snapshot_single_roundtrip():
+    """
+    Test that all fields come from one evaluate call and event links are made absolute.
+    """
+    from scraper import PerformanceScraper
+
+    class DummyPage:
+        def __init__(self):
+            self.calls = 0
+        async def evaluate(self, script, arg=None):
+            self.calls += 1
+            return {
+                "title": "Test Show",
+                "datetime": None,
+                "anchorCount": 3,
+                "links": ["/events/2", "https://sales.ft.org.ua/events/1", "/events/2"],
+                "rects": [{"index": 0, "color": "rgb(0, 0, 0)"}],
+            }
+
+    page = DummyPage()
+    snapshot = await PerformanceScraper.extract_snapshot(page)
+    assert page.calls == 1
+    assert snapshot.title == "Test Show"
+    assert snapshot.datetime == "Дата та час не знайдені"
+    assert snapshot.links == ["https://sales.ft.org.ua/events/1", "https://sales.ft.org.ua/events/2"]
+    assert snapshot.anchor_count == 3
+    assert len(snapshot.rects) == 1
+
+@pytest.mark.asyncio
+async def test_discovery_streams_into_polling_queue():
+    """
+    Test that a performance's events are queued as soon as its crawl finishes, without waiting for slower ones.
+    """
+    slow_done = asyncio.Event()
+    monitor = PerformanceMonitor(
+        notifier=DummyNotifier(),
+        config=Config(),
+        logger=logging.getLogger("test_monitor"),
+        performance_urls=["http://example.com/fast", "http://example.com/slow"],
+    )
+
+    async def loader(perf_url):
+        if perf_url.endswith("slow"):
+            await slow_done.wait()
+        return [(f"{perf_url}/event1", perf_url)]
+
+    monitor.discovery_cache.refresh(monitor.performance_urls, loader)
+    perf_url, links, crawl_started = await asyncio.wait_for(monitor.discovered.get(), timeout=1)
+    assert perf_url == "http://example.com/fast"
+    monitor.merge_discovered(None, perf_url, links, crawl_started)
+    assert await asyncio.wait_for(monitor.polling_queue.get(), timeout=1) == ("http://example.com/fast/event1", perf_url)
+
+    await monitor.process_event("http://example.com/fast/event1", perf_url, "Show", "", [])
+    monitor.log_cycle_stats()
+    assert not monitor._awaiting_first_check and not monitor._first_check_delays
+
+    slow_done.set()
+    perf_url, links, crawl_started = await asyncio.wait_for(monitor.discovered.get(), timeout=1)
+    monitor.merge_discovered(None, perf_url, links, crawl_started)
+    assert "http://example.com/slow/event1" in monitor.polling_queue
+    assert "http://example.com/fast/event1" in monitor.polling_queue  # Other performances are left alone.
+    await monitor.discovery_cache.close()
+
+@pytest.mark.asyncio
+async def test_removed_live_event_stops_its_watcher(monkeypatch):
+    """
+    Test that a live-watched event that disappears from its performance page has its watcher (and live tab) stopped.
+    """
+    import monitor as monitor_module
+
+    perf_url = "http://example.com/perf"
+    live, polled = f"{perf_url}/live", f"{perf_url}/polled"
+    cancelled = []
+
+    class DummyWatcher:
+        def __init__(self, context, event_url, perf_url, on_update, scheduler, logger):
+            self.event_url = event_url
+
+        async def run(self):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(self.event_url)
+                raise
+
+    monkeypatch.setattr(monitor_module, "LiveWatcher", DummyWatcher)
+    cfg = Config()
+    cfg.LIVE_WATCH_URLS = [live]
+    monitor = PerformanceMonitor(DummyNotifier(), cfg, logging.getLogger("test_monitor"), [perf_url])
+    context = object()
+
+    monitor.merge_discovered(context, perf_url, [(live, perf_url), (polled, perf_url)], 0.0)
+    task = monitor._live_watchers[live]
+    assert live not in monitor.polling_queue and polled in monitor.polling_queue
+    await asyncio.sleep(0)  # Let the watcher open its tab.
+
+    monitor.merge_discovered(context, perf_url, [(polled, perf_url)], 0.0)
+    await asyncio.gather(task, return_exceptions=True)
+    assert cancelled == [live] and live not in monitor._live_watchers
+    await monitor.discovery_cache.close()
+
+@pytest.mark.asyncio
+async def test_warm_start_queues_stored_events(tmp_path):
+    """
+    Test that events stored by a previous run are queued before any crawl, and an
+    unchanged re-crawl is not merged (or saved) again.
+    """
+    from state_store import SQLiteStateStore
+
+    perf_url = "http://example.com/perf"
+    links = [(f"{perf_url}/event1", perf_url), (f"{perf_url}/event2", perf_url)]
+    store = SQLiteStateStore(str(tmp_path / "state.db"), logging.getLogger("test_monitor"))
+    first = PerformanceMonitor(DummyNotifier(), Config(), logging.getLogger("test_monitor"), [perf_url],
+                               state_store=store)
+    first.merge_discovered(None, perf_url, links, 0.0)
+    await first.flush_state()
+
+    monitor = PerformanceMonitor(DummyNotifier(), Config(), logging.getLogger("test_monitor"), [perf_url],
+                                 state_store=store)
+    monitor.restore_state()
+    assert f"{perf_url}/event1" in monitor.polling_queue and f"{perf_url}/event2" in monitor.polling_queue
+    assert not monitor._dirty_links
+
+    async def loader(url):
+        return links
+
+    monitor.discovery_cache.refresh(monitor.performance_urls, loader)  # The seeded entry is stale.
+    await asyncio.gather(*monitor.discovery_cache._refreshing.values())
+    assert monitor.discovered.empty()
+    await monitor.discovery_cache.close()
+    store.close()
+
+@pytest.mark.asyncio
+async def test_unchanged_fingerprint_skips_diff(monkeypatch):
+    """
+    Test that a page whose fingerprint matches the one behind the current state is not diffed again.
+    """
+    from scraper import PerformanceScraper, PageSnapshot
+
+    monitor = PerformanceMonitor(
+        notifier=DummyNotifier(),
+        config=Config(),
+        logger=logging.getLogger("test_monitor"),
+        performance_urls=["http://example.com/performance1"],
+    )
+    page_fingerprint = ["aaaa"]
+    processed = []
+
+    async def navigate(page, url, page_type="event"):
+        return 0.0
+
+    async def extract_snapshot(page, fields=None, known_fingerprint=None):
+        if known_fingerprint == page_fingerprint[0]:
+            return PageSnapshot(fingerprint=known_fingerprint, unchanged=True)
+        return PageSnapshot(title="Show", rects=[{"index": 0, "color": "rgb(0, 0, 0)"}],
+                            fingerprint=page_fingerprint[0])
+
+    original = monitor.process_event
+
+    async def process_event(*args):
+        processed.append(args[0])
+        await original(*args)
+
+    monkeypatch.setattr(PerformanceScraper, "navigate", navigate)
+    monkeypatch.setattr(PerformanceScraper, "extract_snapshot", extract_snapshot)
+    monitor.process_event = process_event
+
+    class DummyPool:
+        def lease(self):
+            class Lease:
+                async def __aenter__(self):
+                    return object()
+                async def __aexit__(self, *exc):
+                    return False
+            return Lease()
+
+    event_url = "http://example.com/event1"
+    for _ in range(3):
+        await monitor.check_event(DummyPool(), event_url, "http://example.com/performance1")
+    assert processed == [event_url]
+    assert monitor._fingerprint_checks["event"] == [3, 2]
+
+    page_fingerprint[0] = "bbbb"
+    await monitor.check_event(DummyPool(), event_url, "http://example.com/performance1")
+    assert processed == [event_url, event_url]
+    assert monitor.fingerprints[event_url] == "bbbb"
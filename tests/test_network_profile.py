@@ -0,0 +1,98 @@
+# tests/test_network_profile.py
+
+import logging
+
+import pytest
+
+from network_profile import NetworkProfile
+
+
+def make_profile(**kwargs):
+    params = dict(
+        blocked_resource_types={"image", "font"},
+        blocked_url_patterns=[r"google-analytics\.com"],
+        allowed_url_patterns=[r"sales\.ft\.org\.ua/seatmap"],
+        logger=logging.getLogger("test_network_profile"),
+    )
+    params.update(kwargs)
+    return NetworkProfile(**params)
+
+
+def test_should_block_rules():
+    """
+    Test blocking by resource type and URL pattern, with allow patterns taking precedence.
+    """
+    profile = make_profile()
+    assert profile.should_block("image", "https://ft.org.ua/poster.jpg")
+    assert profile.should_block("script", "https://www.google-analytics.com/analytics.js")
+    assert not profile.should_block("document", "https://sales.ft.org.ua/events/1")
+    assert not profile.should_block("image", "https://sales.ft.org.ua/seatmap/hall.svg")
+
+
+def test_take_cycle_stats_resets_counters():
+    """
+    Test that per-cycle stats are reported once and then reset.
+    """
+    profile = make_profile()
+    profile.blocked_requests["image"] += 3
+    profile.allowed_requests += 2
+    stats = profile.take_cycle_stats()
+    assert stats["blocked_requests"] == 3
+    assert stats["blocked_by_type"] == {"image": 3}
+    assert stats["allowed_requests"] == 2
+    assert "blocked_bytes" not in stats  # Aborted requests have no size to report.
+    assert profile.take_cycle_stats()["blocked_requests"] == 0
+
+    dry_run = make_profile(dry_run=True)
+    dry_run.blocked_bytes += 2048
+    assert dry_run.take_cycle_stats()["blocked_bytes"] == 2048
+
+
+@pytest.mark.asyncio
+async def test_attach_without_interception_keeps_http_cache():
+    """
+    Test that a profile attached without interception installs no route (which would disable the HTTP cache).
+    """
+    class DummyContext:
+        def __init__(self):
+            self.routes = []
+            self.handlers = []
+
+        async def route(self, pattern, handler):
+            self.routes.append(pattern)
+
+        def on(self, event, handler):
+            self.handlers.append(event)
+
+    profile = make_profile()
+    cached, fresh = DummyContext(), DummyContext()
+    await profile.attach(cached, intercept=False)
+    await profile.attach(fresh)
+    assert cached.routes == [] and cached.handlers == ["requestfinished"]
+    assert fresh.routes == ["**/*"]
+
+
+@pytest.mark.asyncio
+async def test_received_bytes_use_measured_body_size():
+    """
+    Test that received and would-be-blocked bytes come from the measured body size, not the Content-Length header.
+    """
+    class DummyRequest:
+        def __init__(self, resource_type, url, body_size):
+            self.resource_type = resource_type
+            self.url = url
+            self.body_size = body_size
+
+        async def sizes(self):
+            if self.body_size is None:
+                raise Exception("Target page, context or browser has been closed")
+            return {"requestBodySize": 0, "requestHeadersSize": 200,
+                    "responseBodySize": self.body_size, "responseHeadersSize": 300}
+
+    profile = make_profile(dry_run=True)
+    await profile._on_request_finished(DummyRequest("document", "https://sales.ft.org.ua/events/1", 5000))
+    await profile._on_request_finished(DummyRequest("image", "https://ft.org.ua/poster.jpg", 12000))
+    await profile._on_request_finished(DummyRequest("image", "https://ft.org.ua/closed.jpg", None))
+    stats = profile.take_cycle_stats()
+    assert stats["received_bytes"] == 17000
+    assert stats["blocked_bytes"] == 12000
@@ -0,0 +1,46 @@
+# tests/test_notifier.py
+
+import logging
+
+import pytest
+from aiohttp import web
+
+from notifier import AsyncTelegramNotifier
+
+
+@pytest.mark.asyncio
+async def test_async_notifier_retries_after_429():
+    """
+    Test delivery to every chat against a local stand-in Bot API that rate limits the first request per chat.
+    """
+    attempts = {}
+    delivered = []
+
+    async def send_message(request):
+        data = await request.post()
+        chat_id = data["chat_id"]
+        attempts[chat_id] = attempts.get(chat_id, 0) + 1
+        if attempts[chat_id] == 1:
+            return web.json_response(
+                {"ok": False, "error_code": 429, "parameters": {"retry_after": 0}}, status=429)
+        delivered.append((chat_id, data["text"]))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/botTOKEN/sendMessage", send_message)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    notifier = AsyncTelegramNotifier("TOKEN", ["1", "2", ""], logging.getLogger("test_notifier"),
+                                     api_base=f"http://127.0.0.1:{port}", max_retries=2)
+    try:
+        notifier.send_message("hello")  # Returns immediately; delivery happens in the background.
+        await notifier.close()
+    finally:
+        await runner.cleanup()
+
+    assert sorted(delivered) == [("1", "hello"), ("2", "hello")]
+    assert attempts == {"1": 2, "2": 2}
@@ -0,0 +1,64 @@
+# tests/test_page_pool.py
+
+import logging
+import pytest
+
+from page_pool import PagePool
+
+
+class DummyPage:
+    def __init__(self):
+        self.closed = False
+        self.handlers = {}
+
+    async def goto(self, url, **kwargs):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    def is_closed(self):
+        return self.closed
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+
+class DummyContext:
+    def __init__(self):
+        self.created = 0
+
+    async def new_page(self):
+        self.created += 1
+        return DummyPage()
+
+
+@pytest.mark.asyncio
+async def test_lease_reuses_pages():
+    """
+    Test that a released page is handed out again instead of creating a new one.
+    """
+    context = DummyContext()
+    pool = PagePool(context, max_size=2, logger=logging.getLogger("test_page_pool"))
+    async with pool.lease() as first:
+        pass
+    async with pool.lease() as second:
+        pass
+    assert first is second
+    assert context.created == 1
+
+
+@pytest.mark.asyncio
+async def test_crashed_page_is_replaced():
+    """
+    Test that a page which crashed while leased is discarded and replaced.
+    """
+    context = DummyContext()
+    pool = PagePool(context, max_size=1, logger=logging.getLogger("test_page_pool"))
+    async with pool.lease() as first:
+        first.handlers["crash"](first)
+    async with pool.lease() as second:
+        pass
+    assert first.closed
+    assert second is not first
+    assert pool.open_pages == 1
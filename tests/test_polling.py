@@ -0,0 +1,95 @@
+# tests/test_polling.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from polling import AdaptivePollingPolicy, PollingQueue, parse_event_datetime
+
+
+def test_parse_event_datetime():
+    """
+    Test parsing of Ukrainian month names, numeric dates and a missing year.
+    """
+    now = datetime(2025, 11, 20, 12, 0)
+    assert parse_event_datetime("12 квітня 2025, 19:00", now) == datetime(2025, 4, 12, 19, 0)
+    assert parse_event_datetime("Субота, 6 грудня, 18:30", now) == datetime(2025, 12, 6, 18, 30)
+    assert parse_event_datetime("15 січня 19:00", now) == datetime(2026, 1, 15, 19, 0)
+    assert parse_event_datetime("03.02.2026 19:00", now) == datetime(2026, 2, 3, 19, 0)
+    assert parse_event_datetime("Дата та час не знайдені", now) is None
+
+
+def test_policy_prioritizes_hot_events():
+    """
+    Test that near, recently changed events are polled faster than distant ones and errors back off.
+    """
+    now = datetime.now()
+    policy = AdaptivePollingPolicy(min_interval=5, max_interval=900, staleness_scale=3600, horizon_days=7)
+    policy.record_check("tonight", changed=True, show_time=now + timedelta(hours=3))
+    policy.record_check("far", changed=False, show_time=now + timedelta(days=180))
+
+    assert policy.next_interval("tonight", now) < 6
+    assert policy.next_interval("far", now) > 100
+    assert policy.next_interval("far", now + timedelta(days=-3650)) == 900
+
+    policy.record_error("tonight")
+    policy.record_error("tonight")
+    assert policy.next_interval("tonight", now) > 4 * 5 - 1
+
+
+def test_policy_slows_down_events_that_never_change():
+    """
+    Test that staleness counts from the first check when no change was ever observed
+    (e.g. after a warm start), and that next_interval() does not recreate forgotten events.
+    """
+    policy = AdaptivePollingPolicy(min_interval=5, max_interval=900, staleness_scale=3600, horizon_days=7)
+    policy.record_check("restored", changed=False, show_time=None)
+    policy.events["restored"].last_change -= 3600
+    policy.record_check("restored", changed=False, show_time=None)
+    assert policy.next_interval("restored") == pytest.approx(10, rel=0.01)
+
+    policy.forget("restored")
+    assert policy.next_interval("restored") == 5
+    assert "restored" not in policy.events
+
+
+@pytest.mark.asyncio
+async def test_polling_queue_orders_by_due_time():
+    """
+    Test that events come out in due order and removed events are skipped.
+    """
+    queue = PollingQueue()
+    queue.schedule("late", "perf", delay=0.05)
+    queue.schedule("early", "perf", delay=0.0)
+    queue.schedule("gone", "perf", delay=0.0)
+    queue.remove("gone")
+
+    assert await queue.get() == ("early", "perf")
+    assert await asyncio.wait_for(queue.get(), timeout=1) == ("late", "perf")
+    assert queue.sync_performance("perf", [("new", "perf")]) == ["early", "late"]
+    assert await queue.get() == ("new", "perf")
+
+
+@pytest.mark.asyncio
+async def test_polling_queue_serves_due_performances_round_robin():
+    """
+    Test that a backlog is served round-robin across performances, so one with many dates cannot starve the others.
+    """
+    queue = PollingQueue()
+    queue.sync_performance("A", [("a1", "A"), ("a2", "A"), ("a3", "A")])
+    queue.sync_performance("B", [("b1", "B")])
+    queue.sync_performance("C", [("c1", "C"), ("c2", "C")])
+    order = [(await asyncio.wait_for(queue.get(), timeout=1))[0] for _ in range(6)]
+    assert order == ["a1", "b1", "c1", "a2", "c2", "a3"]
+
+
+def test_sync_performance_only_touches_its_events():
+    """
+    Test that a per-performance sync adds and removes only that performance's events.
+    """
+    queue = PollingQueue()
+    queue.sync_performance("a", [("a1", "a"), ("a2", "a")])
+    queue.sync_performance("b", [("b1", "b")])
+    assert queue.sync_performance("a", [("a2", "a"), ("a3", "a")]) == ["a1"]
+    assert "a3" in queue and "b1" in queue and "a1" not in queue
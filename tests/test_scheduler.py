@@ -0,0 +1,75 @@
+# tests/test_scheduler.py
+
+import asyncio
+import logging
+import pytest
+
+from polling import PollingQueue
+from scheduler import EventScheduler, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_run_continuous_respects_concurrency_cap():
+    """
+    Test that no more than max_concurrency jobs run at the same time.
+    """
+    scheduler = EventScheduler(max_concurrency=3, host_rate=1000.0, host_burst=1000,
+                               logger=logging.getLogger("test_scheduler"))
+    queue = PollingQueue()
+    queue.sync_performance("http://host/perf", [(f"http://host/events/{i}", "http://host/perf") for i in range(20)])
+    running = 0
+    peak = 0
+    done = []
+    finished = asyncio.Event()
+
+    async def worker(event_url, perf_url):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        done.append(event_url)
+        if len(done) == 20:
+            finished.set()
+
+    task = asyncio.ensure_future(scheduler.run_continuous(queue, worker, lambda event_url: 3600))
+    await asyncio.wait_for(finished.wait(), timeout=5)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert peak == 3
+    assert sorted(done) == sorted(set(done))
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_burst_and_refill_rate(monkeypatch):
+    """
+    Test that a full bucket allows a burst of `capacity` tokens, then one token per 1/rate seconds in arrival order.
+    """
+    import scheduler
+
+    clock = [0.0]
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr(scheduler.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(scheduler.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rate=2.0, capacity=3)
+
+    for _ in range(3):
+        await bucket.acquire()
+    assert sleeps == [] and clock[0] == 0.0
+
+    # Each further token takes 1/rate seconds to refill.
+    await bucket.acquire()
+    await bucket.acquire()
+    assert sleeps == [0.5, 0.5] and clock[0] == 1.0
+
+    # A long idle period refills the bucket only up to its capacity.
+    clock[0] += 60
+    sleeps.clear()
+    for _ in range(4):
+        await bucket.acquire()
+    assert sleeps == [0.5]
@@ -0,0 +1,117 @@
+# tests/test_seat_state.py
+
+
+from seat_state import (ColorPalette, HallIndex, SeatLayout, SeatState, indices_from_mask,
+                        mask_from_indices, popcount, seat_keys)
+
+IGNORED = {"rgb(255, 255, 255)"}
+
+
+def rects(*colors):
+    return [{"index": i, "color": color} for i, color in enumerate(colors)]
+
+
+def seats(*specs):
+    """
+    Rects with geometry: each spec is (x, y, color).
+    """
+    return [{"index": i, "color": color, "x": str(x), "y": str(y)} for i, (x, y, color) in enumerate(specs)]
+
+
+def test_mask_roundtrip():
+    """
+    Test conversion between seat indices and bitsets.
+    """
+    indices = [0, 3, 8, 63, 64, 1000]
+    mask = mask_from_indices(indices, 1001)
+    assert popcount(mask) == len(indices)
+    assert indices_from_mask(mask) == indices
+
+
+def test_new_seats_ignores_color_changes():
+    """
+    Test that only seats that were not free before are new; a price-tier
+    (color) change of a seat that stays free is not.
+    """
+    palette = ColorPalette()
+    before = rects("rgb(0, 0, 0)", "rgb(255, 255, 255)", "rgb(1, 1, 1)", None)
+    after = rects("rgb(0, 0, 0)", "rgb(0, 0, 0)", "rgb(2, 2, 2)", "rgb(1, 1, 1)")
+
+    previous = SeatState.from_rects(before, IGNORED, palette)
+    current = SeatState.from_rects(after, IGNORED, palette)
+
+    assert indices_from_mask(current.new_seats(previous)) == [1, 3]
+    assert popcount(current.new_seats(None)) == current.free_count == 4
+    assert current.new_seats(current) == 0
+
+
+def test_layout_keeps_seat_identity_when_rects_shift():
+    """
+    Test that an extra decorative rect in front of the seats does not make every seat look new.
+    """
+    palette = ColorPalette()
+    layout = SeatLayout()
+    before = seats((0, 0, "rgb(0, 0, 0)"), (12, 0, "rgb(173, 173, 173)"), (24, 0, "rgb(0, 0, 0)"))
+    after = [{"index": 0, "color": "rgb(255, 255, 255)"}] + [
+        dict(item, index=item["index"] + 1) for item in before
+    ]
+    after[2]["color"] = "rgb(0, 0, 0)"
+
+    previous = SeatState.from_rects(before, IGNORED | {"rgb(173, 173, 173)"}, palette, layout)
+    current = SeatState.from_rects(after, IGNORED | {"rgb(173, 173, 173)"}, palette, layout)
+    assert [layout.keys[i] for i in indices_from_mask(current.new_seats(previous))] == ["xy:12:0"]
+
+    restored = SeatState.from_bytes(current.to_bytes(palette), ColorPalette())
+    assert restored.layout.keys == layout.keys
+
+
+def test_seat_keys_prefer_labels_and_stay_unique():
+    """
+    Test that seat keys prefer row/seat labels over geometry and ids, and that duplicate keys get a suffix.
+    """
+    items = [
+        {"index": 0, "color": "c", "row": "3", "seat": "7", "x": "1", "y": "1", "id": "a"},
+        {"index": 1, "color": "c", "x": "1.50", "y": "2"},
+        {"index": 2, "color": "c", "id": "s-1"},
+        {"index": 3, "color": "c"},
+        {"index": 4, "color": "c", "id": "s-1"},
+    ]
+    assert seat_keys(items) == ["rs:3:7", "xy:1.5:2", "id:s-1", "idx:3", "id:s-1#1"]
+    # A fresh layout numbers seats in DOM order, matching states stored by DOM index.
+    layout = SeatLayout(seat_keys(items))
+    assert [layout.slot(key) for key in seat_keys(items)] == list(range(5))
+
+
+def test_hall_index_finds_adjacent_free_seats_within_rows():
+    """
+    Test group queries: runs do not cross rows or aisles, and only new seats
+    inside a group of the requested size are counted.
+    """
+    free = "rgb(0, 0, 0)"
+    taken = "rgb(173, 173, 173)"
+    # Row y=0: x=0,12 | aisle | x=48,60,72.  Row y=12: x=0,12 (DOM order scrambled).
+    hall = seats((60, 0, free), (0, 12, free), (0, 0, free), (48, 0, taken), (12, 0, free),
+                 (72, 0, free), (12, 12, taken))
+    palette = ColorPalette()
+    layout = SeatLayout()
+    state = SeatState.from_rects(hall, {taken}, palette, layout)
+    index = layout.hall_index()
+
+    assert index.has_group(state.free_mask, 2)
+    assert not index.has_group(state.free_mask, 3)
+
+    hall[3]["color"] = free  # x=48 frees up: 48, 60, 72 form a group of three.
+    after = SeatState.from_rects(hall, {taken}, palette, layout)
+    new = after.new_seats(state)
+    assert index.has_group(after.free_mask, 3)
+    assert index.new_seats_in_groups(after.free_mask, new, 3) == 1
+    assert index.new_seats_in_groups(after.free_mask, new, 4) == 0
+
+    labelled = [{"index": i, "color": free, "row": "1", "seat": str(n)} for i, n in enumerate([1, 2, 4, 5, 6])]
+    by_labels = HallIndex.from_keys(seat_keys(labelled))
+    state = SeatState.from_rects(labelled, set(), palette)
+    # Seat 3 is missing, so 1-2 and 4-6 are separate runs.
+    assert by_labels.has_group(state.free_mask, 3)
+    assert not by_labels.has_group(state.free_mask, 4)
+    assert HallIndex.from_keys(["idx:0", "id:a"]) is None
+
@@ -0,0 +1,235 @@
+# tests/test_sharding.py
+
+import logging
+import queue
+
+from notifier import Notifier
+from sharding import QueueNotifier, ShardCoordinator, partition, plan_rebalance, shard_cdp_url, shard_db_path
+
+
+class DummyNotifier(Notifier):
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, message: str) -> None:
+        self.messages.append(message)
+
+
+def test_partition_spreads_performances_round_robin():
+    """
+    Test that performances are dealt round-robin and there are never more shards than performances.
+    """
+    urls = [f"http://perf/{i}" for i in range(5)]
+    assert partition(urls, 2) == [urls[0::2], urls[1::2]]
+    # Never more shards than performances.
+    assert partition(urls[:2], 4) == [[urls[0]], [urls[1]]]
+
+
+def test_plan_rebalance_moves_smallest_performance_from_slowest_shard():
+    """
+    Test that the smallest performance of the most backlogged shard moves to the least loaded one, above the threshold only.
+    """
+    assignments = [["a", "b"], ["c"], ["d"]]
+    events = {"a": 30, "b": 4, "c": 10, "d": 10}
+    assert plan_rebalance(assignments, [25, 2, 0], events, threshold=20) == (0, 2, "b")
+    assert plan_rebalance(assignments, [15, 2, 0], events, threshold=20) is None
+    # A shard with a single performance has nothing to give away.
+    assert plan_rebalance([["a"], ["c"]], [50, 0], events, threshold=20) is None
+
+
+def test_coordinator_forwards_notifications_and_tracks_current_heartbeats():
+    """
+    Test that shard notifications are delivered and only heartbeats of the current worker generation are tracked.
+    """
+    notifier = DummyNotifier()
+    coordinator = ShardCoordinator(notifier, logging.getLogger("test_sharding"),
+                                   ["http://perf/1", "http://perf/2"], shards=2, logger_name="test")
+    results = queue.Queue()
+    QueueNotifier(1, results).send_message("new seats")
+    coordinator._handle(results.get_nowait())
+    assert notifier.messages == ["new seats"]
+
+    coordinator._generations = [1, 2]
+    coordinator._handle(("heartbeat", 1, {"generation": 2, "events": 9, "backlog": 7,
+                                          "events_by_perf": {"http://perf/2": 9}}))
+    # Heartbeats from a replaced worker process are ignored.
+    coordinator._handle(("heartbeat", 0, {"generation": 0, "events": 3, "backlog": 40,
+                                          "events_by_perf": {}}))
+    assert coordinator._backlogs == [0, 7]
+    assert coordinator._events_by_perf == {"http://perf/2": 9}
+
+
+def test_shard_cdp_url_offsets_port():
+    """
+    Test that every shard attaches to its own daemon browser on the configured port plus its index.
+    """
+    assert shard_cdp_url("http://127.0.0.1:9222", 0) == "http://127.0.0.1:9222"
+    assert shard_cdp_url("http://127.0.0.1:9222", 2) == "http://127.0.0.1:9224"
+    assert shard_cdp_url("ws://[::1]:9222/devtools", 1) == "ws://[::1]:9223/devtools"
+
+
+def test_shard_state_databases_share_moved_performances(tmp_path):
+    """
+    Test that a shard reads seat states and links written by its siblings, preferring the newest row or deletion.
+    """
+    from seat_state import ColorPalette, SeatState
+    from state_store import SQLiteStateStore
+
+    base = str(tmp_path / "seat_state.db")
+    assert shard_db_path(base, 1) == str(tmp_path / "seat_state.shard1.db")
+    paths = [shard_db_path(base, n) for n in range(2)]
+    logger = logging.getLogger("test_sharding")
+    palette = ColorPalette()
+    older = SeatState.from_rects([{"index": 0, "color": "rgb(0, 0, 0)"}], set(), palette)
+    newer = SeatState.from_rects([{"index": 0, "color": "rgb(0, 0, 0)"}, {"index": 1, "color": "rgb(0, 0, 0)"}],
+                                 set(), palette)
+
+    shard0 = SQLiteStateStore(paths[0], logger, read_paths=[base] + paths)
+    shard0.save({"http://event": older}, palette)
+    shard1 = SQLiteStateStore(paths[1], logger, read_paths=[base] + paths)
+    shard1.save({"http://event": newer}, palette)
+    shard1.save_links({"http://perf": [("http://event", "http://perf")]})
+
+    loaded = shard0.load(ColorPalette())
+    assert loaded["http://event"].free_count == 2
+    assert shard0.load_links() == {"http://perf": [("http://event", "http://perf")]}
+
+    # An event deleted after a 404 stays deleted even though a sibling still holds an older state.
+    shard0.delete(["http://event"])
+    assert shard0.load(ColorPalette()) == {}
+    assert shard1.load(ColorPalette()) == {}
+    # A newer state (the event came back) wins over the tombstone.
+    shard1.save({"http://event": newer}, palette)
+    assert shard0.load(ColorPalette())["http://event"].free_count == 2
+    shard0.close()
+    shard1.close()
+
+
+class DeadProcess:
+    pid = 1
+
+    def is_alive(self) -> bool:
+        return False
+
+
+def test_failed_shard_restarts_with_backoff_until_limit(monkeypatch):
+    """
+    Test that a shard that keeps dying is restarted after a doubling delay and left stopped after the restart limit.
+    """
+    import asyncio
+    import sharding
+
+    clock = [1000.0]
+    monkeypatch.setattr(sharding.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(sharding.Config, "SHARD_RESTART_BACKOFF", 5.0)
+    monkeypatch.setattr(sharding.Config, "SHARD_RESTART_BACKOFF_MAX", 600.0)
+    monkeypatch.setattr(sharding.Config, "SHARD_MAX_RESTARTS", 2)
+    coordinator = ShardCoordinator(DummyNotifier(), logging.getLogger("test_sharding"),
+                                   ["http://perf/1"], shards=1, logger_name="test")
+    starts = []
+
+    def fake_start(shard_id):
+        starts.append(clock[0])
+        coordinator._restart_at[shard_id] = None
+        coordinator._processes[shard_id] = DeadProcess()
+
+    monkeypatch.setattr(coordinator, "_start", fake_start)
+    coordinator._processes[0] = DeadProcess()
+
+    async def supervise():
+        for _ in range(40):
+            await coordinator._check_health()
+            clock[0] += 1.0
+
+    asyncio.run(supervise())
+    # First restart after 5s, the second after 10s, then the shard is given up on.
+    assert starts == [1005.0, 1016.0]
+    assert coordinator._processes[0] is None and coordinator._restart_at[0] is None
+
+    # A heartbeat from a running generation resets the failure count.
+    coordinator._handle(("heartbeat", 0, {"generation": coordinator._generations[0], "events": 1,
+                                          "backlog": 0, "events_by_perf": {}}))
+    assert coordinator._failures[0] == 0
+
+
+def test_health_checks_run_while_queue_is_busy(monkeypatch):
+    """
+    Test that health checks and rebalancing run on a clock even when the result queue never goes idle.
+    """
+    import asyncio
+    import sharding
+
+    clock = [0.0]
+    monkeypatch.setattr(sharding.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(sharding.Config, "SHARD_REBALANCE_INTERVAL", 3)
+    coordinator = ShardCoordinator(DummyNotifier(), logging.getLogger("test_sharding"),
+                                   ["http://perf/1"], shards=1, logger_name="test")
+
+    class BusyQueue:
+        def get(self, block=True, timeout=None):
+            clock[0] += 0.5
+            return ("notify", 0, "new seats")
+
+    calls = []
+
+    async def record(name, *args):
+        calls.append((name, clock[0]))
+
+    coordinator._queue = BusyQueue()
+    monkeypatch.setattr(coordinator, "_start", lambda shard_id: None)
+    monkeypatch.setattr(coordinator, "_stop", lambda shard_id: record("stop"))
+    monkeypatch.setattr(coordinator, "_check_health", lambda: record("health"))
+    monkeypatch.setattr(coordinator, "_rebalance", lambda: record("rebalance"))
+
+    async def supervise():
+        task = asyncio.ensure_future(coordinator.run())
+        while clock[0] < 4.0:
+            await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(supervise())
+    assert [call for call in calls if call[0] == "health"][:3] == [("health", 1.0), ("health", 2.0), ("health", 3.0)]
+    assert ("rebalance", 3.0) in calls
+
+
+def test_stop_asks_shard_to_exit_before_terminating(monkeypatch):
+    """
+    Test that stopping a shard sets its stop event and waits for it, and terminates only a shard that does not exit in time.
+    """
+    import asyncio
+    import sharding
+
+    monkeypatch.setattr(sharding.Config, "SHARD_STOP_TIMEOUT", 5)
+    coordinator = ShardCoordinator(DummyNotifier(), logging.getLogger("test_sharding"),
+                                   ["http://perf/1", "http://perf/2"], shards=2, logger_name="test")
+
+    class FakeProcess:
+        def __init__(self, event, exits):
+            self.event = event
+            self.exits = exits
+            self.alive = True
+            self.terminated = False
+
+        def is_alive(self):
+            return self.alive
+
+        def join(self, timeout=None):
+            if self.event.is_set() and self.exits or self.terminated:
+                self.alive = False
+
+        def terminate(self):
+            self.terminated = True
+
+    for shard_id, exits in enumerate([True, False]):
+        coordinator._stop_events[shard_id] = coordinator._ctx.Event()
+        coordinator._processes[shard_id] = FakeProcess(coordinator._stop_events[shard_id], exits)
+    processes = list(coordinator._processes)
+
+    async def stop_all():
+        await asyncio.gather(coordinator._stop(0), coordinator._stop(1))
+
+    asyncio.run(stop_all())
+    assert all(event.is_set() for event in coordinator._stop_events)
+    assert not processes[0].terminated and processes[1].terminated
+    assert coordinator._processes == [None, None]
@@ -0,0 +1,49 @@
+# tests/test_state_store.py
+
+import logging
+
+from seat_state import ColorPalette, SeatState
+from state_store import SQLiteStateStore
+
+
+def test_sqlite_store_roundtrip(tmp_path):
+    """
+    Test that saved states survive reopening the database with a fresh palette.
+    """
+    logger = logging.getLogger("test_state_store")
+    palette = ColorPalette()
+    rects = [{"index": 0, "color": "rgb(0, 0, 0)"}, {"index": 9, "color": "rgb(1, 2, 3)"}]
+    state = SeatState.from_rects(rects, set(), palette)
+
+    store = SQLiteStateStore(str(tmp_path / "state.db"), logger)
+    store.save({"http://example.com/event1": state, "http://example.com/event2": state}, palette)
+    store.delete(["http://example.com/event2"])
+    store.close()
+
+    reopened = SQLiteStateStore(str(tmp_path / "state.db"), logger)
+    fresh_palette = ColorPalette()
+    fresh_palette.code("rgb(9, 9, 9)")  # Codes differ from the original palette.
+    loaded = reopened.load(fresh_palette)
+    reopened.close()
+
+    assert list(loaded) == ["http://example.com/event1"]
+    restored = SeatState.from_rects(rects, set(), fresh_palette)
+    assert loaded["http://example.com/event1"] == restored
+    assert restored.new_seats(loaded["http://example.com/event1"]) == 0
+
+
+def test_sqlite_store_links_roundtrip(tmp_path):
+    """
+    Test that the last discovered event links per performance are replaced on save and survive reopening.
+    """
+    logger = logging.getLogger("test_state_store")
+    perf = "http://example.com/perf"
+    store = SQLiteStateStore(str(tmp_path / "state.db"), logger)
+    assert store.load_links() == {}
+    store.save_links({perf: [("http://example.com/event1", perf), ("http://example.com/event2", perf)]})
+    store.save_links({perf: [("http://example.com/event2", perf)]})
+    store.close()
+
+    reopened = SQLiteStateStore(str(tmp_path / "state.db"), logger)
+    assert reopened.load_links() == {perf: [("http://example.com/event2", perf)]}
+    reopened.close()
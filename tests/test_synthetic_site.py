@@ -0,0 +1,65 @@
+# tests/test_synthetic_site.py
+
+import logging
+import time
+
+import pytest
+
+from benchmarks.synthetic_site import SyntheticSite, TAKEN_COLOR
+from http_scraper import HttpPerformanceScraper
+
+
+@pytest.mark.asyncio
+async def test_synthetic_event_pages_parse_and_churn_is_detectable():
+    """
+    Test that the benchmark site serves seat maps the scrapers can read,
+    and that freed seats are resolved once a check sees them.
+    """
+    site = SyntheticSite(performances=1, events=2, seats=60, churn_ratio=0.5, seed=1)
+    await site.start()
+    scraper = HttpPerformanceScraper(logging.getLogger("test_synthetic_site"))
+    try:
+        status, listing = await scraper.fetch(site.performance_urls[0])
+        assert status == 200 and site.event_url(0, 1) in listing
+
+        site.churn()
+        event_url = site.event_url(0, 0)
+        snapshot = await scraper.scrape_event(event_url)
+        assert len(snapshot.rects) == 60
+        pending = [key for key in site.pending_free if key[0] == event_url]
+        assert pending
+        latencies = site.detected(event_url, snapshot.rects, time.monotonic())
+        assert len(latencies) == len(pending)
+        assert not any(key[0] == event_url for key in site.pending_free)
+        assert all(r["color"] != TAKEN_COLOR or (event_url, r["index"]) not in site.pending_free
+                   for r in snapshot.rects)
+
+        status, _ = await scraper.fetch(f"{site.base_url}/events/0-99")
+        assert status == 404
+    finally:
+        await scraper.close()
+        await site.close()
+
+
+@pytest.mark.asyncio
+async def test_http_revalidation_skips_unchanged_event_pages():
+    """
+    Test that a repeated check with the previous fingerprint is answered by a 304, until the seats change.
+    """
+    site = SyntheticSite(performances=1, events=1, seats=30, churn_ratio=1.0, seed=2)
+    await site.start()
+    scraper = HttpPerformanceScraper(logging.getLogger("test_synthetic_site"))
+    try:
+        event_url = site.event_url(0, 0)
+        first = await scraper.scrape_event(event_url)
+        assert first.fingerprint and not first.unchanged
+
+        again = await scraper.scrape_event(event_url, first.fingerprint)
+        assert again.unchanged and again.fingerprint == first.fingerprint and not again.rects
+
+        site.churn()
+        changed = await scraper.scrape_event(event_url, first.fingerprint)
+        assert not changed.unchanged and changed.fingerprint != first.fingerprint
+    finally:
+        await scraper.close()
+        await site.close()